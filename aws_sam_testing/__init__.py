@@ -1,5 +1,17 @@
 """AWS SAM Testing toolkit."""
 
-from aws_sam_testing.aws_sam import AWSSAMToolkit
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from aws_sam_testing.aws_sam import AWSSAMToolkit
 
 __all__ = ["AWSSAMToolkit"]
+
+
+def __getattr__(name: str) -> Any:
+    # The pytest plugins import this package in every test session, import the SAM CLI only when it is used
+    if name == "AWSSAMToolkit":
+        from aws_sam_testing.aws_sam import AWSSAMToolkit
+
+        return AWSSAMToolkit
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,9 +1,21 @@
-import json
+import logging
 import os
+import re
+import threading
 from contextlib import contextmanager
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Iterable, Iterator
 
 import boto3
 
+if TYPE_CHECKING:
+    from moto.cloudformation.parsing import ResourceMap
+
+    from aws_sam_testing.cfn_graph import DependencyGraph
+    from aws_sam_testing.moto_state import MotoSnapshot
+
+logger = logging.getLogger(__name__)
+
 
 class AWSResourceManager:
     """Manages the creation and deletion of AWS resources using moto for mock environments.
@@ -24,12 +36,46 @@ class AWSResourceManager:
         region_name: AWS region where resources will be created. Defaults to AWS_REGION environment variable.
         account_id: AWS account ID for resource creation. Defaults to "123456789012".
         parameters: CloudFormation template parameters as key-value pairs. Defaults to empty dict.
+            The template conditions are evaluated against them and the parameter defaults, resources
+            disabled by the conditions are not created.
         tags: Resource tags as key-value pairs. Defaults to empty dict.
         cross_stack_resources: Resources from other stacks that this stack depends on. Defaults to empty dict.
+        native_intrinsics: Whether the template was loaded with JSON-style intrinsic functions instead of
+            CloudFormation tag objects (see ``load_yaml(..., native_intrinsics=True)``). If True, the tag
+            transformation pass is skipped. Defaults to False.
+        cache_dir: Directory where SAM templates translated to CloudFormation are cached, see
+            :mod:`aws_sam_testing.cfn_translation`. Defaults to None, translations are then only cached in memory.
+        max_workers: Number of threads that create independent resources concurrently. Resources are created
+            level by level of the dependency graph of the template, the resources of a level only depend on
+            resources of lower levels. Defaults to 1, resources are then created one after another.
+        bulk_teardown: Whether :meth:`delete` resets the moto backends of the account in the region (and
+            the global backends of its partition, e.g. IAM and S3) instead of deleting the resources one
+            by one. This takes the same time for any number of resources, but discards everything else
+            in those backends too, so only use it when the manager owns the mock. Defaults to False.
+        only: Logical IDs of the template resources to create. Only these resources and, transitively, the
+            resources, conditions and parameters they reference (e.g. a table referenced from the environment
+            of a function) are created, see :meth:`CloudFormationTemplateProcessor.slice`. A ValueError is raised
+            if a logical ID is not in the template. Defaults to None, all resources are then created.
+        lazy: Whether :meth:`create` only prepares the stack and the resources are created on first use instead.
+            Requests made through the session of the manager and the default boto3 session are inspected before
+            they are sent: the first request that targets a resource by its physical name (e.g. a queue URL or
+            a table name) creates the resource and its dependencies. The default session is the one current when
+            the resources are created, it is set up if it does not exist yet and dropped again when they are
+            deleted. Requests through a default session set up later (``boto3.setup_default_session()``) or
+            through other sessions are not inspected.
+            A request to a service that targets no resource of the template by name (e.g. listing the queues)
+            creates all resources of the template served by that service. Resources that no request targets,
+            such as event source mappings, can be created with :meth:`materialize`. ``max_workers`` is not used
+            in lazy mode. Defaults to False, all resources are then created by :meth:`create`.
 
     Attributes:
         is_created: Boolean indicating whether resources have been created.
+        only: The logical IDs the resources were selected by, or None if all resources are created.
+        creation_times: Time in seconds it took to create each resource, by logical ID in creation order. In lazy
+            mode, only the resources created so far.
+        deletion_time: Time in seconds the last :meth:`delete` took, or None if the resources were never deleted.
         resource_map: Internal moto ResourceMap instance for managing resources.
+        resource_table: Read-only table of the resources of the transformed template, by logical ID and type.
 
     Example:
         >>> import boto3
@@ -64,11 +110,20 @@ class AWSResourceManager:
         parameters: dict = {},
         tags: dict = {},
         cross_stack_resources: dict = {},
+        native_intrinsics: bool = False,
+        cache_dir: str | Path | None = None,
+        max_workers: int = 1,
+        bulk_teardown: bool = False,
+        only: Iterable[str] | None = None,
+        lazy: bool = False,
     ):
         import uuid
 
         from moto.cloudformation.parsing import ResourceMap
 
+        from aws_sam_testing.cfn_intrinsics import DEFAULT_PSEUDO_PARAMETERS
+        from aws_sam_testing.cfn_table import ResourceTable
+
         self.session = session
         self.template = template
         self.packaging_bucket_name = f"aws-mocks-sam-bucket-{uuid.uuid4()}"
@@ -79,13 +134,40 @@ class AWSResourceManager:
         self.parameters = parameters
         self.tags = tags
         self.cross_stack_resources = cross_stack_resources
+        self.max_workers = max_workers
+        self.bulk_teardown = bulk_teardown
+        self.only = tuple(only) if only is not None else None
+        self.lazy = lazy
         self.is_created = False
+        self.creation_times: dict[str, float] = {}
+        self.deletion_time: float | None = None
         self.resource_map: ResourceMap | None = None
+        self._pseudo_parameters = {
+            **DEFAULT_PSEUDO_PARAMETERS,
+            "AWS::AccountId": account_id,
+            "AWS::Region": self.region_name,
+            "AWS::StackId": stack_id,
+            "AWS::StackName": stack_name,
+        }
+        self._creation_plan: tuple[DependencyGraph, list[int]] | None = None
+        self._lazy_targets: tuple[dict[str, list[str]], dict[str, set[str]]] | None = None
+        self._lazy_skipped: set[str] = set()
+        self._lazy_lock = threading.RLock()
+        self._lazy_state = threading.local()
+        self._hooked_sessions: list[boto3.Session] = []
+        self._created_default_session: boto3.Session | None = None
         self.transformed_template = _transform_template(
             template=template,
             packaging_bucket_name=self.packaging_bucket_name,
             aws_account_id=self.account_id,
+            native_intrinsics=native_intrinsics,
+            parameters=parameters,
+            pseudo_parameters=self._pseudo_parameters,
+            session=session,
+            cache_dir=cache_dir,
+            only=self.only,
         )
+        self.resource_table = ResourceTable(self.transformed_template)
 
     def __enter__(self) -> "AWSResourceManager":
         """Enter the context manager and create AWS resources.
@@ -133,11 +215,56 @@ class AWSResourceManager:
             Exception: If resource deletion fails due to dependency issues
                       or AWS service limitations.
         """
+        import time
+
         if not self.is_created:
             return
 
-        self._do_delete()
+        start = time.perf_counter()
+        self._uninstall_hooks()
+        if self.bulk_teardown:
+            self._do_reset()
+        else:
+            self._do_delete()
+        self.deletion_time = time.perf_counter() - start
         self.is_created = False
+        logger.debug(f"Deleted the resources of stack {self.stack_name} in {self.deletion_time:.3f}s")
+
+    def snapshot(self) -> "MotoSnapshot":
+        """Take a snapshot of the moto backends with the created resources.
+
+        Restoring the snapshot with :meth:`restore` is much cheaper than creating the resources again,
+        e.g. to give every test a fresh copy of the same resources.
+
+        Raises:
+            ValueError: If the resources have not been created.
+
+        Returns:
+            MotoSnapshot: The snapshot of all moto backends, including the resource map of the stack.
+        """
+        from aws_sam_testing.moto_state import MotoSnapshot
+
+        if not self.is_created or self.resource_map is None:
+            raise ValueError("Resources not created")
+
+        return MotoSnapshot.take(self.resource_map)
+
+    def restore(self, snapshot: "MotoSnapshot") -> None:
+        """Restore the moto backends to a snapshot taken with :meth:`snapshot`.
+
+        The state of all moto backends is replaced, resources created after the snapshot was taken
+        are gone. The resources of the snapshot are considered created by this manager afterwards.
+
+        Args:
+            snapshot: The snapshot, it can be restored any number of times.
+        """
+        (self.resource_map,) = snapshot.restore()
+        self.is_created = True
+        # In lazy mode, resources created after the snapshot was taken are gone
+        self.creation_times = {logical_id: seconds for logical_id, seconds in self.creation_times.items() if logical_id in self.resource_map._parsed_resources}
+        if self.lazy:
+            # The session may have changed since the snapshot was taken
+            self._install_hooks()
 
     @contextmanager
     def set_environment(
@@ -156,6 +283,8 @@ class AWSResourceManager:
         if lambda_function_logical_name not in resources:
             raise ValueError(f"Lambda function {lambda_function_logical_name} not found in template")
 
+        if self.lazy:
+            self.materialize(lambda_function_logical_name)
         lambda_function = resource_map[lambda_function_logical_name]
         if lambda_function is None:
             raise ValueError(f"Lambda function {lambda_function_logical_name} not found in template")
@@ -187,8 +316,67 @@ class AWSResourceManager:
         if resource_name not in resource_map.resources:
             raise ValueError(f"Resource {resource_name} not found in template")
 
+        if self.lazy:
+            self.materialize(resource_name)
         return resource_map[resource_name]
 
+    def materialize(self, *logical_ids: str) -> list[str]:
+        """Create resources of the template and the resources they depend on, unless they exist already.
+
+        In lazy mode, use this for resources that no request targets, e.g. the event source mapping
+        that invokes a function for the messages of a queue. In eager mode, all resources already
+        exist after :meth:`create`.
+
+        Args:
+            *logical_ids: The logical IDs of the resources.
+
+        Raises:
+            ValueError: If the resources have not been created or a resource is not in the template.
+
+        Returns:
+            list[str]: The logical IDs of the resources that were created, in creation order.
+        """
+        if not self.is_created or self.resource_map is None:
+            raise ValueError("Resources not created")
+
+        graph, order = self._get_creation_plan()
+        for logical_id in logical_ids:
+            if logical_id not in graph.index:
+                raise ValueError(f"Resource {logical_id} not found in template")
+
+        created: list[str] = []
+        with self._lazy_lock:
+            resource_map = self.resource_map
+            # moto keeps the resources it created by logical ID, their dependencies exist as well
+            parsed_resources = resource_map._parsed_resources
+            required: set[int] = set()
+            queue = [graph.index[logical_id] for logical_id in logical_ids]
+            while queue:
+                node = queue.pop()
+                logical_id = graph.nodes[node]
+                if node in required or logical_id in parsed_resources or logical_id in self._lazy_skipped:
+                    continue
+                required.add(node)
+                queue.extend(graph.adjacency[node])
+
+            self._lazy_state.creating = True
+            try:
+                for node in sorted(required, key=order.__getitem__):
+                    logical_id = graph.nodes[node]
+                    instance, seconds = _create_resource(resource_map, logical_id, self.account_id, self.region_name)
+                    if instance is None:
+                        # Not supported by moto or disabled by a condition, this does not change
+                        self._lazy_skipped.add(logical_id)
+                        continue
+                    self.creation_times[logical_id] = seconds
+                    created.append(logical_id)
+            finally:
+                self._lazy_state.creating = False
+
+        if created:
+            logger.debug(f"Created resources {', '.join(created)} of stack {self.stack_name} on demand")
+        return created
+
     def _do_create(self):
         """Internal method to perform the actual resource creation.
 
@@ -202,29 +390,6 @@ class AWSResourceManager:
         from moto.cloudformation.parsing import ResourceMap
 
         s3 = self.session.client("s3")
-        iam = self.session.client("iam")
-
-        try:
-            iam.create_role(
-                RoleName="aws-mocks-lambda-role",
-                AssumeRolePolicyDocument=json.dumps(
-                    {
-                        "Version": "2012-10-17",
-                        "Statement": [
-                            {
-                                "Effect": "Allow",
-                                "Principal": {"Service": "lambda.amazonaws.com"},
-                                "Action": "sts:AssumeRole",
-                            }
-                        ],
-                    }
-                ),
-            )
-        except Exception as e:
-            if "EntityAlreadyExists" in str(e):
-                pass
-            else:
-                raise e
 
         try:
             params = {} if self.region_name == "us-east-1" else {"CreateBucketConfiguration": {"LocationConstraint": self.region_name}}
@@ -248,7 +413,25 @@ class AWSResourceManager:
             template=self.transformed_template,
             cross_stack_resources={},
         )
-        resource_map.create(self.transformed_template)
+        resource_map.tags.update(
+            {
+                "aws:cloudformation:stack-name": resource_map["AWS::StackName"],
+                "aws:cloudformation:stack-id": resource_map["AWS::StackId"],
+            }
+        )
+        if self.lazy:
+            self.creation_times = {}
+            self.resource_map = resource_map
+            self._install_hooks()
+            return
+
+        self.creation_times = _create_resources(
+            resource_map,
+            self.transformed_template,
+            account_id=self.account_id,
+            region_name=self.region_name,
+            max_workers=self.max_workers,
+        )
         self.resource_map = resource_map
 
     def _do_delete(self):
@@ -273,47 +456,336 @@ class AWSResourceManager:
             else:
                 raise e
 
+    def _do_reset(self):
+        """Internal method to discard the resources by resetting the moto backends of the account and region."""
+        from moto.utilities.utils import get_partition
+
+        from aws_sam_testing.moto_state import reset_backends
+
+        reset_backends(self.account_id, [self.region_name, get_partition(self.region_name)])
+        self.resource_map = None
+
+    def _get_creation_plan(self) -> "tuple[DependencyGraph, list[int]]":
+        """Internal method returning the dependency graph of the resources and the creation position of every node."""
+        from aws_sam_testing.cfn import CloudFormationTemplateProcessor
+
+        if self._creation_plan is None:
+            graph = CloudFormationTemplateProcessor(self.transformed_template, copy_on_write=True).get_dependency_graph()
+            order = [0] * len(graph)
+            nodes = [node for level in graph.topological_levels() for component in level for node in component]
+            for position, node in enumerate(nodes):
+                order[node] = position
+            self._creation_plan = (graph, order)
+        return self._creation_plan
+
+    def _get_lazy_targets(self) -> tuple[dict[str, list[str]], dict[str, set[str]]]:
+        """Internal method indexing the resources by their physical name, if it is known upfront, and by service."""
+        from moto.cloudformation.parsing import resource_name_property_from_type
+
+        from aws_sam_testing.cfn_intrinsics import IntrinsicEvaluator, IntrinsicResolutionError
+
+        if self._lazy_targets is None:
+            evaluator = IntrinsicEvaluator(self.transformed_template, parameters=self.parameters, pseudo_parameters=self._pseudo_parameters)
+            name_properties: dict[str, str | None] = {}
+            names: dict[str, list[str]] = {}
+            services: dict[str, set[str]] = {}
+            for logical_id, resource in (self.transformed_template.get("Resources") or {}).items():
+                resource_type = resource.get("Type") if isinstance(resource, dict) else None
+                service_name = _service_name(resource_type) if isinstance(resource_type, str) else None
+                if service_name is None:
+                    continue
+                services.setdefault(service_name, set()).add(logical_id)
+
+                if resource_type not in name_properties:
+                    name_properties[resource_type] = resource_name_property_from_type(resource_type)
+                name_property = name_properties[resource_type]
+                properties = resource.get("Properties")
+                if name_property is None or not isinstance(properties, dict) or name_property not in properties:
+                    # moto generates a random name, the resource is only created by requests to its service
+                    continue
+                try:
+                    name = evaluator.evaluate(properties[name_property])
+                except IntrinsicResolutionError:
+                    continue
+                if isinstance(name, str):
+                    names.setdefault(name, []).append(logical_id)
+            self._lazy_targets = (names, services)
+        return self._lazy_targets
+
+    def _install_hooks(self):
+        """Internal method registering the before-parameter-build hook of lazy mode with the sessions the requests are made through."""
+        self._uninstall_hooks()
+        self._get_lazy_targets()
+
+        # boto3.client() creates the default session on first use, it has to exist to carry the hook
+        if boto3.DEFAULT_SESSION is None:
+            boto3.setup_default_session()
+            self._created_default_session = boto3.DEFAULT_SESSION
+        sessions = [self.session]
+        if boto3.DEFAULT_SESSION is not self.session:
+            sessions.append(boto3.DEFAULT_SESSION)
+        for session in sessions:
+            session.events.register("before-parameter-build", self._before_parameter_build, unique_id=self._hook_id)
+        self._hooked_sessions = sessions
+
+    def _uninstall_hooks(self):
+        """Internal method removing the before-parameter-build hook of lazy mode from the sessions."""
+        for session in self._hooked_sessions:
+            session.events.unregister("before-parameter-build", unique_id=self._hook_id)
+        self._hooked_sessions = []
+
+        # Drop the default session set up by _install_hooks, unless it was replaced in the meantime
+        if self._created_default_session is not None and boto3.DEFAULT_SESSION is self._created_default_session:
+            boto3.DEFAULT_SESSION = None
+        self._created_default_session = None
+
+    @property
+    def _hook_id(self) -> str:
+        return f"aws-sam-testing-lazy-resources-{id(self)}"
+
+    def _before_parameter_build(self, model, params, **kwargs):
+        """botocore before-parameter-build handler creating the resources of the template a request targets."""
+        # Clients keep the hook after it is removed from their session
+        if not self.is_created or self.resource_map is None or getattr(self._lazy_state, "creating", False):
+            return
+
+        names, services = self._get_lazy_targets()
+        candidates = services.get(model.service_model.service_name)
+        if not candidates:
+            return
+
+        parsed_resources = self.resource_map._parsed_resources
+        pending = [logical_id for logical_id in candidates if logical_id not in parsed_resources and logical_id not in self._lazy_skipped]
+        if not pending:
+            return
+
+        targeted = dict.fromkeys(logical_id for token in _request_tokens(params) for logical_id in names.get(token, ()) if logical_id in candidates)
+        self.materialize(*(targeted or pending))
+
+
+def _create_resource(resource_map: "ResourceMap", logical_id: str, account_id: str, region_name: str) -> tuple[Any, float]:
+    """Create a resource of a moto resource map and tag it like CloudFormation does.
+
+    Args:
+        resource_map: The resource map of the stack, tagged with the stack tags.
+        logical_id: The logical ID of the resource.
+        account_id: The account the resource is created in.
+        region_name: The region the resource is created in.
+
+    Returns:
+        tuple[Any, float]: The moto model of the resource, or None if moto does not create it, and the time in seconds it took.
+    """
+    import time
+
+    from moto.ec2 import models as ec2_models
+    from moto.ec2.models.core import TaggedEC2Resource
+
+    start = time.perf_counter()
+    # The resource map is lazy, looking a resource up creates it
+    instance = resource_map[logical_id]
+    if isinstance(instance, TaggedEC2Resource):
+        tags = {**resource_map.tags, "aws:cloudformation:logical-id": logical_id}
+        ec2_models.ec2_backends[account_id][region_name].create_tags([instance.physical_resource_id], tags)
+    return instance, time.perf_counter() - start
+
+
+def _create_resources(
+    resource_map: "ResourceMap",
+    template: dict,
+    account_id: str,
+    region_name: str,
+    max_workers: int = 1,
+) -> dict[str, float]:
+    """Create the resources of a moto resource map level by level of the template dependency graph.
+
+    This replaces ``ResourceMap.create``, which creates the resources one after another. The resources of
+    a level only depend on resources of lower levels, which exist by then, so they are created concurrently.
+    Resources that form a cycle are created one after another by the same thread.
+
+    Args:
+        resource_map: The resource map of the stack, tagged with the stack tags.
+        template: The transformed template the resource map was created for.
+        account_id: The account the resources are created in.
+        region_name: The region the resources are created in.
+        max_workers: Number of threads creating the resources of a level.
+
+    Returns:
+        dict[str, float]: Time in seconds it took to create each resource, by logical ID in creation order.
+    """
+    import time
+    from concurrent.futures import ThreadPoolExecutor
+
+    from aws_sam_testing.cfn import CloudFormationTemplateProcessor
+
+    def create(logical_ids: list[str]) -> list[tuple[str, float]]:
+        return [(logical_id, _create_resource(resource_map, logical_id, account_id, region_name)[1]) for logical_id in logical_ids]
+
+    graph = CloudFormationTemplateProcessor(template, copy_on_write=True).get_dependency_graph()
+    levels = [[graph.names(component) for component in level] for level in graph.topological_levels()]
+
+    creation_times: dict[str, float] = {}
+    start = time.perf_counter()
+    if max_workers <= 1:
+        for level in levels:
+            for component in level:
+                creation_times.update(create(component))
+    else:
+        # moto creates the backend of a service for a region on first use, which is not thread-safe for all
+        # regions. The first resource of every type is created upfront, so its backends exist for the others.
+        resource_types = {logical_id: resource.get("Type") for logical_id, resource in template.get("Resources", {}).items()}
+        seen_types: set = set()
+        with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aws-resources") as executor:
+            for level in levels:
+                concurrent = []
+                for component in level:
+                    component_types = {resource_types.get(logical_id) for logical_id in component}
+                    if component_types <= seen_types:
+                        concurrent.append(component)
+                    else:
+                        seen_types.update(component_types)
+                        creation_times.update(create(component))
+                for times in executor.map(create, concurrent):
+                    creation_times.update(times)
+
+    logger.debug(f"Created {len(creation_times)} resources in {len(levels)} levels in {time.perf_counter() - start:.3f}s")
+    return creation_times
+
+
+# Services of the resource types whose botocore service name differs from the lowercased service of the type
+_SERVICE_NAMES = {
+    "CertificateManager": "acm",
+    "Cognito": "cognito-idp",
+    "ElasticLoadBalancing": "elb",
+    "ElasticLoadBalancingV2": "elbv2",
+    "Elasticsearch": "es",
+    "KinesisFirehose": "firehose",
+    "OpenSearchService": "opensearch",
+}
+
+
+def _service_name(resource_type: str) -> str | None:
+    """Return the botocore name of the service of a resource type, e.g. ``sqs`` for ``AWS::SQS::Queue``."""
+    parts = resource_type.split("::")
+    if len(parts) != 3 or parts[0] != "AWS":
+        return None
+    return _SERVICE_NAMES.get(parts[1], parts[1].lower())
+
+
+def _request_tokens(value: Any) -> Iterator[str]:
+    """Yield the strings in request parameters, and the segments of the ARNs and URLs among them."""
+    if isinstance(value, str):
+        yield value
+        if ":" in value or "/" in value:
+            yield from re.split(r"[:/]", value)
+    elif isinstance(value, dict):
+        for key, item in value.items():
+            yield from _request_tokens(key)
+            yield from _request_tokens(item)
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            yield from _request_tokens(item)
+
+
+# Bucket written into the translated template in place of the packaging bucket of the manager. The
+# bucket name is random, so using it directly would make every translation a cache miss.
+_PACKAGING_BUCKET_PLACEHOLDER = "aws-mocks-sam-bucket-placeholder"
+
 
 def _transform_template(
     template: dict,
     aws_account_id: str,
     packaging_bucket_name: str,
+    native_intrinsics: bool = False,
+    parameters: dict | None = None,
+    pseudo_parameters: dict | None = None,
+    session: boto3.Session | None = None,
+    cache_dir: str | Path | None = None,
+    only: Iterable[str] | None = None,
 ) -> dict:
     from aws_sam_testing.cfn import CloudFormationTemplateProcessor
+    from aws_sam_testing.cfn_intrinsics import DEFAULT_PSEUDO_PARAMETERS
+    from aws_sam_testing.cfn_translation import ManagedPolicyMap, translate_template
 
-    transformed_template = (
-        CloudFormationTemplateProcessor(
-            template=template,
-        )
-        .transform_cfn_tags()
-        .processed_template
+    pseudo_parameters = {**DEFAULT_PSEUDO_PARAMETERS, "AWS::AccountId": aws_account_id, **(pseudo_parameters or {})}
+    processor = CloudFormationTemplateProcessor(
+        template=template,
+        copy_on_write=True,
     )
 
-    globals = transformed_template.get("Globals", {})
-    global_environment_variables = globals.get("Function", {}).get("Environment", {}).get("Variables", {})
-
-    # Transform AWS::Serverless::Function to AWS::Lambda::Function
-    if "Resources" in transformed_template:
-        for resource_name, resource in transformed_template["Resources"].items():
-            if resource.get("Type") == "AWS::Serverless::Function":
-                # Change the type to Lambda Function
-                resource["Type"] = "AWS::Lambda::Function"
-
-                # Transform CodeUri to Code if present
-                if "Properties" in resource:
-                    props = resource["Properties"]
-                    if "CodeUri" in props:
-                        props.pop("CodeUri")
-                    props["Code"] = {
-                        "S3Bucket": packaging_bucket_name,
-                        "S3Key": f"package/{resource_name}.zip",
-                    }
-                    props["Role"] = f"arn:aws:iam::{aws_account_id}:role/aws-mocks-lambda-role"
-                    props["Environment"] = {
-                        "Variables": {
-                            **global_environment_variables,
-                            **props.get("Environment", {}).get("Variables", {}),
-                        },
-                    }
-
-    return transformed_template
+    # Resources disabled by the template conditions are not created
+    processor.prune_conditions(parameters=parameters, pseudo_parameters=pseudo_parameters)
+    if not native_intrinsics:
+        processor.transform_cfn_tags()
+
+    # The selection is sliced from the SAM template, so only the selected resources are translated
+    if only is not None:
+        processor = CloudFormationTemplateProcessor(processor.slice(only), copy_on_write=True)
+
+    if not processor.find_resources_by_type("AWS::Serverless::*"):
+        return processor.processed_template
+
+    # The code is never uploaded, point every function and layer to its would-be package.
+    # get_mutable copies the modified resources, so the source template is never changed
+    for resource_name, resource in processor.find_resources_by_type("AWS::Serverless::Function"):
+        properties = resource.get("Properties") or {}
+        if properties.get("PackageType") == "Image" or "InlineCode" in properties:
+            continue
+        if "Properties" not in resource:
+            processor.get_mutable("Resources", resource_name)["Properties"] = {}
+        props = processor.get_mutable("Resources", resource_name, "Properties")
+        props["CodeUri"] = f"s3://{_PACKAGING_BUCKET_PLACEHOLDER}/package/{resource_name}.zip"
+    for resource_name, _ in processor.find_resources_by_type("AWS::Serverless::LayerVersion"):
+        props = processor.get_mutable("Resources", resource_name, "Properties")
+        props["ContentUri"] = f"s3://{_PACKAGING_BUCKET_PLACEHOLDER}/package/{resource_name}.zip"
+
+    serverless_apis = {resource_name for resource_name, _ in processor.find_resources_by_type("AWS::Serverless::Api")}
+
+    # Without a session, policies are never loaded from IAM, the environment may hold real credentials
+    managed_policy_map: ManagedPolicyMap | None = None
+    if session is not None:
+        iam_session = session
+
+        def load_managed_policies() -> dict:
+            from samtranslator.translator.managed_policy_translator import ManagedPolicyLoader
+
+            return ManagedPolicyLoader(iam_session.client("iam")).load()
+
+        managed_policy_map = load_managed_policies
+
+    translated = CloudFormationTemplateProcessor(
+        translate_template(
+            processor.processed_template,
+            parameters=parameters,
+            region_name=pseudo_parameters["AWS::Region"],
+            account_id=aws_account_id,
+            stack_name=pseudo_parameters["AWS::StackName"],
+            managed_policy_map=managed_policy_map,
+            cache_dir=cache_dir,
+        ),
+        copy_on_write=True,
+    )
+
+    # moto cannot import the OpenAPI definitions the translator generates for the APIs (implicit or
+    # AWS::Serverless::Api): the APIs need an explicit name, and their deployments and stages cannot be created.
+    serverless_apis.add("ServerlessRestApi")
+    for resource_name, resource in translated.find_resources_by_type("AWS::ApiGateway::RestApi"):
+        properties = resource.get("Properties") or {}
+        if resource_name in serverless_apis and "Name" not in properties:
+            body = properties.get("Body")
+            title = body.get("info", {}).get("title") if isinstance(body, dict) else None
+            translated.get_mutable("Resources", resource_name, "Properties")["Name"] = title if isinstance(title, str) else resource_name
+    translated.remove_resources(
+        [
+            resource_name
+            for resource_name, resource in translated.find_resources_by_type(["AWS::ApiGateway::Deployment", "AWS::ApiGateway::Stage"])
+            if (resource.get("Properties") or {}).get("RestApiId") in [{"Ref": api} for api in serverless_apis]
+        ]
+    )
+
+    for resource_type, code_property in (("AWS::Lambda::Function", "Code"), ("AWS::Lambda::LayerVersion", "Content")):
+        for resource_name, resource in translated.find_resources_by_type(resource_type):
+            code = (resource.get("Properties") or {}).get(code_property)
+            if isinstance(code, dict) and code.get("S3Bucket") == _PACKAGING_BUCKET_PLACEHOLDER:
+                translated.get_mutable("Resources", resource_name, "Properties", code_property)["S3Bucket"] = packaging_bucket_name
+
+    return translated.processed_template
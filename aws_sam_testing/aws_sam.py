@@ -8,12 +8,13 @@ import logging
 from contextlib import contextmanager
 from enum import Enum
 from pathlib import Path
-from typing import Any, Dict, Generator, Optional, Union, cast
+from typing import Any, Dict, Generator, List, Optional, Tuple, Union
 
 import pytest
 from samcli.commands.local.cli_common.invoke_context import InvokeContext
 
 from aws_sam_testing.cfn import CloudFormationTemplateProcessor
+from aws_sam_testing.cfn_intrinsics import DEFAULT_PSEUDO_PARAMETERS
 from aws_sam_testing.core import CloudFormationTool
 
 logger = logging.getLogger(__name__)
@@ -216,11 +217,17 @@ class AWSSAMToolkit(CloudFormationTool):
     def sam_build(
         self,
         build_dir: Optional[Union[str, Path]] = None,
+        parameters: Optional[Dict[str, Any]] = None,
     ) -> Path:
         """Build the SAM application.
 
+        If parameters are given, the template conditions are evaluated against them first and the
+        resources, outputs and Fn::If branches they disable are not built,
+        see CloudFormationTemplateProcessor.prune_conditions.
+
         Args:
             build_dir (Optional[Union[str, Path]], optional): The path to the build directory.
+            parameters (Optional[Dict[str, Any]], optional): The stack parameters used to evaluate the template conditions.
 
         Returns:
             Path: The path to the build directory.
@@ -231,6 +238,10 @@ class AWSSAMToolkit(CloudFormationTool):
 
         from samcli.commands.build.build_context import BuildContext
 
+        from aws_sam_testing.cfn import dump_yaml
+
+        region = os.environ.get("AWS_REGION", "eu-west-1")
+
         if build_dir is None:
             build_dir = Path(self.working_dir) / ".aws-sam" / "aws-sam-testing-build"
         elif isinstance(build_dir, str):
@@ -243,22 +254,37 @@ class AWSSAMToolkit(CloudFormationTool):
         if not build_dir.exists():
             build_dir.mkdir(parents=True, exist_ok=True)
 
+        template_path = self.template_path
+        if parameters is not None:
+            cfn_processor = CloudFormationTemplateProcessor(self.template, copy_on_write=True)
+            result = cfn_processor.prune_conditions(parameters=parameters, pseudo_parameters={**DEFAULT_PSEUDO_PARAMETERS, "AWS::Region": region})
+            if result.conditions:
+                # The pruned template is created next to the original template, so all the relative paths are correct
+                template_path = self.template_path.parent / f"{self.template_path.stem}.pruned.temp.yaml"
+                with open(template_path, "w") as f:
+                    dump_yaml(cfn_processor.processed_template, f)
+
         # Call SAM build
-        with TemporaryDirectory() as cache_dir:
-            with BuildContext(
-                resource_identifier=None,
-                template_file=str(self.template_path),
-                base_dir=str(self.working_dir),
-                build_dir=str(build_dir),
-                cache_dir=cache_dir,
-                parallel=True,
-                mode="build",
-                cached=False,
-                clean=True,
-                use_container=False,
-                aws_region=os.environ.get("AWS_REGION", "eu-west-1"),
-            ) as ctx:
-                ctx.run()
+        try:
+            with TemporaryDirectory() as cache_dir:
+                with BuildContext(
+                    resource_identifier=None,
+                    template_file=str(template_path),
+                    base_dir=str(self.working_dir),
+                    build_dir=str(build_dir),
+                    cache_dir=cache_dir,
+                    parallel=True,
+                    mode="build",
+                    cached=False,
+                    clean=True,
+                    use_container=False,
+                    parameter_overrides=parameters,
+                    aws_region=region,
+                ) as ctx:
+                    ctx.run()
+        finally:
+            if template_path != self.template_path:
+                template_path.unlink(missing_ok=True)
 
         # Return the build directory
         return build_dir
@@ -461,7 +487,8 @@ class AWSSAMToolkit(CloudFormationTool):
         from moto.cloudformation.parsing import ResourceMap
         from samcli.commands.local.cli_common.invoke_context import InvokeContext
 
-        from aws_sam_testing.cfn import dump_yaml
+        from aws_sam_testing.cfn import PASSES_DIR_NAME, PassManager, dump_yaml
+        from aws_sam_testing.cfn_cache import default_cache_dir
         from aws_sam_testing.moto_server import MotoServer
 
         # Validate parameters
@@ -473,7 +500,22 @@ class AWSSAMToolkit(CloudFormationTool):
 
         # docker_client = docker.from_env()
 
-        cfn_processor = CloudFormationTemplateProcessor(self.template)
+        # The template passes run in memory, their outputs are memoized next to the template cache
+        passes_cache_dir = default_cache_dir(self.template_path) / PASSES_DIR_NAME
+
+        # Drop the resources disabled by the template conditions, so they are neither created nor built
+        pseudo_parameters = {**DEFAULT_PSEUDO_PARAMETERS, "AWS::Region": os.environ.get("AWS_REGION", "us-east-1")}
+        cfn_processor = (
+            # The passes only modify the template through the processor methods, so they share it
+            PassManager(cache_dir=passes_cache_dir, copy_on_write=True)
+            .add(
+                "prune_conditions",
+                lambda processor: processor.prune_conditions(parameters=parameters or {}, pseudo_parameters=pseudo_parameters),
+                inputs={"parameters": parameters or {}, "pseudo_parameters": pseudo_parameters},
+            )
+            .run(self.template)
+            .processor
+        )
 
         # Find API resources
         apis = cfn_processor.find_resources_by_type("AWS::Serverless::Api")
@@ -483,6 +525,9 @@ class AWSSAMToolkit(CloudFormationTool):
 
         api_handlers = []
         context_resources = []
+        # Patches applied to every API stack after it is sliced. They depend on the run (e.g. the port
+        # of the moto server), so they are not memoized and must not be part of the memoized slice input.
+        api_stack_patches: List[Tuple[str, Any]] = []
 
         if pytest_request_context is not None:
 
@@ -508,45 +553,38 @@ class AWSSAMToolkit(CloudFormationTool):
                 tags={},
                 region_name=os.environ.get("AWS_REGION", "us-east-1"),
                 account_id="123456789012",
-                template=self.template,
+                template=cfn_processor.processed_template,
                 cross_stack_resources={},
             )
             resource_map.load()
-            resource_map.create(self.template)
+            resource_map.create(cfn_processor.processed_template)
 
             # I am not sure if setting this as env var using SAM CLI toolkit works, check tests/third_party/test_sam_cli.py
             # I was not able to see env vars in the container and its lambda functions.
-            cfn_processor.update_template(
-                {
-                    "Globals": {
-                        "Function": {
-                            "Environment": {
-                                "Variables": {
-                                    "AWS_ENDPOINT_URL": f"http://host.docker.internal:{moto_server.port}",
-                                },
-                            },
-                        },
-                    }
-                }
-            )
+            api_stack_patches.append(("/Globals/Function/Environment/Variables/AWS_ENDPOINT_URL", f"http://host.docker.internal:{moto_server.port}"))
 
         for api in apis:
             # Each API is processed in a separate stack, so we need to create a new template for each API.
             api_logical_id = api[0]
             api_data = api[1]
 
-            # Now we need to remove the API resources and their dependencies, because sam local start-api can
-            # safely execute only stacks with a single API resource.
-            apis_to_remove = [api for api in apis if api[0] != api_logical_id]
-            api_stack_cfn_processor = CloudFormationTemplateProcessor(cfn_processor.processed_template)
-
-            if apis_to_remove:
-                # First, remove all other API resources
-                for api in apis_to_remove:
-                    api_stack_cfn_processor.remove_resource(api[0])
-                api_stack_template = cast(Dict[str, Any], api_stack_cfn_processor.processed_template.copy())
-            else:
-                api_stack_template = cast(Dict[str, Any], api_stack_cfn_processor.processed_template.copy())
+            def slice_api(processor: CloudFormationTemplateProcessor, api_logical_id: str = api_logical_id) -> Dict[str, Any]:
+                # The stack only contains the API, the functions it routes to and the resources they need,
+                # so the build and the local API only process what this API uses.
+                processor = CloudFormationTemplateProcessor(processor.slice([api_logical_id]), copy_on_write=True)
+
+                # Now we need to remove the other API resources, because sam local start-api can
+                # safely execute only stacks with a single API resource. Functions routed through
+                # several APIs pull the other APIs into the slice.
+                apis_to_remove = [api[0] for api in apis if api[0] != api_logical_id and api[0] in processor.processed_template["Resources"]]
+                if apis_to_remove:
+                    processor.remove_resources(apis_to_remove)
+                return processor.processed_template
+
+            api_stack_passes = PassManager(cache_dir=passes_cache_dir, copy_on_write=True).add("slice_api", slice_api, inputs={"api_logical_id": api_logical_id})
+            if api_stack_patches:
+                api_stack_passes.add("patch_api_stack", lambda processor: processor.apply_patches(api_stack_patches), memoize=False)
+            api_stack_template = api_stack_passes.run(cfn_processor.processed_template).template
 
             # We need to create a new template and build it so we can run the API locally
             # The file is created in the same directory as the original template so all the relative paths are correct
@@ -1,42 +1,84 @@
-import copy
-from typing import Any, Dict, List, Optional, Tuple
+import re
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple, Union
 
 import yaml
 
-from .cfn_tags import CloudFormationDumper, CloudFormationLoader
+from . import cfn_fingerprint
+from .cfn_graph import DependencyGraph
+from .cfn_intrinsics import AttributeResolver, IntrinsicEvaluator, IntrinsicResolutionError, ResourceResolver
+from .cfn_table import ResourceTable
+from .cfn_tags import CloudFormationCDumper, CloudFormationCLoader, CloudFormationIntrinsicCLoader, CloudFormationObject
+from .cfn_visitor import REMOVE, Keep, TemplateVisitor, is_intrinsic, rebuild, walk
 
+# True when the libyaml-backed loader and dumper are used, False when they fall back to pure Python.
+HAS_LIBYAML: bool = bool(getattr(yaml, "__with_libyaml__", False))
 
-def load_yaml(stream: str) -> Dict[str, Any]:
+# Matches ${Name} and ${Name.Attribute} placeholders in Fn::Sub strings, skipping ${!Literal} escapes.
+_SUB_PLACEHOLDER_PATTERN = re.compile(r"\$\{([^!}][^}]*)\}")
+
+# Resource attributes copied into the resource data returned by the find_* methods.
+_OPTIONAL_RESOURCE_FIELDS = (
+    "Properties",
+    "Metadata",
+    "DependsOn",
+    "Condition",
+    "DeletionPolicy",
+    "UpdateReplacePolicy",
+)
+
+# Template sections whose entries can reference resources.
+_INDEXED_SECTIONS = ("Resources", "Outputs", "Conditions", "Parameters")
+
+# Resource types that route events to AWS::Serverless::Function resources through their Events property.
+_EVENT_SOURCE_API_TYPES = ("AWS::Serverless::Api", "AWS::Serverless::HttpApi")
+
+# Marker for keys that are missing from a dictionary.
+_MISSING: Any = object()
+
+
+def load_yaml(stream: str, native_intrinsics: bool = False) -> Dict[str, Any]:
     """
     Load YAML content with CloudFormation tag support.
 
+    Uses the libyaml C parser when it is available and falls back to the pure-Python parser otherwise.
+
     Args:
         stream: YAML content as string
+        native_intrinsics: If True, tags are loaded directly as JSON-style intrinsic functions
+            (the same result as CloudFormationTemplateProcessor.transform_cfn_tags) instead of
+            CloudFormationObject instances
 
     Returns:
         Dict containing the parsed YAML with CloudFormation tags
     """
-    return yaml.load(stream, Loader=CloudFormationLoader)
+    return yaml.load(stream, Loader=CloudFormationIntrinsicCLoader if native_intrinsics else CloudFormationCLoader)
 
 
-def load_yaml_file(file_path: str) -> Dict[str, Any]:
+def load_yaml_file(file_path: str, native_intrinsics: bool = False) -> Dict[str, Any]:
     """
     Load YAML file with CloudFormation tag support.
 
+    Uses the libyaml C parser when it is available and falls back to the pure-Python parser otherwise.
+
     Args:
         file_path: Path to the YAML file
+        native_intrinsics: If True, tags are loaded directly as JSON-style intrinsic functions
 
     Returns:
         Dict containing the parsed YAML with CloudFormation tags
     """
     with open(file_path, "r") as f:
-        return yaml.load(f, Loader=CloudFormationLoader)
+        return yaml.load(f, Loader=CloudFormationIntrinsicCLoader if native_intrinsics else CloudFormationCLoader)
 
 
 def dump_yaml(data: Dict[str, Any], stream=None) -> Optional[str]:
     """
     Dump YAML content with CloudFormation tag support.
 
+    Uses the libyaml C emitter when it is available and falls back to the pure-Python emitter otherwise.
+
     Args:
         data: Dictionary to dump as YAML
         stream: Optional file-like object to write to
@@ -47,12 +89,344 @@ def dump_yaml(data: Dict[str, Any], stream=None) -> Optional[str]:
     return yaml.dump(
         data,
         stream=stream,
-        Dumper=CloudFormationDumper,
+        Dumper=CloudFormationCDumper,
         default_flow_style=False,
         sort_keys=False,
     )
 
 
+def _intrinsic_targets(name: Optional[str], data: Any) -> List[str]:
+    """Return the logical IDs referenced by a single Ref, Fn::GetAtt or Fn::Sub intrinsic function."""
+    if name == "Ref":
+        if isinstance(data, str):
+            return [data.split(".")[0]]
+    elif name == "Fn::GetAtt":
+        if isinstance(data, list) and len(data) > 0 and isinstance(data[0], str):
+            return [data[0]]
+        elif isinstance(data, str):
+            return [data.split(".")[0]]
+    elif name == "Fn::Sub":
+        variables: Any = {}
+        if isinstance(data, list) and len(data) > 0:
+            data, variables = data[0], data[1] if len(data) > 1 else {}
+        if isinstance(data, str):
+            local_variables = variables if isinstance(variables, dict) else {}
+            return [placeholder.split(".")[0] for placeholder in _SUB_PLACEHOLDER_PATTERN.findall(data) if placeholder not in local_variables]
+    return []
+
+
+class _ReferenceCollector(TemplateVisitor):
+    """Collects the logical IDs referenced by Ref, Fn::GetAtt and Fn::Sub."""
+
+    def __init__(self, references: Optional[set] = None) -> None:
+        self.references = references if references is not None else set()
+
+    def visit_intrinsic(self, name: str, data: Any) -> None:
+        self.references.update(_intrinsic_targets(name, data))
+
+
+class _ConditionalFinder(TemplateVisitor):
+    """Finds Fn::If functions whose condition has a known value."""
+
+    def __init__(self, conditions: Dict[str, bool]) -> None:
+        self.conditions = conditions
+        self.found = False
+
+    def visit_intrinsic(self, name: str, data: Any) -> None:
+        if name == "Fn::If" and isinstance(data, list) and data and isinstance(data[0], str) and data[0] in self.conditions:
+            self.found = self.done = True
+
+
+class _ConditionCollector(TemplateVisitor):
+    """Collects the names of the conditions used by Fn::If."""
+
+    def __init__(self, conditions: Optional[set] = None) -> None:
+        self.conditions = conditions if conditions is not None else set()
+
+    def visit_intrinsic(self, name: str, data: Any) -> None:
+        if name == "Fn::If" and isinstance(data, list) and data and isinstance(data[0], str):
+            self.conditions.add(data[0])
+
+
+class _ReferenceFinder(TemplateVisitor):
+    """Checks whether a value contains a Ref or Fn::GetAtt pointing to one of the given logical IDs."""
+
+    def __init__(self, resource_names: set) -> None:
+        self.resource_names = resource_names
+        self.found = False
+
+    def visit_intrinsic(self, name: str, data: Any) -> None:
+        if _is_reference_to(name, data, self.resource_names):
+            self.found = self.done = True
+
+
+def _collect_references(value: Any, references: set) -> set:
+    """Collect the logical IDs referenced by Ref, Fn::GetAtt and Fn::Sub in a value."""
+    walk(value, _ReferenceCollector(references))
+    return references
+
+
+def _depends_on(resource: Any) -> List[str]:
+    """Return the DependsOn entries of a resource as a list."""
+    if not isinstance(resource, dict):
+        return []
+
+    depends_on = resource.get("DependsOn")
+    if isinstance(depends_on, str):
+        return [depends_on]
+    elif isinstance(depends_on, list):
+        return [dep for dep in depends_on if isinstance(dep, str)]
+    return []
+
+
+def _entry_references(key: Tuple[str, str], value: Any) -> set:
+    """Collect the logical IDs referenced by a template entry, including DependsOn of resources."""
+    references = _collect_references(value, set())
+    if key[0] == "Resources":
+        references.update(_depends_on(value))
+    return references
+
+
+def _is_reference_to(name: Optional[str], data: Any, resource_names: set) -> bool:
+    """Check whether a Ref or Fn::GetAtt intrinsic function points to one of the given logical IDs."""
+    if name == "Ref":
+        return isinstance(data, str) and data in resource_names
+    elif name == "Fn::GetAtt":
+        if isinstance(data, list) and len(data) > 0:
+            return isinstance(data[0], str) and data[0] in resource_names
+        elif isinstance(data, str):
+            return "." in data and data.split(".")[0] in resource_names
+    return False
+
+
+def _condition_references(value: Any) -> List[str]:
+    """Collect the names of the conditions referenced from a condition definition."""
+    names: List[str] = []
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, CloudFormationObject):
+            if node.name == "Fn::Condition" and isinstance(node.data, str):
+                names.append(node.data)
+            else:
+                stack.append(node.data)
+        elif isinstance(node, dict):
+            for key, item in node.items():
+                if key in ("Condition", "Fn::Condition") and isinstance(item, str):
+                    names.append(item)
+                else:
+                    stack.append(item)
+        elif isinstance(node, list):
+            stack.extend(node)
+    return names
+
+
+def _is_no_value(value: Any) -> bool:
+    """Check whether a value is a reference to the AWS::NoValue pseudo parameter."""
+    if isinstance(value, CloudFormationObject):
+        return value.name == "Ref" and value.data == "AWS::NoValue"
+    return isinstance(value, dict) and len(value) == 1 and value.get("Ref") == "AWS::NoValue"
+
+
+def _parse_json_pointer(pointer: str) -> List[str]:
+    """Split a JSON pointer (RFC 6901) into its unescaped reference tokens."""
+    if pointer == "":
+        return []
+    if not pointer.startswith("/"):
+        raise ValueError(f"Invalid JSON pointer {pointer!r}, it must start with '/'")
+    return [token.replace("~1", "/").replace("~0", "~") for token in pointer[1:].split("/")]
+
+
+def _pointer_key(container: Any, token: str) -> Any:
+    """Return the dictionary key or list index a JSON pointer token refers to in a container."""
+    if isinstance(container, list):
+        if token == "-":
+            return len(container)
+        if not token.isdigit():
+            raise ValueError(f"Invalid list index {token!r} in JSON pointer")
+        return int(token)
+    if isinstance(container, dict):
+        return token
+    raise ValueError(f"Cannot resolve JSON pointer token {token!r} in {type(container).__name__} value")
+
+
+def _resource_data(logical_id: str, resource: dict[str, Any]) -> dict[str, Any]:
+    """Create the normalized resource dict returned by the find_* methods of the processor."""
+    resource_data = {"LogicalId": logical_id, "Type": resource["Type"]}
+
+    # Add optional fields if they exist
+    for optional_field in _OPTIONAL_RESOURCE_FIELDS:
+        if optional_field in resource:
+            resource_data[optional_field] = resource[optional_field]
+
+    return resource_data
+
+
+@dataclass
+class RemovalResult:
+    """
+    Report of the changes made by `CloudFormationTemplateProcessor.remove_resources`.
+
+    Attributes:
+        removed_resources: Logical IDs of the removed resources
+        removed_outputs: Names of the outputs removed because they referenced removed resources
+        removed_events: Mapping of AWS::Serverless::Function logical ID to the names of its removed events
+        updated_resources: Logical IDs of the resources whose references to removed resources were stripped
+    """
+
+    removed_resources: List[str] = field(default_factory=list)
+    removed_outputs: List[str] = field(default_factory=list)
+    removed_events: Dict[str, List[str]] = field(default_factory=dict)
+    updated_resources: List[str] = field(default_factory=list)
+
+
+@dataclass
+class ConditionPruningResult(RemovalResult):
+    """
+    Report of the changes made by `CloudFormationTemplateProcessor.prune_conditions`.
+
+    Besides the removal report of the disabled resources, it holds the values of the conditions.
+
+    Attributes:
+        conditions: Mapping of condition name to its value. Conditions that could not be evaluated are left out.
+        removed_conditions: Names of the conditions removed from the Conditions section
+    """
+
+    conditions: Dict[str, bool] = field(default_factory=dict)
+    removed_conditions: List[str] = field(default_factory=list)
+
+
+class _TypeIndex:
+    """
+    Index of resource logical IDs by resource type.
+
+    The index is bound to a Resources mapping and is considered current as long as the processed
+    template still holds the same mapping with the same number of resources.
+    """
+
+    def __init__(self, resources: dict[str, Any]) -> None:
+        self.resources = resources
+        self.size = len(resources)
+        self.by_type: Dict[str, List[str]] = {}
+        self.position: Dict[str, int] = {}
+        for position, (logical_id, resource) in enumerate(resources.items()):
+            if isinstance(resource, dict) and isinstance(resource.get("Type"), str):
+                self.by_type.setdefault(resource["Type"], []).append(logical_id)
+                self.position[logical_id] = position
+
+    def is_current(self, resources: dict[str, Any]) -> bool:
+        """Check whether the index still describes the given Resources mapping."""
+        return resources is self.resources and len(resources) == self.size
+
+    def remove(self, logical_ids: Iterable[str], resources: dict[str, Any]) -> None:
+        """Drop removed resources from the index and rebind it to the (possibly cloned) Resources mapping."""
+        removed = set(logical_ids)
+        for resource_type in list(self.by_type):
+            remaining = [logical_id for logical_id in self.by_type[resource_type] if logical_id not in removed]
+            if remaining:
+                self.by_type[resource_type] = remaining
+            else:
+                del self.by_type[resource_type]
+        for logical_id in removed:
+            self.position.pop(logical_id, None)
+        self.resources = resources
+        self.size = len(resources)
+
+    def lookup(self, resource_types: List[str]) -> List[str]:
+        """Return the logical IDs of resources matching any of the types, in template order."""
+        matched: List[str] = []
+        for resource_type in resource_types:
+            if resource_type.endswith("*"):
+                prefix = resource_type[:-1]
+                for indexed_type, logical_ids in self.by_type.items():
+                    if indexed_type.startswith(prefix):
+                        matched.extend(logical_ids)
+            else:
+                matched.extend(self.by_type.get(resource_type, ()))
+
+        if len(resource_types) == 1 and not resource_types[0].endswith("*"):
+            return matched
+        return sorted(set(matched), key=self.position.__getitem__)
+
+
+class _ReferenceIndex:
+    """
+    Forward and reverse index of the references between template entries.
+
+    Entries are keyed by (section, name) tuples, e.g. ("Resources", "MyFunction") or ("Outputs", "ApiUrl").
+    The forward map holds the logical IDs an entry references through Ref, Fn::GetAtt, Fn::Sub placeholders
+    and DependsOn; the reverse map holds the entries that reference a logical ID. Serverless function
+    event sources are intrinsics inside the function resource, so they are indexed with it.
+
+    The index remembers the object it indexed for every entry, so `sync` re-indexes entries that were
+    added, replaced or deleted since the last call. Entries whose nested values were edited in place are
+    the same objects, so `sync` with ``validate=True`` also re-collects the references of the remaining
+    entries and re-indexes the ones that no longer match.
+    """
+
+    def __init__(self) -> None:
+        self.forward: Dict[Tuple[str, str], set] = {}
+        self.reverse: Dict[str, set] = {}
+        self._indexed: Dict[Tuple[str, str], Any] = {}
+
+    def sync(self, template: dict[str, Any], validate: bool = False) -> None:
+        """
+        Bring the index up to date with the entries currently present in the template.
+
+        Args:
+            template: The template to index
+            validate: Whether to also check the references of entries that were indexed before,
+                to pick up nested values that were edited in place
+        """
+        seen = set()
+        for section in _INDEXED_SECTIONS:
+            entries = template.get(section)
+            if not isinstance(entries, dict):
+                continue
+            for name, value in entries.items():
+                key = (section, name)
+                seen.add(key)
+                if key not in self._indexed or self._indexed[key] is not value:
+                    self.update(key, value)
+                elif validate:
+                    references = _entry_references(key, value)
+                    if references != self.forward[key]:
+                        self.update(key, value, references)
+
+        for key in [key for key in self._indexed if key not in seen]:
+            self.discard(key)
+
+    def update(self, key: Tuple[str, str], value: Any, references: Optional[set] = None) -> None:
+        """(Re-)index a single template entry, optionally with its already collected references."""
+        self.discard(key)
+
+        if references is None:
+            references = _entry_references(key, value)
+
+        self.forward[key] = references
+        self._indexed[key] = value
+        for target in references:
+            self.reverse.setdefault(target, set()).add(key)
+
+    def discard(self, key: Tuple[str, str]) -> None:
+        """Remove a template entry from the index."""
+        self._indexed.pop(key, None)
+        for target in self.forward.pop(key, ()):
+            referrers = self.reverse.get(target)
+            if referrers is not None:
+                referrers.discard(key)
+                if not referrers:
+                    del self.reverse[target]
+
+    def invalidate(self, key: Tuple[str, str]) -> None:
+        """Mark a template entry as modified so the next `sync` re-indexes it."""
+        self._indexed.pop(key, None)
+
+    def referrers(self, logical_id: str, section: str) -> List[str]:
+        """Return the names of the entries in a section that reference the given logical ID."""
+        return sorted(name for entry_section, name in self.reverse.get(logical_id, ()) if entry_section == section)
+
+
 class ResourceMap:
     """Provides access to loaded/inferred"""
 
@@ -77,28 +451,170 @@ class CloudFormationTemplateProcessor:
     This class is used to process CloudFormation templates and manipulate resources within them.
     It provides methods to find resources by type, remove resources, and manage dependencies.
 
-    The processor maintains a processed template that is a deep copy of the original template.
-    This allows for safe manipulation of the template without modifying the original.
+    By default, the processed template is a deep copy of the original template, so it can be edited
+    freely. With ``copy_on_write=True`` the processed template is a copy-on-write view instead: creating
+    the processor only copies the top-level mapping, nested sections, resources and properties are shared
+    with the original template until a pass modifies them, at which point only the containers on the path
+    to the modification are cloned. This keeps processors cheap to create, but nothing stops a direct
+    write into a nested value of the processed template from reaching the original template, so such
+    writes are not supported with ``copy_on_write=True``: modify nested values only through the processor
+    methods, or through the container returned by `get_mutable`.
+
+    References between resources and outputs are tracked in an index that is built on first use and
+    kept up to date as resources are removed, so removing a resource only touches its referrers.
+    The index is validated against the processed template whenever it is used, so entries that are
+    added, replaced, deleted or edited in place in the processed template are picked up automatically.
     """
 
-    def __init__(self, template: dict[str, Any]):
+    def __init__(self, template: dict[str, Any], copy_on_write: bool = False):
         """
         Initialize the CloudFormation template processor.
 
         Args:
             template: The CloudFormation template dictionary to process
+            copy_on_write: Whether the processed template shares the nested containers of the template
+                until they are modified, instead of being a deep copy of it
         """
         self.template: dict[str, Any] = template
-        self.processed_template: dict[str, Any] = copy.deepcopy(template)
+        self.copy_on_write = copy_on_write
+        self.processed_template: dict[str, Any] = {}
+        self._owned: Dict[int, Any] = {}
+        self._reference_index: Optional[_ReferenceIndex] = None
+        self._type_index: Optional[_TypeIndex] = None
+        self._fingerprints: Dict[str, Tuple[Any, Any, str]] = {}
+        self._resource_table: Optional[Tuple[dict[str, Any], int, ResourceTable]] = None
+        self.reset()
 
     def reset(self):
         """
         Reset the processed template to the original template.
 
-        This method creates a deep copy of the original template and assigns it to the processed template.
+        This method assigns a deep copy, or a shallow copy-on-write view with ``copy_on_write``, of the
+        original template to the processed template.
         This allows for safe manipulation of the template without modifying the original.
         """
-        self.processed_template = copy.deepcopy(self.template)
+        # rebuild copies iteratively, so deeply nested templates do not exceed the recursion limit
+        self._set_processed_template(dict(self.template) if self.copy_on_write else rebuild(self.template))
+
+    def _set_processed_template(self, processed_template: dict[str, Any]) -> None:
+        """Replace the processed template with a template that is owned by this processor."""
+        self.processed_template = processed_template
+        self._owned = {id(processed_template): processed_template}
+        self.invalidate_indexes()
+
+    def _own(self, parent: Any, key: Any) -> Any:
+        """
+        Return the child container of an owned container, cloning it first if it is shared.
+
+        Args:
+            parent: An owned dict or list
+            key: The key or index of the child container
+
+        Returns:
+            The owned child container
+        """
+        child = parent[key]
+        if self._owned.get(id(child)) is child:
+            return child
+
+        if isinstance(child, dict):
+            child = dict(child)
+        elif isinstance(child, list):
+            child = list(child)
+        else:
+            raise TypeError(f"Cannot modify {type(child).__name__} value at {key!r} in place")
+
+        parent[key] = child
+        self._owned[id(child)] = child
+        return child
+
+    def get_mutable(self, *path: Any) -> Any:
+        """
+        Return a container of the processed template that is safe to modify in place.
+
+        Containers along the path that are still shared with the original template are cloned
+        (shallowly) and replaced in the processed template, so edits never leak into the original.
+        Cached indexes covering the returned container are invalidated.
+
+        Args:
+            *path: Keys (and list indices) leading from the template root to the container
+
+        Returns:
+            The dict or list at the given path, owned by this processor
+
+        Raises:
+            KeyError: If the path does not exist in the processed template
+            TypeError: If the path leads to a value that is not a dict or list
+
+        Example:
+            >>> processor = CloudFormationTemplateProcessor(template)
+            >>> properties = processor.get_mutable("Resources", "MyFunction", "Properties")
+            >>> del properties["Layers"]
+        """
+        container = self.processed_template
+        for key in path:
+            container = self._own(container, key)
+
+        self._invalidate_path(path)
+
+        return container
+
+    def _invalidate_path(self, path: Tuple[Any, ...]) -> None:
+        """Invalidate the cached indexes that may cover the container at the given path."""
+        if not path:
+            self.invalidate_indexes()
+            return
+
+        if path[0] not in _INDEXED_SECTIONS:
+            # Only Resources, Outputs, Conditions and Parameters are indexed
+            return
+
+        if len(path) > 1 and self._reference_index is not None:
+            # Entries that are added, replaced or deleted are picked up by the index sync,
+            # only entries modified in place need to be re-indexed
+            self._reference_index.invalidate((path[0], path[1]))
+        if path[0] == "Resources":
+            self._type_index = None
+            self._resource_table = None
+
+    def invalidate_indexes(self) -> "CloudFormationTemplateProcessor":
+        """
+        Drop the cached reference and type indexes so they are rebuilt on next use.
+
+        Call this after changing the Type of a resource directly in the processed template, the reference
+        index validates itself.
+
+        Returns:
+            Self for method chaining
+        """
+        self._reference_index = None
+        self._type_index = None
+        self._resource_table = None
+        return self
+
+    def _types(self) -> _TypeIndex:
+        """Return the resource type index, rebuilding it if the Resources section changed."""
+        resources = self.processed_template.get("Resources")
+        if not isinstance(resources, dict):
+            resources = {}
+        if self._type_index is None or not self._type_index.is_current(resources):
+            self._type_index = _TypeIndex(resources)
+        return self._type_index
+
+    def _references(self) -> _ReferenceIndex:
+        """
+        Return the reference index, validated against the processed template.
+
+        Every entry is checked, so nested values that were edited in place directly in the processed
+        template are picked up. This walks the template once per call, removals still rewrite only the
+        entries that reference the removed resources.
+        """
+        if self._reference_index is None:
+            self._reference_index = _ReferenceIndex()
+            self._reference_index.sync(self.processed_template)
+        else:
+            self._reference_index.sync(self.processed_template, validate=True)
+        return self._reference_index
 
     def load_resource_map(
         self,
@@ -138,20 +654,155 @@ class CloudFormationTemplateProcessor:
             source=resource_map,
         )
 
-    def find_resources_by_type(self, resource_type: str) -> List[Tuple[str, dict[str, Any]]]:
+    def create_evaluator(
+        self,
+        parameters: Optional[Dict[str, Any]] = None,
+        pseudo_parameters: Optional[Dict[str, Any]] = None,
+        resource_resolver: Optional[ResourceResolver] = None,
+        attribute_resolver: Optional[AttributeResolver] = None,
+    ) -> IntrinsicEvaluator:
+        """
+        Create an evaluator of intrinsic functions for the processed template.
+
+        Unlike `load_resource_map`, the evaluator does not create any resources and does not need moto.
+        It resolves parameters, pseudo parameters, mappings and conditions from the template and
+        delegates references to resources to the given resolvers.
+
+        Args:
+            parameters: Optional parameter values, overriding the defaults of the template
+            pseudo_parameters: Optional pseudo parameter values (AWS::Region, AWS::AccountId, ...)
+            resource_resolver: Optional callback returning the value of Ref for a resource
+            attribute_resolver: Optional callback returning the value of Fn::GetAtt for a resource and attribute
+
+        Returns:
+            IntrinsicEvaluator: The evaluator
+        """
+        return IntrinsicEvaluator(
+            self.processed_template,
+            parameters=parameters,
+            pseudo_parameters=pseudo_parameters,
+            resource_resolver=resource_resolver,
+            attribute_resolver=attribute_resolver,
+        )
+
+    def get_function_environment(self, logical_id: str, evaluator: Optional[IntrinsicEvaluator] = None) -> Dict[str, Any]:
+        """
+        Resolve the environment variables of a Lambda function.
+
+        The variables from Globals.Function.Environment are merged with the variables of the
+        function itself, and all intrinsic functions are evaluated.
+
+        Args:
+            logical_id: The logical ID of the AWS::Serverless::Function or AWS::Lambda::Function
+            evaluator: The evaluator to use. Defaults to `create_evaluator()` with no resolvers.
+
+        Returns:
+            Dict[str, Any]: The resolved environment variables
+
+        Raises:
+            ValueError: If the resource does not exist
+            IntrinsicResolutionError: If a variable cannot be resolved
+        """
+        _, function_data = self.find_resource_by_logical_id(logical_id)
+        if not function_data:
+            raise ValueError(f"Resource {logical_id} not found")
+
+        def variables(value: Any) -> dict[str, Any]:
+            environment = value.get("Environment") if isinstance(value, dict) else None
+            result = environment.get("Variables") if isinstance(environment, dict) else None
+            return result if isinstance(result, dict) else {}
+
+        environment = {}
+        if function_data["Type"] == "AWS::Serverless::Function":
+            environment.update(variables((self.processed_template.get("Globals") or {}).get("Function")))
+        environment.update(variables(function_data.get("Properties")))
+
+        evaluator = evaluator or self.create_evaluator()
+        return evaluator.evaluate(environment)
+
+    def get_resource_fingerprints(self, base_dir: Optional[Union[str, Path]] = None) -> Dict[str, str]:
+        """
+        Compute a stable content hash for every resource of the processed template.
+
+        A fingerprint covers the canonical form of the resource (key order does not matter, tag objects
+        and their JSON-style intrinsic functions hash the same), the Globals that apply to it and, if
+        base_dir is given, the content of the local CodeUri / ContentUri directory of functions and layers.
+        Fingerprints of resources without local code are memoized for as long as the resource and its
+        Globals are not modified.
+
+        Args:
+            base_dir: The directory local code paths are relative to, usually the template directory.
+                If None, the content of code directories is not included.
+
+        Returns:
+            Dict[str, str]: Mapping of logical ID to the hex SHA-256 fingerprint
+
+        Example:
+            >>> before = processor.get_resource_fingerprints(base_dir=template_path.parent)
+            >>> # ... edit the template or the function code ...
+            >>> after = processor.get_resource_fingerprints(base_dir=template_path.parent)
+            >>> changed = [logical_id for logical_id in after if before.get(logical_id) != after[logical_id]]
+        """
+        resources = self.processed_template.get("Resources")
+        if not isinstance(resources, dict):
+            return {}
+        globals_section = self.processed_template.get("Globals")
+
+        fingerprints: Dict[str, str] = {}
+        for logical_id, resource in resources.items():
+            resource_globals = cfn_fingerprint.resource_globals(resource, globals_section)
+            has_code = base_dir is not None and cfn_fingerprint.code_path(resource, globals_section) is not None
+            cached = self._fingerprints.get(logical_id)
+            if not has_code and cached is not None and cached[0] is resource and cached[1] is resource_globals:
+                fingerprints[logical_id] = cached[2]
+                continue
+
+            fingerprints[logical_id] = cfn_fingerprint.resource_fingerprint(resource, globals_section, base_dir)
+            if not has_code:
+                self._fingerprints[logical_id] = (resource, resource_globals, fingerprints[logical_id])
+
+        return fingerprints
+
+    def get_template_fingerprint(self, base_dir: Optional[Union[str, Path]] = None) -> str:
+        """
+        Compute a stable content hash of the whole processed template.
+
+        The fingerprint combines all sections except Resources with the fingerprints of the resources,
+        see `get_resource_fingerprints`.
+
+        Args:
+            base_dir: The directory local code paths are relative to, usually the template directory.
+                If None, the content of code directories is not included.
+
+        Returns:
+            str: The hex SHA-256 fingerprint
+        """
+        return cfn_fingerprint.fingerprint(
+            [
+                {key: value for key, value in self.processed_template.items() if key != "Resources"},
+                self.get_resource_fingerprints(base_dir),
+            ]
+        )
+
+    def find_resources_by_type(self, resource_type: Union[str, Iterable[str]]) -> List[Tuple[str, dict[str, Any]]]:
         """
         Find all resources of a specific type in the template.
 
+        Lookups are served from a type index that is built on first use and invalidated
+        whenever the processor modifies the template.
+
         Args:
             resource_type: The AWS resource type to search for (e.g., 'AWS::S3::Bucket',
-                'AWS::Lambda::Function', 'AWS::Serverless::Function')
+                'AWS::Lambda::Function', 'AWS::Serverless::Function'). A type ending with '*'
+                matches all types with that prefix (e.g., 'AWS::SageMaker::*'). An iterable
+                of types finds resources matching any of them.
 
         Returns:
-            List of tuples, where each tuple contains:
+            List of tuples in template order, where each tuple contains:
                 - logical_id (str): The logical ID of the resource
                 - resource_data (dict): Dictionary containing:
                     - 'LogicalId': The logical ID of the resource
-                    - 'Type': The resource type (same as input)
+                    - 'Type': The resource type
                     - 'Properties': The properties of the resource (if any)
                     - 'Metadata': The metadata of the resource (if any)
                     - 'DependsOn': The dependencies of the resource (if any)
@@ -165,33 +816,39 @@ class CloudFormationTemplateProcessor:
             >>> for logical_id, func_data in functions:
             ...     print(f"Function: {logical_id}")
             ...     print(f"Properties: {func_data['Properties']}")
+            >>> functions = processor.find_resources_by_type(['AWS::Lambda::Function', 'AWS::Serverless::Function'])
+            >>> sagemaker = processor.find_resources_by_type('AWS::SageMaker::*')
         """
-        resources = []
+        resources = self.processed_template.get("Resources")
+        if not isinstance(resources, dict):
+            return []
 
-        if "Resources" not in self.processed_template:
-            return resources
-
-        for logical_id, resource in self.processed_template["Resources"].items():
-            if isinstance(resource, dict) and resource.get("Type") == resource_type:
-                # Create a resource dict with all available fields
-                resource_data = {"LogicalId": logical_id, "Type": resource["Type"]}
-
-                # Add optional fields if they exist
-                optional_fields = [
-                    "Properties",
-                    "Metadata",
-                    "DependsOn",
-                    "Condition",
-                    "DeletionPolicy",
-                    "UpdateReplacePolicy",
-                ]
-                for field in optional_fields:
-                    if field in resource:
-                        resource_data[field] = resource[field]
-
-                resources.append((logical_id, resource_data))
-
-        return resources
+        resource_types = [resource_type] if isinstance(resource_type, str) else list(resource_type)
+        return [(logical_id, _resource_data(logical_id, resources[logical_id])) for logical_id in self._types().lookup(resource_types)]
+
+    def get_resource_table(self) -> ResourceTable:
+        """
+        Return an immutable table of the resources of the processed template.
+
+        The table shares the resource definitions with the processed template and hands them out as
+        read-only views, so it is cheap to build and safe to share. It is cached until the processor
+        modifies the Resources section.
+
+        Returns:
+            ResourceTable: The resource table
+
+        Example:
+            >>> table = processor.get_resource_table()
+            >>> [resource.logical_id for resource in table.of_type("AWS::Serverless::Function")]
+            ['MyFunction']
+        """
+        resources = self.processed_template.get("Resources")
+        if not isinstance(resources, dict):
+            resources = {}
+        cached = self._resource_table
+        if cached is None or cached[0] is not resources or cached[1] != len(resources):
+            cached = self._resource_table = (resources, len(resources), ResourceTable(self.processed_template))
+        return cached[2]
 
     def find_resource_by_logical_id(self, logical_id: str) -> Tuple[str, dict[str, Any]]:
         """
@@ -233,23 +890,7 @@ class CloudFormationTemplateProcessor:
         if not isinstance(resource, dict) or "Type" not in resource:
             return ("", {})
 
-        # Create a resource dict with all available fields
-        resource_data = {"LogicalId": logical_id, "Type": resource["Type"]}
-
-        # Add optional fields if they exist
-        optional_fields = [
-            "Properties",
-            "Metadata",
-            "DependsOn",
-            "Condition",
-            "DeletionPolicy",
-            "UpdateReplacePolicy",
-        ]
-        for field in optional_fields:
-            if field in resource:
-                resource_data[field] = resource[field]
-
-        return (logical_id, resource_data)
+        return (logical_id, _resource_data(logical_id, resource))
 
     def remove_resource(
         self,
@@ -272,20 +913,7 @@ class CloudFormationTemplateProcessor:
         Returns:
             Self for method chaining
         """
-        if "Resources" not in self.processed_template:
-            return self
-
-        if resource_name not in self.processed_template["Resources"]:
-            return self
-
-        # Remove events that reference this resource from serverless functions BEFORE removing references
-        self._remove_serverless_function_events_referencing_resource(resource_name)
-
-        # Remove the resource
-        del self.processed_template["Resources"][resource_name]
-
-        # Remove references from other resources
-        self._remove_references_to_resource(resource_name)
+        self.remove_resources([resource_name])
 
         if auto_remove_dependencies:
             # Only remove dependencies that were actually dependent on the removed resource
@@ -294,6 +922,300 @@ class CloudFormationTemplateProcessor:
 
         return self
 
+    def remove_resources(self, logical_ids: Iterable[str]) -> RemovalResult:
+        """
+        Remove a set of resources from the template in a single pass.
+
+        All references to the removed resources (Ref, Fn::GetAtt, DependsOn), outputs that are left
+        without a value and AWS::Serverless::Function events that use the removed resources are
+        stripped together, so every referencing resource is rewritten at most once no matter how
+        many resources are removed.
+
+        Args:
+            logical_ids: The logical IDs of the resources to remove. IDs that are not present
+                in the template are ignored.
+
+        Returns:
+            RemovalResult: Report of the resources, outputs and events that were removed
+
+        Example:
+            >>> processor = CloudFormationTemplateProcessor(template)
+            >>> result = processor.remove_resources(["ApiA", "ApiB"])
+            >>> result.removed_resources
+            ['ApiA', 'ApiB']
+        """
+        result = RemovalResult()
+
+        resources = self.processed_template.get("Resources")
+        if not isinstance(resources, dict):
+            return result
+
+        resource_names = {logical_id: None for logical_id in logical_ids if logical_id in resources}
+        if not resource_names:
+            return result
+
+        # Only the resources and outputs that reference the removed resources need to be rewritten
+        references = self._references()
+        referencing_resources: dict[str, None] = {}
+        referencing_outputs: dict[str, None] = {}
+        for resource_name in resource_names:
+            referencing_resources.update((name, None) for name in references.referrers(resource_name, "Resources") if name not in resource_names)
+            referencing_outputs.update((name, None) for name in references.referrers(resource_name, "Outputs"))
+
+        # Remove events that reference these resources from serverless functions BEFORE removing references
+        result.removed_events = self._remove_serverless_function_events_referencing_resources(set(resource_names), referencing_resources)
+
+        # Remove the resources
+        resources = self._own(self.processed_template, "Resources")
+        for resource_name in resource_names:
+            del resources[resource_name]
+        if self._type_index is not None:
+            self._type_index.remove(resource_names, resources)
+        result.removed_resources = list(resource_names)
+
+        # Remove references from other resources and outputs
+        result.updated_resources, result.removed_outputs = self._remove_references_to_resources(set(resource_names), referencing_resources, referencing_outputs)
+
+        return result
+
+    def slice(self, roots: Iterable[str]) -> dict[str, Any]:
+        """
+        Create the smallest template that still contains everything the given resources need.
+
+        The slice contains the roots and, transitively:
+        - the resources they reference through Ref, Fn::GetAtt, Fn::Sub and DependsOn
+        - for AWS::Serverless::Api and AWS::Serverless::HttpApi resources, the AWS::Serverless::Function
+          resources whose events are routed through the API
+        - the resources referenced from Globals, if the slice contains serverless resources
+        - the conditions and parameters used by the included entries
+        - the outputs that only reference included resources
+
+        Other sections (Globals, Mappings, Transform, ...) are kept as they are. The processed template
+        is not modified; the returned template shares its entries with it, so wrap it in a new processor
+        before modifying it.
+
+        Args:
+            roots: The logical IDs of the resources to keep, e.g. an API or a function
+
+        Returns:
+            dict[str, Any]: The sliced template
+
+        Raises:
+            ValueError: If a root resource does not exist
+
+        Example:
+            >>> processor = CloudFormationTemplateProcessor(template)
+            >>> api_processor = CloudFormationTemplateProcessor(processor.slice(["MyApi"]))
+        """
+        resources = self.processed_template.get("Resources")
+        if not isinstance(resources, dict):
+            resources = {}
+
+        roots = list(roots)
+        for root in roots:
+            if root not in resources:
+                raise ValueError(f"Resource {root} not found")
+
+        references = self._references()
+        included: dict[str, None] = {}
+
+        def include(logical_ids: Iterable[str]) -> None:
+            queue = [logical_id for logical_id in logical_ids if logical_id in resources and logical_id not in included]
+            included.update((logical_id, None) for logical_id in queue)
+            while queue:
+                logical_id = queue.pop()
+                resource = resources[logical_id]
+                targets = list(references.forward.get(("Resources", logical_id), ()))
+
+                if isinstance(resource, dict) and resource.get("Type") in _EVENT_SOURCE_API_TYPES:
+                    # Functions reference the API from their events, follow these references backwards
+                    for referrer in references.referrers(logical_id, "Resources"):
+                        function = resources[referrer]
+                        if isinstance(function, dict) and function.get("Type") == "AWS::Serverless::Function":
+                            events = (function.get("Properties") or {}).get("Events")
+                            if isinstance(events, dict) and any(self._event_references_resources(event, {logical_id}) for event in events.values()):
+                                targets.append(referrer)
+
+                for target in targets:
+                    if target in resources and target not in included:
+                        included[target] = None
+                        queue.append(target)
+
+        include(roots)
+
+        globals_section = self.processed_template.get("Globals")
+        if globals_section is not None and any(isinstance(resources[logical_id], dict) and str(resources[logical_id].get("Type", "")).startswith("AWS::Serverless::") for logical_id in included):
+            include(_collect_references(globals_section, set()))
+
+        sliced = dict(self.processed_template)
+        sliced["Resources"] = {logical_id: resource for logical_id, resource in resources.items() if logical_id in included}
+
+        # Outputs are kept only if all the resources they reference are in the slice
+        outputs = self.processed_template.get("Outputs")
+        if isinstance(outputs, dict):
+            kept_outputs = {name: output for name, output in outputs.items() if all(target in included for target in references.forward.get(("Outputs", name), ()) if target in resources)}
+            if kept_outputs:
+                sliced["Outputs"] = kept_outputs
+            else:
+                del sliced["Outputs"]
+
+        # Conditions used by the kept entries, and the conditions they use
+        kept_entries = list(sliced["Resources"].values()) + list((sliced.get("Outputs") or {}).values())
+        condition_names = _ConditionCollector()
+        walk(kept_entries, condition_names)
+        condition_names.conditions.update(entry["Condition"] for entry in kept_entries if isinstance(entry, dict) and isinstance(entry.get("Condition"), str))
+        if globals_section is not None:
+            walk(globals_section, condition_names)
+
+        conditions = self.processed_template.get("Conditions")
+        if isinstance(conditions, dict):
+            required = {name for name in condition_names.conditions if name in conditions}
+            queue = list(required)
+            while queue:
+                for name in _condition_references(conditions[queue.pop()]):
+                    if name in conditions and name not in required:
+                        required.add(name)
+                        queue.append(name)
+            if required:
+                sliced["Conditions"] = {name: condition for name, condition in conditions.items() if name in required}
+            else:
+                del sliced["Conditions"]
+        else:
+            required = set()
+
+        # Parameters referenced from anything that is kept
+        parameters = self.processed_template.get("Parameters")
+        if isinstance(parameters, dict):
+            used: set = set()
+            for section, names in (("Resources", included), ("Outputs", sliced.get("Outputs") or {}), ("Conditions", required)):
+                for name in names:
+                    used.update(references.forward.get((section, name), ()))
+            for section in ("Globals", "Rules", "Metadata"):
+                if section in sliced:
+                    _collect_references(sliced[section], used)
+            kept_parameters = {name: parameter for name, parameter in parameters.items() if name in used}
+            if kept_parameters:
+                sliced["Parameters"] = kept_parameters
+            else:
+                del sliced["Parameters"]
+
+        return sliced
+
+    def prune_conditions(
+        self,
+        parameters: Optional[Dict[str, Any]] = None,
+        pseudo_parameters: Optional[Dict[str, Any]] = None,
+    ) -> ConditionPruningResult:
+        """
+        Evaluate the template conditions and strip everything they disable.
+
+        Conditions (Fn::Equals, Fn::And, Fn::Or, Fn::Not and Condition) are evaluated against the given
+        parameters and the parameter defaults of the template. For every condition with a known value:
+        - resources and outputs whose Condition is false are removed, together with all references to the removed resources
+        - the Condition attribute is dropped from resources and outputs whose Condition is true
+        - Fn::If functions are replaced by the selected branch, a branch of ``!Ref AWS::NoValue`` removes the value
+        - the condition is removed from the Conditions section, unless a condition that could not be evaluated uses it
+
+        Conditions that cannot be evaluated, e.g. because they use a parameter without a value, are left
+        as they are, so the template stays valid for deployment.
+
+        Args:
+            parameters: Optional parameter values, overriding the defaults of the template
+            pseudo_parameters: Optional pseudo parameter values (AWS::Region, AWS::AccountId, ...).
+                Defaults to the values of `aws_sam_testing.cfn_intrinsics.DEFAULT_PSEUDO_PARAMETERS`.
+
+        Returns:
+            ConditionPruningResult: The condition values and the report of the removed resources and outputs
+
+        Example:
+            >>> processor = CloudFormationTemplateProcessor(template)
+            >>> result = processor.prune_conditions(parameters={"Environment": "test"})
+            >>> result.removed_resources
+            ['ProductionAlarm']
+        """
+        result = ConditionPruningResult()
+
+        conditions = self.processed_template.get("Conditions")
+        if not isinstance(conditions, dict) or not conditions:
+            return result
+
+        evaluator = self.create_evaluator(parameters=parameters, pseudo_parameters=pseudo_parameters)
+        for name in conditions:
+            try:
+                result.conditions[name] = evaluator.evaluate_condition(name)
+            except IntrinsicResolutionError:
+                continue
+        values = result.conditions
+        if not values:
+            return result
+
+        def select_branch(node):
+            """Replace a Fn::If function with a known condition by the selected branch."""
+            while is_intrinsic(node):
+                name, data = (node.name, node.data) if isinstance(node, CloudFormationObject) else next(iter(node.items()))
+                if name != "Fn::If" or not isinstance(data, list) or len(data) != 3 or not isinstance(data[0], str) or data[0] not in values:
+                    break
+                node = data[1] if values[data[0]] else data[2]
+            return REMOVE if _is_no_value(node) else node
+
+        # Resolve Fn::If first, so that the references in the dropped branches are gone before resources are removed
+        for section_name, section in list(self.processed_template.items()):
+            if section_name == "Conditions" or not isinstance(section, dict):
+                continue
+            for name, entry in list(section.items()):
+                finder = _ConditionalFinder(values)
+                walk(entry, finder)
+                if not finder.found:
+                    continue
+                updated = rebuild(entry, select_branch)
+                if updated is REMOVE:
+                    del self.get_mutable(section_name)[name]
+                else:
+                    self.get_mutable(section_name)[name] = updated
+                if section_name == "Resources":
+                    result.updated_resources.append(name)
+
+        # Remove the disabled resources and everything that references them
+        resources = self.processed_template.get("Resources")
+        if isinstance(resources, dict):
+            disabled = [logical_id for logical_id, resource in resources.items() if isinstance(resource, dict) and values.get(resource.get("Condition")) is False]
+            removal = self.remove_resources(disabled)
+            result.removed_resources = removal.removed_resources
+            result.removed_outputs = removal.removed_outputs
+            result.removed_events = removal.removed_events
+            result.updated_resources.extend(logical_id for logical_id in removal.updated_resources if logical_id not in result.updated_resources)
+
+        # Remove the disabled outputs and drop the conditions of the remaining resources and outputs
+        for section_name in ("Resources", "Outputs"):
+            section = self.processed_template.get(section_name)
+            if not isinstance(section, dict):
+                continue
+            for name, entry in list(section.items()):
+                if not isinstance(entry, dict) or entry.get("Condition") not in values:
+                    continue
+                if values[entry["Condition"]]:
+                    del self.get_mutable(section_name, name)["Condition"]
+                else:
+                    del self.get_mutable(section_name)[name]
+                    result.removed_outputs.append(name)
+
+        # Keep the conditions that could not be evaluated and the conditions they use
+        keep = [name for name in conditions if name not in values]
+        required = set(keep)
+        while keep:
+            for name in _condition_references(conditions.get(keep.pop())):
+                if name in conditions and name not in required:
+                    required.add(name)
+                    keep.append(name)
+
+        result.removed_conditions = [name for name in conditions if name not in required]
+        if required:
+            self.processed_template["Conditions"] = {name: value for name, value in conditions.items() if name in required}
+        else:
+            del self.processed_template["Conditions"]
+
+        return result
+
     def update_template(self, update: dict[str, Any]) -> "CloudFormationTemplateProcessor":
         """
         Recursively update the processed template with values from the given template.
@@ -303,6 +1225,10 @@ class CloudFormationTemplateProcessor:
         - List values are replaced entirely
         - Primitive values (str, int, bool, etc.) are replaced
 
+        Only the containers on the paths to values that actually change are cloned, the rest of
+        the template stays shared, so the cost is proportional to the size of the update. Inserted
+        values are copied, so later edits of the processed template never leak into the update.
+
         Args:
             update: Dictionary containing the updates to apply to the template
 
@@ -324,168 +1250,207 @@ class CloudFormationTemplateProcessor:
             ... })
         """
 
-        def recursive_update(target: dict[str, Any], source: dict[str, Any]) -> None:
-            """
-            Recursively update target dictionary with values from source dictionary.
-
-            Args:
-                target: The dictionary to update
-                source: The dictionary containing updates
-            """
+        # Merge iteratively, each entry is the path to a dictionary of the template and the matching part of the update
+        stack: List[Tuple[Tuple[Any, ...], dict[str, Any]]] = [((), update)]
+        while stack:
+            path, source = stack.pop()
+            target = self._get_path(path)
             for key, value in source.items():
-                if key in target and isinstance(target[key], dict) and isinstance(value, dict):
+                current = target.get(key, _MISSING)
+                if isinstance(current, dict) and isinstance(value, dict):
                     # Both are dictionaries, merge recursively
-                    recursive_update(target[key], value)
-                else:
+                    stack.append((path + (key,), value))
+                elif current is _MISSING or type(current) is not type(value) or current != value:
                     # Either key doesn't exist, or one/both values aren't dicts
-                    # Replace the value entirely
-                    target[key] = copy.deepcopy(value)
+                    # Replace the value entirely, cloning only the containers on the path to it
+                    self.get_mutable(*path)[key] = rebuild(value)
+
+        return self
+
+    def apply_patches(self, patches: Iterable[Union[dict[str, Any], Tuple[str, Any]]]) -> "CloudFormationTemplateProcessor":
+        """
+        Apply several patches to the processed template in one call.
 
-        # Perform the recursive update on the processed template
-        recursive_update(self.processed_template, update)
+        Each patch is either:
+        - a dictionary overlay, merged the same way as by `update_template`, or
+        - a ``(pointer, value)`` tuple, where pointer is a JSON pointer (RFC 6901) to the value to set.
+          Missing intermediate dictionaries are created and ``-`` appends to a list.
+
+        Patches are applied in order and, like `update_template`, clone only the containers on the
+        paths they change.
+
+        Args:
+            patches: The patches to apply
+
+        Returns:
+            Self for method chaining
+
+        Raises:
+            ValueError: If a JSON pointer is not valid
+
+        Example:
+            >>> processor = CloudFormationTemplateProcessor(template)
+            >>> processor.apply_patches([
+            ...     ("/Globals/Function/Environment/Variables/AWS_ENDPOINT_URL", "http://localhost:5000"),
+            ...     ("/Resources/MyFunction/Properties/Timeout", 30),
+            ...     {"Resources": {"MyFunction": {"Properties": {"MemorySize": 256}}}},
+            ... ])
+        """
+        for patch in patches:
+            if isinstance(patch, dict):
+                self.update_template(patch)
+            else:
+                pointer, value = patch
+                self._set_pointer(pointer, value)
 
         return self
 
-    def _remove_references_to_resource(self, resource_name: str):
-        """Remove all references to a resource from the template."""
-
-        def remove_refs_from_value(value):
-            """Recursively remove references from a value."""
-            if isinstance(value, dict):
-                # Handle Ref
-                if "Ref" in value and value["Ref"] == resource_name:
-                    return None
-                # Handle GetAtt
-                if "Fn::GetAtt" in value:
-                    if isinstance(value["Fn::GetAtt"], list) and len(value["Fn::GetAtt"]) > 0:
-                        if value["Fn::GetAtt"][0] == resource_name:
-                            return None
-                    elif isinstance(value["Fn::GetAtt"], str):
-                        if value["Fn::GetAtt"].startswith(resource_name + "."):
-                            return None
-                # Handle CloudFormation tag objects
-                if hasattr(value, "__class__") and hasattr(value, "data"):
-                    # Handle Ref tag
-                    if hasattr(value, "name") and value.name == "Ref" and value.data == resource_name:  # type: ignore[attr-defined]
-                        return None
-                    # Handle GetAtt tag
-                    if hasattr(value, "name") and value.name == "Fn::GetAtt":  # type: ignore[attr-defined]
-                        if isinstance(value.data, list) and len(value.data) > 0 and value.data[0] == resource_name:  # type: ignore[attr-defined]
-                            return None
-                        elif isinstance(value.data, str) and value.data.startswith(resource_name + "."):  # type: ignore[attr-defined]
-                            return None
-                # Recursively process dict values
-                new_dict = {}
-                for k, v in value.items():
-                    new_v = remove_refs_from_value(v)
-                    if new_v is not None:
-                        new_dict[k] = new_v
-                return new_dict
-            elif isinstance(value, list):
-                new_list = []
-                for item in value:
-                    new_item = remove_refs_from_value(item)
-                    if new_item is not None:
-                        new_list.append(new_item)
-                return new_list
-            # Handle CloudFormation tag objects at root level
-            elif hasattr(value, "__class__") and hasattr(value, "data"):
-                if hasattr(value, "name"):
-                    if value.name == "Ref" and value.data == resource_name:
-                        return None
-                    if value.name == "Fn::GetAtt":
-                        if isinstance(value.data, list) and len(value.data) > 0 and value.data[0] == resource_name:
-                            return None
-                        elif isinstance(value.data, str) and value.data.startswith(resource_name + "."):
-                            return None
-            return value
+    def _get_path(self, path: Tuple[Any, ...]) -> Any:
+        """Return the value at the given path of the processed template without taking ownership of it."""
+        value: Any = self.processed_template
+        for key in path:
+            value = value[key]
+        return value
+
+    def _set_pointer(self, pointer: str, value: Any) -> None:
+        """Set the value a JSON pointer points to, creating missing intermediate dictionaries."""
+        tokens = _parse_json_pointer(pointer)
+        if not tokens:
+            raise ValueError("Cannot replace the whole template with a JSON pointer patch")
+
+        path: Tuple[Any, ...] = ()
+        container: Any = self.processed_template
+        for token in tokens[:-1]:
+            key = _pointer_key(container, token)
+            if isinstance(container, dict) and key not in container:
+                self.get_mutable(*path)[key] = {}
+            path += (key,)
+            container = self._get_path(path)
+
+        key = _pointer_key(container, tokens[-1])
+        if isinstance(container, list) and key == len(container):
+            self.get_mutable(*path).append(rebuild(value))
+        elif not (isinstance(container, dict) and key in container and type(container[key]) is type(value) and container[key] == value):
+            self.get_mutable(*path)[key] = rebuild(value)
+
+    def _remove_references_to_resources(
+        self,
+        resource_names: set,
+        logical_ids: Optional[Iterable[str]] = None,
+        output_names: Optional[Iterable[str]] = None,
+    ) -> Tuple[List[str], List[str]]:
+        """
+        Remove all references to a set of resources from the template.
+
+        Args:
+            resource_names: The logical IDs of the removed resources
+            logical_ids: Resources to process. If None, all resources are processed.
+            output_names: Outputs to process. If None, all outputs are processed.
+
+        Returns:
+            Tuple of the logical IDs of the rewritten resources and the names of the removed outputs
+        """
+        updated_resources: List[str] = []
+        removed_outputs: List[str] = []
+
+        def remove_reference(node):
+            """Drop Ref and Fn::GetAtt intrinsic functions pointing to the removed resources."""
+            # Handle CloudFormation tag objects, their arguments are kept as they are
+            if isinstance(node, CloudFormationObject):
+                return REMOVE if _is_reference_to(node.name, node.data, resource_names) else Keep(node)
+            # Handle Ref and GetAtt
+            if "Ref" in node and _is_reference_to("Ref", node["Ref"], resource_names):
+                return REMOVE
+            if "Fn::GetAtt" in node and _is_reference_to("Fn::GetAtt", node["Fn::GetAtt"], resource_names):
+                return REMOVE
+            return node
 
         # Process all resources
         if "Resources" in self.processed_template:
-            for logical_id, resource in self.processed_template["Resources"].items():
+            resources = self._own(self.processed_template, "Resources")
+            for logical_id in list(resources) if logical_ids is None else [logical_id for logical_id in logical_ids if logical_id in resources]:
+                resource = resources[logical_id]
                 if isinstance(resource, dict):
-                    updated_resource = remove_refs_from_value(resource)
-                    if updated_resource is not None:
-                        self.processed_template["Resources"][logical_id] = updated_resource
+                    updated_resource = rebuild(resource, remove_reference)
+                    if updated_resource is not REMOVE:
+                        resources[logical_id] = updated_resource
+                        updated_resources.append(logical_id)
 
                         # Handle DependsOn specifically
                         if "DependsOn" in updated_resource:
-                            depends_on = updated_resource["DependsOn"]  # type: ignore[index]
+                            depends_on = updated_resource["DependsOn"]
                             if isinstance(depends_on, list):
-                                updated_resource["DependsOn"] = [dep for dep in depends_on if dep != resource_name]  # type: ignore[index]
-                                if not updated_resource["DependsOn"]:  # type: ignore[index]
-                                    del updated_resource["DependsOn"]  # type: ignore[misc]
-                            elif depends_on == resource_name:
-                                del updated_resource["DependsOn"]  # type: ignore[misc]
+                                updated_resource["DependsOn"] = [dep for dep in depends_on if not (isinstance(dep, str) and dep in resource_names)]
+                                if not updated_resource["DependsOn"]:
+                                    del updated_resource["DependsOn"]
+                            elif isinstance(depends_on, str) and depends_on in resource_names:
+                                del updated_resource["DependsOn"]
 
         # Process Outputs
         if "Outputs" in self.processed_template:
-            outputs_to_remove = []
-            for output_name, output_value in self.processed_template["Outputs"].items():
+            outputs = self._own(self.processed_template, "Outputs")
+            for output_name in list(outputs) if output_names is None else [output_name for output_name in output_names if output_name in outputs]:
+                output_value = outputs[output_name]
                 if isinstance(output_value, dict):
-                    updated_output = remove_refs_from_value(output_value)
-                    if updated_output is None or updated_output == {} or (isinstance(updated_output.get("Value"), dict) and not updated_output["Value"]):  # type: ignore[union-attr]
-                        outputs_to_remove.append(output_name)
+                    updated_output = rebuild(output_value, remove_reference)
+                    if updated_output is REMOVE or updated_output == {} or (isinstance(updated_output.get("Value"), dict) and not updated_output["Value"]):
+                        removed_outputs.append(output_name)
                     else:
-                        self.processed_template["Outputs"][output_name] = updated_output
-            for output_name in outputs_to_remove:
-                del self.processed_template["Outputs"][output_name]
+                        outputs[output_name] = updated_output
+            for output_name in removed_outputs:
+                del outputs[output_name]
+
+        return updated_resources, removed_outputs
+
+    def _remove_serverless_function_events_referencing_resources(self, resource_names: set, logical_ids: Optional[Iterable[str]] = None) -> Dict[str, List[str]]:
+        """
+        Remove events from AWS::Serverless::Function resources that reference any of the removed resources.
+
+        Args:
+            resource_names: The logical IDs of the removed resources
+            logical_ids: Resources to inspect. If None, all resources are inspected.
+
+        Returns:
+            Mapping of function logical ID to the names of the events removed from it
+        """
+        removed_events: Dict[str, List[str]] = {}
 
-    def _remove_serverless_function_events_referencing_resource(self, resource_name: str):
-        """Remove events from AWS::Serverless::Function resources that reference the removed resource."""
         if "Resources" not in self.processed_template:
-            return
+            return removed_events
 
-        for logical_id, resource in self.processed_template["Resources"].items():
+        resources = self.processed_template["Resources"]
+        for logical_id in list(resources) if logical_ids is None else [logical_id for logical_id in logical_ids if logical_id in resources]:
+            resource = resources[logical_id]
             if isinstance(resource, dict) and resource.get("Type") == "AWS::Serverless::Function":
                 if "Properties" in resource and "Events" in resource["Properties"]:
                     events = resource["Properties"]["Events"]
                     if isinstance(events, dict):
                         events_to_remove = []
                         for event_name, event_config in events.items():
-                            if self._event_references_resource(event_config, resource_name):
+                            if self._event_references_resources(event_config, resource_names):
                                 events_to_remove.append(event_name)
 
-                        for event_name in events_to_remove:
-                            del events[event_name]
-
-                        if not events:
-                            del resource["Properties"]["Events"]
-
-    def _event_references_resource(self, event_config, resource_name: str) -> bool:
-        """Check if an event configuration references a specific resource."""
-        if isinstance(event_config, dict):
-            for value in event_config.values():
-                if isinstance(value, dict):
-                    # Check for Ref
-                    if "Ref" in value and value["Ref"] == resource_name:
-                        return True
-                    # Check for GetAtt
-                    if "Fn::GetAtt" in value:
-                        if isinstance(value["Fn::GetAtt"], list) and len(value["Fn::GetAtt"]) > 0:
-                            if value["Fn::GetAtt"][0] == resource_name:
-                                return True
-                        elif isinstance(value["Fn::GetAtt"], str):
-                            if value["Fn::GetAtt"].startswith(resource_name + "."):
-                                return True
-                    # Recursively check nested dicts
-                    if self._event_references_resource(value, resource_name):
-                        return True
-                # Handle CloudFormation tag objects
-                elif hasattr(value, "__class__") and hasattr(value, "data"):
-                    if hasattr(value, "name"):
-                        if value.name == "Ref" and value.data == resource_name:
-                            return True
-                        if value.name == "Fn::GetAtt":
-                            if isinstance(value.data, list) and len(value.data) > 0 and value.data[0] == resource_name:
-                                return True
-                            elif isinstance(value.data, str) and value.data.startswith(resource_name + "."):
-                                return True
-                elif isinstance(value, list):
-                    for item in value:
-                        if isinstance(item, dict) and self._event_references_resource(item, resource_name):
-                            return True
-        return False
+                        if events_to_remove:
+                            properties = self.get_mutable("Resources", logical_id, "Properties")
+                            events = self._own(properties, "Events")
+                            for event_name in events_to_remove:
+                                del events[event_name]
+
+                            if not events:
+                                del properties["Events"]
+
+                            removed_events[logical_id] = events_to_remove
+
+        return removed_events
+
+    def _event_references_resources(self, event_config, resource_names: set) -> bool:
+        """Check if an event configuration references any of the given resources."""
+        if not isinstance(event_config, dict):
+            return False
+
+        finder = _ReferenceFinder(resource_names)
+        walk(event_config, finder)
+        return finder.found
 
     def remove_dependencies(
         self,
@@ -519,163 +1484,60 @@ class CloudFormationTemplateProcessor:
         islands_to_remove = self._find_circular_reference_islands(dependency_graph, externally_referenced)
 
         # Remove the islands
+        resources = self._own(self.processed_template, "Resources")
         for resource in islands_to_remove:
-            if resource in self.processed_template["Resources"]:
-                del self.processed_template["Resources"][resource]
+            if resource in resources:
+                del resources[resource]
+        if self._type_index is not None:
+            self._type_index.remove(islands_to_remove, resources)
 
         return self
 
-    def _build_dependency_graph(self) -> Dict[str, set]:
-        """Build a graph of resource dependencies."""
-        graph = {}
-
-        if "Resources" not in self.processed_template:
-            return graph
-
-        # Initialize graph with all resources
-        for resource_name in self.processed_template["Resources"]:
-            graph[resource_name] = set()
-
-        # Build dependency relationships
-        for resource_name, resource in self.processed_template["Resources"].items():
-            if isinstance(resource, dict):
-                # Find all dependencies in this resource
-                dependencies = self._find_dependencies_in_value(resource)
-                graph[resource_name] = dependencies
-
-        return graph
-
-    def _find_dependencies_in_value(self, value) -> set:
-        """Find all resource references in a value."""
-        dependencies = set()
-
-        if isinstance(value, dict):
-            # Handle Ref
-            if "Ref" in value and isinstance(value["Ref"], str):
-                ref_value = value["Ref"]
-                if "Resources" in self.processed_template and ref_value in self.processed_template["Resources"]:
-                    dependencies.add(ref_value)
-            # Handle GetAtt
-            if "Fn::GetAtt" in value:
-                if isinstance(value["Fn::GetAtt"], list) and len(value["Fn::GetAtt"]) > 0:
-                    resource_ref = value["Fn::GetAtt"][0]
-                    if "Resources" in self.processed_template and resource_ref in self.processed_template["Resources"]:
-                        dependencies.add(resource_ref)
-                elif isinstance(value["Fn::GetAtt"], str):
-                    resource_ref = value["Fn::GetAtt"].split(".")[0]
-                    if "Resources" in self.processed_template and resource_ref in self.processed_template["Resources"]:
-                        dependencies.add(resource_ref)
-            # Handle DependsOn
-            if "DependsOn" in value:
-                depends_on = value["DependsOn"]
-                if isinstance(depends_on, list):
-                    for dep in depends_on:
-                        if isinstance(dep, str) and dep in self.processed_template.get("Resources", {}):
-                            dependencies.add(dep)
-                elif isinstance(depends_on, str) and depends_on in self.processed_template.get("Resources", {}):
-                    dependencies.add(depends_on)
-            # Recursively process dict values
-            for v in value.values():
-                dependencies.update(self._find_dependencies_in_value(v))
-        elif isinstance(value, list):
-            for item in value:
-                dependencies.update(self._find_dependencies_in_value(item))
-        # Handle CloudFormation tag objects
-        elif hasattr(value, "__class__") and hasattr(value, "data") and hasattr(value, "name"):
-            if value.name == "Ref" and isinstance(value.data, str):
-                if "Resources" in self.processed_template and value.data in self.processed_template["Resources"]:
-                    dependencies.add(value.data)
-            elif value.name == "Fn::GetAtt":
-                if isinstance(value.data, list) and len(value.data) > 0:
-                    resource_ref = value.data[0]
-                    if "Resources" in self.processed_template and resource_ref in self.processed_template["Resources"]:
-                        dependencies.add(resource_ref)
-                elif isinstance(value.data, str):
-                    resource_ref = value.data.split(".")[0]
-                    if "Resources" in self.processed_template and resource_ref in self.processed_template["Resources"]:
-                        dependencies.add(resource_ref)
-            # For other CloudFormation functions, recursively check their data
-            if hasattr(value, "data"):
-                dependencies.update(self._find_dependencies_in_value(value.data))
-
-        return dependencies
+    def get_dependency_graph(self) -> DependencyGraph:
+        """
+        Build the graph of the dependencies between the resources of the template.
 
-    def _find_externally_referenced_resources(self) -> set:
-        """Find resources that are referenced from outputs, conditions, or parameters."""
-        externally_referenced = set()
+        A resource depends on the resources it references through Ref, Fn::GetAtt and Fn::Sub
+        placeholders, and on the resources listed in its DependsOn.
 
-        # Check outputs
-        if "Outputs" in self.processed_template:
-            for output_value in self.processed_template["Outputs"].values():
-                if isinstance(output_value, dict):
-                    externally_referenced.update(self._find_dependencies_in_value(output_value))
+        Returns:
+            DependencyGraph: The graph, its nodes are the logical IDs of the resources in template order
 
-        # Check conditions
-        if "Conditions" in self.processed_template:
-            for condition_value in self.processed_template["Conditions"].values():
-                externally_referenced.update(self._find_dependencies_in_value(condition_value))
+        Example:
+            >>> graph = processor.get_dependency_graph()
+            >>> [graph.names(component) for level in graph.topological_levels() for component in level]
+            [['MyRole'], ['MyTable'], ['MyFunction']]
+        """
+        return self._build_dependency_graph()
 
-        # Check parameters (for default values that might reference resources)
-        if "Parameters" in self.processed_template:
-            for param_value in self.processed_template["Parameters"].values():
-                if isinstance(param_value, dict):
-                    externally_referenced.update(self._find_dependencies_in_value(param_value))
+    def _build_dependency_graph(self) -> DependencyGraph:
+        """Build a graph of resource dependencies from the reference index."""
+        references = self._references()
+        resources = self.processed_template.get("Resources", {})
+        return DependencyGraph.from_edges({logical_id: references.forward.get(("Resources", logical_id), ()) for logical_id in resources})
 
+    def _find_externally_referenced_resources(self) -> set:
+        """Find resources that are referenced from outputs, conditions, or parameters."""
+        references = self._references()
+        externally_referenced = set()
+        for (section, _), targets in references.forward.items():
+            if section != "Resources":
+                externally_referenced.update(targets)
         return externally_referenced
 
-    def _find_circular_reference_islands(self, dependency_graph: Dict[str, set], externally_referenced: set) -> set:
-        """Find circular reference islands - groups of resources that only reference each other."""
-        islands_to_remove = set()
-        visited = set()
-
-        def find_connected_component(start_resource: str) -> set:
-            """Find all resources connected to the start resource."""
-            component = set()
-            to_visit = {start_resource}
-
-            while to_visit:
-                current = to_visit.pop()
-                if current in component:
-                    continue
-
-                component.add(current)
-
-                # Add resources that this resource depends on
-                if current in dependency_graph:
-                    to_visit.update(dependency_graph[current])
-
-                # Add resources that depend on this resource
-                for resource, deps in dependency_graph.items():
-                    if current in deps:
-                        to_visit.add(resource)
-
-            return component
-
-        # Find all connected components
-        for resource in dependency_graph:
-            if resource not in visited:
-                component = find_connected_component(resource)
-                visited.update(component)
-
-                # Check if this component is an island (not referenced externally)
-                is_island = True
-                for comp_resource in component:
-                    if comp_resource in externally_referenced:
-                        is_island = False
-                        break
-
-                    # Check if any external resource depends on this component resource
-                    for external_resource in dependency_graph:
-                        if external_resource not in component:
-                            if comp_resource in dependency_graph.get(external_resource, set()):
-                                is_island = False
-                                break
+    def _find_circular_reference_islands(self, dependency_graph: DependencyGraph, externally_referenced: set) -> set:
+        """
+        Find circular reference islands - groups of resources that only reference each other.
 
-                    if not is_island:
-                        break
+        An island is a weakly connected component of the dependency graph that contains no
+        externally referenced resource, so nothing outside of it depends on its members.
+        """
+        islands_to_remove = set()
 
-                if is_island:
-                    islands_to_remove.update(component)
+        for component in dependency_graph.weakly_connected_components():
+            members = dependency_graph.names(component)
+            if not any(member in externally_referenced for member in members):
+                islands_to_remove.update(members)
 
         return islands_to_remove
 
@@ -700,36 +1562,219 @@ class CloudFormationTemplateProcessor:
             CloudFormationTemplateProcessor: Self for method chaining
         """
 
-        def transform_value(value):
-            """Recursively transform CloudFormation tag objects to JSON intrinsic functions."""
-            # Import CloudFormationObject here to avoid circular imports
-            from .cfn_tags import CloudFormationObject
-
-            # Check if this is a CloudFormation tag object
-            if isinstance(value, CloudFormationObject):
-                # Transform the data first, then create the JSON structure
-                transformed_data = transform_value(value.data)
-
-                # Handle special cases from original to_json() method
-                name = value.name
-                if name == "Fn::GetAtt" and isinstance(transformed_data, str):
-                    transformed_data = transformed_data.split(".")
-                elif name == "Ref" and isinstance(transformed_data, str) and "." in transformed_data:
-                    name = "Fn::GetAtt"
-                    transformed_data = transformed_data.split(".")
-
-                return {name: transformed_data}
-            elif isinstance(value, dict):
-                # Recursively transform dict values
-                return {k: transform_value(v) for k, v in value.items()}
-            elif isinstance(value, list):
-                # Recursively transform list items
-                return [transform_value(item) for item in value]
-            else:
-                # Return primitive values as-is
-                return value
+        def to_intrinsic(node):
+            """Replace a CloudFormation tag object with the JSON intrinsic function, its data is transformed next."""
+            if isinstance(node, CloudFormationObject):
+                # Handles the GetAtt split and the dotted Ref rewrite, same as to_json()
+                return node.intrinsic(node.data)
+            return node
 
         # Transform the entire template
-        self.processed_template = transform_value(self.processed_template)  # type: ignore[assignment]
+        self._set_processed_template(rebuild(self.processed_template, to_intrinsic))
+
+        return self
+
+
+# Directory under the template cache directory where memoized pass outputs are stored.
+PASSES_DIR_NAME = "passes"
 
+
+@dataclass(frozen=True)
+class TemplatePass:
+    """
+    A named step of a template processing chain, run by a `PassManager`.
+
+    Attributes:
+        name: The name of the pass, part of the memoization key
+        run: Function that modifies the processor it is given in place. If it returns a template
+            (e.g. the result of `CloudFormationTemplateProcessor.slice`), the template replaces the
+            processed template for the next passes, any other return value is ignored. If the manager
+            runs with ``copy_on_write=True``, the processor shares nested values with the input template,
+            so the function must modify it only through the processor methods (e.g. `get_mutable`,
+            `apply_patches` or `update_template`) or return a new template, never by writing into
+            nested values of the processed template.
+        inputs: Everything besides the template the output depends on, e.g. parameters or the region.
+            The values are fingerprinted, so they may be any template-like values.
+        version: Change it whenever the implementation of the pass changes, so memoized outputs are not reused
+        memoize: Whether the output may be reused from disk. Passes with effects outside the template
+            (e.g. writing a build directory) must not be memoized.
+    """
+
+    name: str
+    run: Callable[[CloudFormationTemplateProcessor], Any]
+    inputs: Dict[str, Any] = field(default_factory=dict)
+    version: str = "1"
+    memoize: bool = True
+
+
+@dataclass
+class PassManagerResult:
+    """
+    Report of a `PassManager` run.
+
+    Attributes:
+        processor: The processor holding the output of the last pass
+        executed: The names of the passes that were run
+        reused: The names of the passes whose memoized output was reused instead
+    """
+
+    processor: CloudFormationTemplateProcessor
+    executed: List[str] = field(default_factory=list)
+    reused: List[str] = field(default_factory=list)
+
+    @property
+    def template(self) -> dict[str, Any]:
+        """The output template of the last pass."""
+        return self.processor.processed_template
+
+
+class PassManager:
+    """
+    Runs a chain of template passes in memory and memoizes their outputs on disk.
+
+    The template is handed from pass to pass in a single processor, so the chain never round-trips
+    through YAML files and the processor indexes are shared by all passes. The output of every
+    memoized pass is stored under a key derived from the fingerprint of the input template and the
+    names, versions and inputs of all passes up to it. When the chain runs again with the same input,
+    the longest memoized prefix is loaded from disk and only the remaining passes are run.
+
+    Memoization stops at the first pass that is not memoized: it has to run every time, and so do
+    the passes after it.
+
+    Args:
+        passes: The passes, in the order they run
+        cache_dir: Directory for the memoized outputs. If None, nothing is memoized.
+        processor_class: The processor class the passes are given, e.g. a subclass with extra passes
+        max_cache_files: Number of memoized outputs kept in the cache directory, the least recently used
+            outputs beyond it are deleted whenever outputs are written
+        copy_on_write: Whether the passes are given copy-on-write processors instead of processors holding
+            a deep copy of the template. Saves the copy, but restricts how passes may modify the template,
+            see `TemplatePass`.
+
+    Example:
+        >>> manager = PassManager(cache_dir=default_cache_dir(template_path) / PASSES_DIR_NAME)
+        >>> manager.add("prune_conditions", lambda p: p.prune_conditions(parameters), inputs={"parameters": parameters})
+        >>> manager.add("remove_unused", lambda p: p.remove_dependencies("Layer"))
+        >>> template = manager.run(load_template(template_path)).template
+    """
+
+    def __init__(
+        self,
+        passes: Iterable[TemplatePass] = (),
+        cache_dir: Optional[Union[str, Path]] = None,
+        processor_class: type = CloudFormationTemplateProcessor,
+        max_cache_files: int = 256,
+        copy_on_write: bool = False,
+    ):
+        self.passes: List[TemplatePass] = list(passes)
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.processor_class = processor_class
+        self.max_cache_files = max_cache_files
+        self.copy_on_write = copy_on_write
+
+    def add(
+        self,
+        name: str,
+        run: Callable[[CloudFormationTemplateProcessor], Any],
+        inputs: Optional[Dict[str, Any]] = None,
+        version: str = "1",
+        memoize: bool = True,
+    ) -> "PassManager":
+        """
+        Append a pass to the chain.
+
+        Args:
+            name: The name of the pass
+            run: Function that modifies the processor in place or returns a new template, see `TemplatePass`
+            inputs: Everything besides the template the output depends on
+            version: The version of the pass implementation
+            memoize: Whether the output may be reused from disk
+
+        Returns:
+            Self for method chaining
+        """
+        self.passes.append(TemplatePass(name=name, run=run, inputs=dict(inputs or {}), version=version, memoize=memoize))
         return self
+
+    def keys(self, template: dict[str, Any]) -> List[str]:
+        """
+        Return the memoization key of the output of every pass for an input template.
+
+        The key covers the processor class, as subclasses may process the same template differently.
+
+        Args:
+            template: The input template
+
+        Returns:
+            List[str]: One key per pass
+        """
+        from .cfn_cache import CACHE_FORMAT_VERSION
+
+        # Stand-ins for classes (e.g. mocks) may lack a qualified name, fall back to their own type
+        processor_class = f"{self.processor_class.__module__}.{getattr(self.processor_class, '__qualname__', type(self.processor_class).__qualname__)}"
+        key = cfn_fingerprint.fingerprint([CACHE_FORMAT_VERSION, processor_class, cfn_fingerprint.template_fingerprint(template)])
+        keys = []
+        for template_pass in self.passes:
+            key = cfn_fingerprint.fingerprint([key, template_pass.name, template_pass.version, template_pass.inputs])
+            keys.append(key)
+        return keys
+
+    def run(self, template: dict[str, Any]) -> PassManagerResult:
+        """
+        Run the chain on a template.
+
+        The template is not modified, unless the manager runs with ``copy_on_write=True`` and a pass
+        writes into nested values of the processed template directly, see `TemplatePass`.
+
+        Args:
+            template: The input template
+
+        Returns:
+            PassManagerResult: The output and the passes that were run or reused
+        """
+        import os
+        import pickle
+
+        from .cfn_cache import prune_cache_files, read_cache_file, write_cache_file
+
+        # Only the passes before the first pass that is not memoized can be reused
+        memoized = 0
+        while self.cache_dir is not None and memoized < len(self.passes) and self.passes[memoized].memoize:
+            memoized += 1
+
+        keys = self.keys(template) if memoized else []
+        start = 0
+        copy_on_write = self.copy_on_write
+        for index in reversed(range(memoized)):
+            payload = read_cache_file(self._cache_file(keys[index]), keys[index])
+            if payload is not None:
+                template = pickle.loads(payload)
+                start = index + 1
+                # The loaded template is not shared with anyone, so it never needs to be copied
+                copy_on_write = True
+                try:
+                    # Mark the output as recently used, so it is kept when the cache is pruned
+                    os.utime(self._cache_file(keys[index]))
+                except OSError:
+                    pass
+                break
+
+        result = PassManagerResult(processor=self.processor_class(template, copy_on_write=copy_on_write))
+        result.reused = [template_pass.name for template_pass in self.passes[:start]]
+        for index in range(start, len(self.passes)):
+            output = self.passes[index].run(result.processor)
+            if isinstance(output, dict):
+                result.processor = self.processor_class(output, copy_on_write=self.copy_on_write)
+            result.executed.append(self.passes[index].name)
+            if index < memoized:
+                payload = pickle.dumps(result.processor.processed_template, protocol=pickle.HIGHEST_PROTOCOL)
+                write_cache_file(self._cache_file(keys[index]), keys[index], payload)
+
+        if self.cache_dir is not None and start < memoized:
+            prune_cache_files(self.cache_dir, "*.pickle", self.max_cache_files)
+
+        return result
+
+    def _cache_file(self, key: str) -> Path:
+        assert self.cache_dir is not None
+        return self.cache_dir / f"{key}.pickle"
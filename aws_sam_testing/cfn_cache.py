@@ -0,0 +1,247 @@
+"""Persistent cache of parsed CloudFormation templates.
+
+Parsing a large template with the CloudFormation YAML loader is expensive and the same
+template is loaded many times during a test session (every toolkit and every resource
+manager parses it again). This module keeps the parsed templates in a pickled form:
+
+* in memory, in a small LRU cache shared by the whole process, and
+* on disk, under ``.aws-sam/aws-sam-testing-cache``, so that other test sessions can reuse them.
+
+Entries are keyed by the resolved template path, its size, its modification time, a
+SHA-256 hash of its content and the loader mode, so editing the template always invalidates the entry.
+Every load returns a fresh copy of the template that the caller is free to mutate.
+"""
+
+import hashlib
+import os
+import pickle
+import tempfile
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from . import cfn_tags
+
+CACHE_DIR_NAME = "aws-sam-testing-cache"
+
+# Bump whenever the parsed representation changes so that stale cache files are ignored.
+CACHE_FORMAT_VERSION = f"1-{cfn_tags.__version__}"
+
+_CacheKey = Tuple[str, int, int, str, bool]
+
+
+def default_cache_dir(template_path: Union[str, Path]) -> Path:
+    """Return the cache directory used for a template.
+
+    The cache is stored in the ``.aws-sam`` directory the template lives in (for example a
+    template from ``.aws-sam/build``) or, if there is none, in ``.aws-sam`` next to the template.
+
+    Args:
+        template_path: Path to the CloudFormation template file.
+
+    Returns:
+        Path: The cache directory.
+    """
+    template_path = Path(template_path).absolute()
+    for parent in template_path.parents:
+        if parent.name == ".aws-sam":
+            return parent / CACHE_DIR_NAME
+    return template_path.parent / ".aws-sam" / CACHE_DIR_NAME
+
+
+class TemplateCache:
+    """Two level (in-process LRU and on-disk) cache of parsed templates.
+
+    Attributes:
+        max_entries: Maximum number of templates kept in memory.
+        cache_dir: Directory for the on-disk cache. If None, :func:`default_cache_dir` is used
+            for every template. Set ``persistent`` to False to disable the on-disk cache.
+        persistent: Whether parsed templates are stored on disk.
+
+    Example:
+        >>> cache = TemplateCache()
+        >>> template = cache.load("template.yaml")  # parsed
+        >>> template = cache.load("template.yaml")  # served from memory
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        cache_dir: Optional[Union[str, Path]] = None,
+        persistent: bool = True,
+    ) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.persistent = persistent
+        self._entries: "OrderedDict[_CacheKey, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop all templates kept in memory. The on-disk cache is left untouched."""
+        self._entries.clear()
+
+    def load(self, template_path: Union[str, Path], native_intrinsics: bool = False) -> Dict[str, Any]:
+        """Load a CloudFormation template, using the cache when the file is unchanged.
+
+        Args:
+            template_path: Path to the CloudFormation template file.
+            native_intrinsics: If True, tags are loaded as JSON-style intrinsic functions,
+                see :func:`aws_sam_testing.cfn.load_yaml`.
+
+        Raises:
+            FileNotFoundError: If the template file does not exist.
+
+        Returns:
+            Dict[str, Any]: A fresh copy of the parsed template.
+        """
+        path = Path(template_path).absolute()
+        if not path.exists():
+            raise FileNotFoundError(f"Template file not found at {path}")
+
+        stat = path.stat()
+        content = path.read_bytes()
+        key: _CacheKey = (str(path), stat.st_size, stat.st_mtime_ns, hashlib.sha256(content).hexdigest(), native_intrinsics)
+
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+            return pickle.loads(payload)
+
+        payload = self._read_disk(path, key)
+        if payload is None:
+            from aws_sam_testing.cfn import load_yaml
+
+            template = load_yaml(content.decode("utf-8"), native_intrinsics=native_intrinsics)
+            payload = pickle.dumps(template, protocol=pickle.HIGHEST_PROTOCOL)
+            self._write_disk(path, key, payload)
+        else:
+            template = pickle.loads(payload)
+
+        self._entries[key] = payload
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return template
+
+    def _cache_file(self, path: Path, native_intrinsics: bool) -> Path:
+        cache_dir = self.cache_dir if self.cache_dir is not None else default_cache_dir(path)
+        suffix = "-intrinsics" if native_intrinsics else ""
+        return cache_dir / f"{hashlib.sha256(str(path).encode('utf-8')).hexdigest()}{suffix}.pickle"
+
+    def _read_disk(self, path: Path, key: _CacheKey) -> Optional[bytes]:
+        if not self.persistent:
+            return None
+        return read_cache_file(self._cache_file(path, key[4]), key)
+
+    def _write_disk(self, path: Path, key: _CacheKey, payload: bytes) -> None:
+        if not self.persistent:
+            return
+        write_cache_file(self._cache_file(path, key[4]), key, payload)
+
+
+def read_cache_file(cache_file: Path, key: Any) -> Optional[bytes]:
+    """Read the payload of a cache file written by :func:`write_cache_file`.
+
+    Args:
+        cache_file: The cache file.
+        key: The key the entry must have been written with.
+
+    Returns:
+        Optional[bytes]: The payload, or None if the file is missing, corrupted, written by another
+            cache format version or for another key.
+    """
+    try:
+        with open(cache_file, "rb") as f:
+            version, cached_key, payload = pickle.load(f)
+    except FileNotFoundError:
+        return None
+    except Exception:
+        # Corrupted or incompatible cache file, it will be overwritten
+        return None
+
+    if version != CACHE_FORMAT_VERSION or cached_key != key:
+        return None
+    return payload
+
+
+def write_cache_file(cache_file: Path, key: Any, payload: bytes) -> None:
+    """Atomically write a payload to a cache file, errors are ignored.
+
+    Args:
+        cache_file: The cache file, its directory is created if needed.
+        key: The key of the entry, it must be picklable.
+        payload: The payload.
+    """
+    try:
+        cache_file.parent.mkdir(parents=True, exist_ok=True)
+        # Write to a temporary file first so that concurrent readers never see a partial entry
+        fd, temp_name = tempfile.mkstemp(dir=cache_file.parent, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                pickle.dump((CACHE_FORMAT_VERSION, key, payload), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(temp_name, cache_file)
+        except BaseException:
+            os.unlink(temp_name)
+            raise
+    except OSError:
+        # The cache is an optimization only, e.g. the project directory may be read-only
+        pass
+
+
+def prune_cache_files(cache_dir: Path, pattern: str, max_files: int) -> int:
+    """Delete the least recently used cache files beyond a maximum number, errors are ignored.
+
+    Files are ordered by their modification time, refresh it (e.g. with ``os.utime``) when an
+    entry is reused to keep it.
+
+    Args:
+        cache_dir: The cache directory.
+        pattern: Glob pattern of the cache files in the directory, e.g. ``*.pickle``.
+        max_files: The number of most recently used files to keep.
+
+    Returns:
+        int: The number of deleted files.
+    """
+    files = []
+    for cache_file in cache_dir.glob(pattern):
+        try:
+            files.append((cache_file.stat().st_mtime_ns, cache_file))
+        except OSError:
+            continue
+    files.sort(reverse=True)
+
+    deleted = 0
+    for _, cache_file in files[max_files:]:
+        try:
+            cache_file.unlink()
+            deleted += 1
+        except OSError:
+            # Deleted concurrently or read-only, the next prune tries again
+            pass
+    return deleted
+
+
+_default_cache = TemplateCache()
+
+
+def load_template(template_path: Union[str, Path], native_intrinsics: bool = False) -> Dict[str, Any]:
+    """Load a CloudFormation template using the process-wide template cache.
+
+    Args:
+        template_path: Path to the CloudFormation template file.
+        native_intrinsics: If True, tags are loaded as JSON-style intrinsic functions.
+
+    Raises:
+        FileNotFoundError: If the template file does not exist.
+
+    Returns:
+        Dict[str, Any]: A fresh copy of the parsed template.
+    """
+    return _default_cache.load(template_path, native_intrinsics=native_intrinsics)
+
+
+def clear_template_cache() -> None:
+    """Drop all templates kept in memory by the process-wide template cache."""
+    _default_cache.clear()
@@ -0,0 +1,244 @@
+"""Structural fingerprints of CloudFormation templates.
+
+A fingerprint is a SHA-256 hash over a canonical form of a value, so it answers "did this change?"
+cheaply and reliably. It can serve as a cache key for builds, flattened layers, deployments or moto
+snapshots. The canonical form:
+
+* sorts mapping keys, so key order never changes a fingerprint,
+* converts :class:`~aws_sam_testing.cfn_tags.CloudFormationObject` tags to their JSON-style intrinsic
+  functions, so ``!GetAtt Queue.Arn`` and ``{"Fn::GetAtt": ["Queue", "Arn"]}`` have the same fingerprint,
+* encodes every scalar with its type, so ``1``, ``"1"`` and ``True`` differ.
+
+Values are traversed with an explicit stack, so deeply nested values never hit the recursion limit.
+Tag objects define ``__eq__`` but are not hashable, so fingerprints are also the way to compare or
+index them.
+
+Resource fingerprints also cover the Globals section that applies to the resource and, for
+functions and layers, the content of the local code directory (``CodeUri`` / ``ContentUri``).
+"""
+
+import hashlib
+import os
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple, Union
+
+from .cfn_tags import CloudFormationObject
+
+# Directories never included in code directory fingerprints.
+IGNORED_DIRECTORIES = ("__pycache__", ".aws-sam", ".git")
+
+# Properties pointing to local code, by resource type.
+_CODE_PROPERTIES = {
+    "AWS::Serverless::Function": "CodeUri",
+    "AWS::Serverless::LayerVersion": "ContentUri",
+    "AWS::Lambda::Function": "Code",
+    "AWS::Lambda::LayerVersion": "Content",
+}
+
+# Markers pushed on the traversal stack to close dictionaries and lists.
+_DICT_END = object()
+_LIST_END = object()
+
+# Digests of files by path, with the (inode, size, mtime_ns, ctime_ns) they were computed for, so unchanged
+# files are not read again. An edited file replaces its entry, and only the most recently used files are kept.
+_file_digests: "OrderedDict[str, Tuple[Tuple[int, int, int, int], bytes]]" = OrderedDict()
+_MAX_FILE_DIGESTS = 16384
+
+
+def _update(digest: Any, value: Any) -> None:
+    """Feed the canonical form of a value into a hash object."""
+    stack = [value]
+    while stack:
+        node = stack.pop()
+        if isinstance(node, CloudFormationObject):
+            node = node.intrinsic(node.data)
+
+        if node is _DICT_END:
+            digest.update(b"}")
+        elif node is _LIST_END:
+            digest.update(b"]")
+        elif isinstance(node, dict):
+            digest.update(b"{")
+            stack.append(_DICT_END)
+            # Push in reverse so that the entries are hashed in key order
+            for key in sorted(node, key=lambda key: (type(key).__name__, str(key)), reverse=True):
+                stack.append(node[key])
+                stack.append(key)
+        elif isinstance(node, (list, tuple)):
+            digest.update(b"[")
+            stack.append(_LIST_END)
+            stack.extend(reversed(node))
+        elif isinstance(node, str):
+            encoded = node.encode("utf-8")
+            digest.update(b"s%d:" % len(encoded))
+            digest.update(encoded)
+        elif isinstance(node, bool):
+            digest.update(b"b1" if node else b"b0")
+        elif isinstance(node, int):
+            digest.update(b"i%d;" % node)
+        elif isinstance(node, float):
+            digest.update(b"f" + repr(node).encode() + b";")
+        elif node is None:
+            digest.update(b"n")
+        else:
+            # Dates, timestamps and other YAML scalars
+            encoded = f"{type(node).__name__}:{node!r}".encode("utf-8")
+            digest.update(b"o%d:" % len(encoded))
+            digest.update(encoded)
+
+
+def fingerprint(value: Any) -> str:
+    """Compute the fingerprint of a template value.
+
+    Args:
+        value: A template, a resource, a property value or a tag object
+
+    Returns:
+        str: The hex SHA-256 digest of the canonical form of the value
+
+    Example:
+        >>> fingerprint({"B": 1, "A": load_yaml("!Ref Queue")}) == fingerprint({"A": {"Ref": "Queue"}, "B": 1})
+        True
+    """
+    digest = hashlib.sha256()
+    _update(digest, value)
+    return digest.hexdigest()
+
+
+def _file_digest(path: str, stat: os.stat_result) -> bytes:
+    key = (stat.st_ino, stat.st_size, stat.st_mtime_ns, stat.st_ctime_ns)
+    cached = _file_digests.get(path)
+    if cached is not None and cached[0] == key:
+        _file_digests.move_to_end(path)
+        return cached[1]
+
+    file_digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            file_digest.update(chunk)
+    _file_digests[path] = (key, file_digest.digest())
+    _file_digests.move_to_end(path)
+    while len(_file_digests) > _MAX_FILE_DIGESTS:
+        _file_digests.popitem(last=False)
+    return _file_digests[path][1]
+
+
+def directory_fingerprint(path: Union[str, Path]) -> Optional[str]:
+    """Compute the fingerprint of a directory tree or a single file.
+
+    The fingerprint covers the relative paths and the content of all files, directories listed in
+    IGNORED_DIRECTORIES are skipped. File contents are only read again when their size,
+    modification or change time changes.
+
+    Args:
+        path: The directory or file
+
+    Returns:
+        Optional[str]: The hex SHA-256 digest, or None if the path does not exist
+    """
+    root = os.path.abspath(path)
+    if os.path.isfile(root):
+        return hashlib.sha256(_file_digest(root, os.stat(root))).hexdigest()
+    if not os.path.isdir(root):
+        return None
+
+    digest = hashlib.sha256()
+    for directory, directories, files in os.walk(root):
+        directories[:] = sorted(name for name in directories if name not in IGNORED_DIRECTORIES)
+        for name in sorted(files):
+            file_path = os.path.join(directory, name)
+            try:
+                stat = os.stat(file_path)
+            except OSError:
+                continue
+            relative_path = os.path.relpath(file_path, root).replace(os.sep, "/").encode("utf-8")
+            digest.update(b"%d:" % len(relative_path))
+            digest.update(relative_path)
+            digest.update(_file_digest(file_path, stat))
+    return digest.hexdigest()
+
+
+def code_path(resource: Any, globals_section: Any = None) -> Optional[str]:
+    """Return the local code path of a function or layer resource.
+
+    Args:
+        resource: The resource
+        globals_section: The Globals section of the template, used for functions without a CodeUri
+
+    Returns:
+        Optional[str]: The path as written in the template, or None if the resource has no local code
+    """
+    if not isinstance(resource, dict):
+        return None
+    resource_type = resource.get("Type")
+    code_property = _CODE_PROPERTIES.get(resource_type)  # type: ignore[arg-type]
+    if code_property is None:
+        return None
+
+    properties = resource.get("Properties")
+    value = properties.get(code_property) if isinstance(properties, dict) else None
+    if value is None and resource_type == "AWS::Serverless::Function" and isinstance(globals_section, dict):
+        function_globals = globals_section.get("Function")
+        value = function_globals.get("CodeUri") if isinstance(function_globals, dict) else None
+
+    # S3 locations (s3://..., {Bucket: ..., Key: ...}) and inline code are not local paths
+    if isinstance(value, str) and "://" not in value:
+        return value
+    return None
+
+
+def resource_globals(resource: Any, globals_section: Any) -> Any:
+    """Return the part of the Globals section that applies to a resource, or None."""
+    if not isinstance(resource, dict) or not isinstance(globals_section, dict):
+        return None
+    resource_type = resource.get("Type")
+    if not isinstance(resource_type, str) or not resource_type.startswith("AWS::Serverless::"):
+        return None
+    return globals_section.get(resource_type.rsplit("::", 1)[-1])
+
+
+def resource_fingerprint(resource: Any, globals_section: Any = None, base_dir: Optional[Union[str, Path]] = None) -> str:
+    """Compute the fingerprint of a resource.
+
+    Args:
+        resource: The resource
+        globals_section: The Globals section of the template
+        base_dir: The directory local code paths are relative to, usually the template directory.
+            If None, the content of the code directory is not included.
+
+    Returns:
+        str: The hex SHA-256 digest
+    """
+    digest = hashlib.sha256()
+    _update(digest, [resource, resource_globals(resource, globals_section)])
+
+    path = code_path(resource, globals_section) if base_dir is not None else None
+    if path is not None:
+        digest.update((directory_fingerprint(Path(base_dir) / path) or "").encode())  # type: ignore[arg-type]
+
+    return digest.hexdigest()
+
+
+def template_fingerprint(template: Dict[str, Any], base_dir: Optional[Union[str, Path]] = None) -> str:
+    """Compute the fingerprint of a whole template, including the code of its functions and layers.
+
+    Args:
+        template: The template
+        base_dir: The directory local code paths are relative to, usually the template directory.
+            If None, the content of the code directories is not included.
+
+    Returns:
+        str: The hex SHA-256 digest
+    """
+    resources = template.get("Resources")
+    if not isinstance(resources, dict):
+        resources = {}
+    globals_section = template.get("Globals")
+
+    return fingerprint(
+        [
+            {key: value for key, value in template.items() if key != "Resources"},
+            {logical_id: resource_fingerprint(resource, globals_section, base_dir) for logical_id, resource in resources.items()},
+        ]
+    )
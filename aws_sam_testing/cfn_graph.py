@@ -0,0 +1,202 @@
+"""Graph algorithms for CloudFormation resource dependencies.
+
+This module provides a small directed graph engine used by the template processor.
+Nodes are addressed by integer indices and adjacency is stored in plain lists, so the
+algorithms run in linear time and do not recurse, no matter how large the template is.
+"""
+
+from typing import Iterable, List, Mapping, Sequence
+
+
+class DependencyGraph:
+    """
+    Directed graph with integer-indexed, array-backed adjacency.
+
+    An edge ``a -> b`` means that node ``a`` depends on (references) node ``b``.
+    The reverse adjacency is computed once when the graph is created.
+
+    Attributes:
+        nodes: Node names, indexed by node number.
+        index: Mapping from node name to node number.
+        adjacency: Outgoing edges (dependencies) for each node.
+        reverse_adjacency: Incoming edges (dependents) for each node.
+
+    Example:
+        >>> graph = DependencyGraph.from_edges({"Function": ["Role"], "Role": []})
+        >>> graph.names(graph.reverse_adjacency[graph.index["Role"]])
+        ['Function']
+    """
+
+    def __init__(self, nodes: Sequence[str], adjacency: Sequence[Sequence[int]]):
+        """
+        Initialize the graph.
+
+        Args:
+            nodes: Node names, indexed by node number
+            adjacency: For each node, the numbers of the nodes it depends on
+        """
+        if len(nodes) != len(adjacency):
+            raise ValueError(f"Expected adjacency for {len(nodes)} nodes, got {len(adjacency)}")
+
+        self.nodes: List[str] = list(nodes)
+        self.index: dict[str, int] = {name: number for number, name in enumerate(self.nodes)}
+        self.adjacency: List[List[int]] = [list(edges) for edges in adjacency]
+        self.reverse_adjacency: List[List[int]] = [[] for _ in self.nodes]
+        for node, edges in enumerate(self.adjacency):
+            for target in edges:
+                self.reverse_adjacency[target].append(node)
+
+    @classmethod
+    def from_edges(cls, edges: Mapping[str, Iterable[str]]) -> "DependencyGraph":
+        """
+        Create a graph from a mapping of node names to the names they depend on.
+
+        Targets that are not keys of the mapping are ignored.
+
+        Args:
+            edges: Mapping of node name to the names of its dependencies
+
+        Returns:
+            DependencyGraph: The graph
+        """
+        nodes = list(edges)
+        index = {name: number for number, name in enumerate(nodes)}
+        adjacency = [sorted({index[target] for target in targets if target in index}) for targets in edges.values()]
+        return cls(nodes, adjacency)
+
+    def __len__(self) -> int:
+        return len(self.nodes)
+
+    def names(self, numbers: Iterable[int]) -> List[str]:
+        """Translate node numbers to node names."""
+        return [self.nodes[number] for number in numbers]
+
+    def weakly_connected_components(self) -> List[List[int]]:
+        """
+        Find the weakly connected components of the graph using union-find.
+
+        Two nodes are in the same component if they are connected by edges in either direction.
+
+        Returns:
+            List of components, each a list of node numbers in ascending order
+        """
+        parent = list(range(len(self.nodes)))
+        size = [1] * len(self.nodes)
+
+        def find(node: int) -> int:
+            while parent[node] != node:
+                parent[node] = parent[parent[node]]
+                node = parent[node]
+            return node
+
+        for node, edges in enumerate(self.adjacency):
+            for target in edges:
+                a, b = find(node), find(target)
+                if a == b:
+                    continue
+                if size[a] < size[b]:
+                    a, b = b, a
+                parent[b] = a
+                size[a] += size[b]
+
+        components: dict[int, List[int]] = {}
+        for node in range(len(self.nodes)):
+            components.setdefault(find(node), []).append(node)
+        return list(components.values())
+
+    def strongly_connected_components(self) -> List[List[int]]:
+        """
+        Find the strongly connected components of the graph using an iterative Tarjan's algorithm.
+
+        Components are returned in reverse topological order: every component comes after
+        the components it depends on.
+
+        Returns:
+            List of components, each a list of node numbers
+        """
+        count = len(self.nodes)
+        order = [-1] * count
+        low = [0] * count
+        on_stack = [False] * count
+        stack: List[int] = []
+        components: List[List[int]] = []
+        counter = 0
+
+        for root in range(count):
+            if order[root] != -1:
+                continue
+
+            order[root] = low[root] = counter
+            counter += 1
+            stack.append(root)
+            on_stack[root] = True
+            work = [(root, 0)]
+
+            while work:
+                node, position = work[-1]
+                edges = self.adjacency[node]
+                if position < len(edges):
+                    work[-1] = (node, position + 1)
+                    target = edges[position]
+                    if order[target] == -1:
+                        order[target] = low[target] = counter
+                        counter += 1
+                        stack.append(target)
+                        on_stack[target] = True
+                        work.append((target, 0))
+                    elif on_stack[target] and order[target] < low[node]:
+                        low[node] = order[target]
+                    continue
+
+                work.pop()
+                if work:
+                    caller = work[-1][0]
+                    if low[node] < low[caller]:
+                        low[caller] = low[node]
+
+                if low[node] == order[node]:
+                    component = []
+                    while True:
+                        member = stack.pop()
+                        on_stack[member] = False
+                        component.append(member)
+                        if member == node:
+                            break
+                    components.append(component)
+
+        return components
+
+    def topological_levels(self) -> List[List[List[int]]]:
+        """
+        Group the strongly connected components of the graph by dependency depth.
+
+        The components of level 0 have no dependencies, the components of any other level only
+        depend on components of lower levels, so the components of a level are independent of
+        each other. A component has more than one node only if its nodes form a cycle.
+
+        Returns:
+            List of levels, each a list of components ordered by their first node, each a list of node numbers in ascending order
+        """
+        components = self.strongly_connected_components()
+        component_of = [0] * len(self.nodes)
+        for number, component in enumerate(components):
+            for node in component:
+                component_of[node] = number
+
+        # Components come after the components they depend on, so their depth is known when they are reached
+        depth = [0] * len(components)
+        levels: List[List[List[int]]] = []
+        for number, component in enumerate(components):
+            level = 0
+            for node in component:
+                for target in self.adjacency[node]:
+                    if component_of[target] != number and depth[component_of[target]] >= level:
+                        level = depth[component_of[target]] + 1
+            depth[number] = level
+            while len(levels) <= level:
+                levels.append([])
+            levels[level].append(sorted(component))
+
+        for level_components in levels:
+            level_components.sort()
+        return levels
@@ -0,0 +1,377 @@
+"""Local evaluation of CloudFormation intrinsic functions.
+
+Resolving a value such as ``!Sub "arn:aws:lambda:${AWS::Region}:${AWS::AccountId}:layer:${LayerName}:1"``
+does not need a CloudFormation engine: parameters, pseudo parameters, mappings and conditions are all
+in the template. :class:`IntrinsicEvaluator` evaluates intrinsic functions without moto or any other
+dependency. Values that only exist once resources are created (``Ref`` to a resource, ``Fn::GetAtt``)
+are delegated to pluggable resolvers.
+
+Supported functions: ``Ref``, ``Fn::GetAtt``, ``Fn::Sub`` (including the variable map form),
+``Fn::Join``, ``Fn::Select``, ``Fn::Split``, ``Fn::If``, ``Fn::FindInMap``, ``Fn::Base64``,
+``Fn::GetAZs`` and the condition functions ``Fn::Equals``, ``Fn::And``, ``Fn::Or``, ``Fn::Not``
+and ``Condition``. Both tag objects (``!Ref Bucket``) and JSON-style dictionaries (``{"Ref": "Bucket"}``)
+are supported.
+"""
+
+import base64
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from .cfn_tags import CloudFormationObject
+from .cfn_visitor import is_intrinsic_key
+
+_SUB_VARIABLE_PATTERN = re.compile(r"\$\{([^}]*)\}")
+
+_CONDITION_FUNCTIONS = ("Fn::Equals", "Fn::And", "Fn::Or", "Fn::Not", "Fn::Condition", "Condition")
+
+
+class _NoValue:
+    def __repr__(self) -> str:
+        return "AWS::NoValue"
+
+
+NO_VALUE: Any = _NoValue()
+"""Result of ``{"Ref": "AWS::NoValue"}``, dropped from the dictionaries and lists that contain it."""
+
+DEFAULT_PSEUDO_PARAMETERS: Dict[str, Any] = {
+    "AWS::AccountId": "123456789012",
+    "AWS::NotificationARNs": [],
+    "AWS::Partition": "aws",
+    "AWS::Region": "us-east-1",
+    "AWS::StackId": "arn:aws:cloudformation:us-east-1:123456789012:stack/my-stack/stack-123",
+    "AWS::StackName": "my-stack",
+    "AWS::URLSuffix": "amazonaws.com",
+}
+
+ResourceResolver = Callable[[str], Any]
+"""Returns the value of ``Ref`` for a resource logical ID."""
+
+AttributeResolver = Callable[[str, str], Any]
+"""Returns the value of ``Fn::GetAtt`` for a resource logical ID and an attribute name."""
+
+
+class IntrinsicResolutionError(ValueError):
+    """Raised when an intrinsic function cannot be evaluated.
+
+    Attributes:
+        names: The parameters, resources or variables that could not be resolved, if any.
+    """
+
+    def __init__(self, message: str, names: Optional[List[str]] = None):
+        super().__init__(message)
+        self.names: List[str] = names or []
+
+
+def _intrinsic(value: Any) -> Optional[Tuple[str, Any]]:
+    """Return the (name, data) of an intrinsic function node, or None if the value is not one."""
+    if isinstance(value, CloudFormationObject):
+        return value.name, value.data  # type: ignore[return-value]
+    if isinstance(value, dict) and len(value) == 1:
+        name, data = next(iter(value.items()))
+        if is_intrinsic_key(name) or name == "Condition":
+            return name, data
+    return None
+
+
+def _to_string(value: Any) -> str:
+    """Convert a scalar to the string CloudFormation would use."""
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, (str, int, float)):
+        return str(value)
+    raise IntrinsicResolutionError(f"Expected a string, got {type(value).__name__}: {value!r}")
+
+
+class IntrinsicEvaluator:
+    """Evaluates CloudFormation intrinsic functions against a template.
+
+    Results are memoized per template node, so evaluating the same value repeatedly is cheap.
+    Evaluated values must not be modified by the caller.
+
+    Args:
+        template: The template providing Parameters, Mappings and Conditions. Defaults to an empty template.
+        parameters: Parameter values, overriding the parameter defaults of the template.
+        pseudo_parameters: Values of the pseudo parameters (``AWS::Region``, ...). Defaults to
+            DEFAULT_PSEUDO_PARAMETERS. Pseudo parameters that are left out cannot be resolved.
+        resource_resolver: Resolves ``Ref`` to a resource. If None, such references cannot be resolved.
+        attribute_resolver: Resolves ``Fn::GetAtt``. If None, attributes cannot be resolved.
+
+    Raises:
+        IntrinsicResolutionError: From evaluate() when a value cannot be evaluated.
+
+    Example:
+        >>> evaluator = IntrinsicEvaluator(
+        ...     template,
+        ...     parameters={"Stage": "test"},
+        ...     attribute_resolver=lambda logical_id, attribute: f"arn:aws:sqs:us-east-1:123456789012:{logical_id}",
+        ... )
+        >>> evaluator.evaluate({"Fn::Sub": "${AWS::StackName}-${Stage}"})
+        'my-stack-test'
+    """
+
+    def __init__(
+        self,
+        template: Optional[Dict[str, Any]] = None,
+        parameters: Optional[Dict[str, Any]] = None,
+        pseudo_parameters: Optional[Dict[str, Any]] = None,
+        resource_resolver: Optional[ResourceResolver] = None,
+        attribute_resolver: Optional[AttributeResolver] = None,
+    ):
+        self.template: Dict[str, Any] = template or {}
+        self.pseudo_parameters: Dict[str, Any] = dict(DEFAULT_PSEUDO_PARAMETERS if pseudo_parameters is None else pseudo_parameters)
+        self.pseudo_parameters["AWS::NoValue"] = NO_VALUE
+        self.resource_resolver = resource_resolver
+        self.attribute_resolver = attribute_resolver
+        self.parameters: Dict[str, Any] = self._parameter_values(parameters or {})
+        self._cache: Dict[int, Tuple[Any, Any]] = {}
+        self._conditions: Dict[str, bool] = {}
+        self._evaluating: set = set()
+        self._functions: Dict[str, Callable[[Any], Any]] = {
+            "Ref": self._ref,
+            "Fn::GetAtt": self._get_att,
+            "Fn::Sub": self._sub,
+            "Fn::Join": self._join,
+            "Fn::Select": self._select,
+            "Fn::Split": self._split,
+            "Fn::If": self._if,
+            "Fn::FindInMap": self._find_in_map,
+            "Fn::Base64": self._base64,
+            "Fn::GetAZs": self._get_azs,
+        }
+
+    def _parameter_values(self, parameters: Dict[str, Any]) -> Dict[str, Any]:
+        """Combine the parameter defaults of the template with the given values."""
+        values: Dict[str, Any] = {}
+        declarations = self.template.get("Parameters") or {}
+        for name, declaration in declarations.items():
+            if name in parameters:
+                value = parameters[name]
+            elif isinstance(declaration, dict) and "Default" in declaration:
+                value = declaration["Default"]
+            else:
+                continue
+
+            parameter_type = declaration.get("Type", "") if isinstance(declaration, dict) else ""
+            if isinstance(value, str) and (parameter_type == "CommaDelimitedList" or parameter_type.startswith("List<")):
+                value = [item.strip() for item in value.split(",")]
+            values[name] = value
+
+        for name, value in parameters.items():
+            values.setdefault(name, value)
+        return values
+
+    def evaluate(self, value: Any) -> Any:
+        """Evaluate all intrinsic functions in a value.
+
+        Args:
+            value: A template value, e.g. a property value or a whole resource
+
+        Returns:
+            The value with all intrinsic functions replaced by their results. Entries that evaluate
+            to ``AWS::NoValue`` are dropped from dictionaries and lists.
+
+        Raises:
+            IntrinsicResolutionError: If an intrinsic function cannot be evaluated
+        """
+        if not isinstance(value, (dict, list, CloudFormationObject)):
+            return value
+
+        cached = self._cache.get(id(value))
+        if cached is not None and cached[0] is value:
+            return cached[1]
+
+        intrinsic = _intrinsic(value)
+        if intrinsic is not None:
+            name, data = intrinsic
+            if name in _CONDITION_FUNCTIONS:
+                result = self._condition(value)
+            elif name in self._functions:
+                result = self._functions[name](data)
+            else:
+                raise IntrinsicResolutionError(f"Unsupported intrinsic function {name}")
+        elif isinstance(value, dict):
+            result = {}
+            for key, item in value.items():
+                item = self.evaluate(item)
+                if item is not NO_VALUE:
+                    result[key] = item
+        else:
+            result = [item for item in map(self.evaluate, value) if item is not NO_VALUE]
+
+        # Keep a reference to the node so that its id is not reused while cached
+        self._cache[id(value)] = (value, result)
+        return result
+
+    def evaluate_condition(self, name: str) -> bool:
+        """Evaluate a condition of the template's Conditions section.
+
+        Args:
+            name: The condition name
+
+        Returns:
+            bool: The value of the condition
+
+        Raises:
+            IntrinsicResolutionError: If the condition does not exist or cannot be evaluated
+        """
+        if name in self._conditions:
+            return self._conditions[name]
+
+        conditions = self.template.get("Conditions") or {}
+        if name not in conditions:
+            raise IntrinsicResolutionError(f"Condition {name} not found", [name])
+
+        if name in self._evaluating:
+            raise IntrinsicResolutionError(f"Condition {name} references itself", [name])
+
+        self._evaluating.add(name)
+        try:
+            result = self._condition(conditions[name])
+        finally:
+            self._evaluating.discard(name)
+        self._conditions[name] = result
+        return result
+
+    def _condition(self, value: Any) -> bool:
+        """Evaluate a condition function or a reference to a named condition."""
+        intrinsic = _intrinsic(value)
+        if intrinsic is None:
+            value = self.evaluate(value)
+            if isinstance(value, bool):
+                return value
+            if isinstance(value, str) and value.lower() in ("true", "false"):
+                return value.lower() == "true"
+            raise IntrinsicResolutionError(f"Invalid condition {value!r}")
+
+        name, data = intrinsic
+        if name in ("Condition", "Fn::Condition"):
+            return self.evaluate_condition(self._string(data))
+        if name == "Fn::Equals":
+            if not isinstance(data, list) or len(data) != 2:
+                raise IntrinsicResolutionError(f"Fn::Equals expects two values, got {data!r}")
+            left, right = self.evaluate(data[0]), self.evaluate(data[1])
+            if left == right:
+                return True
+            try:
+                return _to_string(left) == _to_string(right)
+            except IntrinsicResolutionError:
+                return False
+        if name in ("Fn::And", "Fn::Or", "Fn::Not"):
+            if not isinstance(data, list) or not data:
+                raise IntrinsicResolutionError(f"{name} expects a list of conditions, got {data!r}")
+            if name == "Fn::Not":
+                return not self._condition(data[0])
+            if name == "Fn::And":
+                return all(self._condition(item) for item in data)
+            return any(self._condition(item) for item in data)
+
+        return self._condition(self.evaluate(value))
+
+    def _string(self, value: Any) -> str:
+        return _to_string(self.evaluate(value))
+
+    def _list(self, value: Any, function: str) -> List[Any]:
+        value = self.evaluate(value)
+        if not isinstance(value, list):
+            raise IntrinsicResolutionError(f"{function} expects a list, got {value!r}")
+        return value
+
+    def _arguments(self, data: Any, function: str, count: int) -> List[Any]:
+        if not isinstance(data, list) or len(data) != count:
+            raise IntrinsicResolutionError(f"{function} expects {count} arguments, got {data!r}")
+        return data
+
+    def _resolve_name(self, name: str) -> Any:
+        """Resolve a parameter, pseudo parameter or resource name as Ref does."""
+        if name in self.parameters:
+            return self.parameters[name]
+        if name in self.pseudo_parameters:
+            return self.pseudo_parameters[name]
+        if self.resource_resolver is not None and name in (self.template.get("Resources") or {}):
+            return self.resource_resolver(name)
+        raise IntrinsicResolutionError(f"Cannot resolve Ref to {name}", [name])
+
+    def _resolve_attribute(self, logical_id: str, attribute: str) -> Any:
+        if self.attribute_resolver is None:
+            raise IntrinsicResolutionError(f"Cannot resolve Fn::GetAtt {logical_id}.{attribute}", [f"{logical_id}.{attribute}"])
+        return self.attribute_resolver(logical_id, attribute)
+
+    def _ref(self, data: Any) -> Any:
+        return self._resolve_name(self._string(data))
+
+    def _get_att(self, data: Any) -> Any:
+        if isinstance(data, str):
+            logical_id, _, attribute = data.partition(".")
+        else:
+            logical_id, attribute = (self._string(item) for item in self._arguments(data, "Fn::GetAtt", 2))
+        return self._resolve_attribute(logical_id, attribute)
+
+    def _sub(self, data: Any) -> str:
+        variables: Dict[str, Any] = {}
+        if isinstance(data, list):
+            if len(data) != 2 or not isinstance(data[1], dict):
+                raise IntrinsicResolutionError(f"Fn::Sub expects a string or a [string, variables] list, got {data!r}")
+            data, variables = data[0], data[1]
+        if not isinstance(data, str):
+            raise IntrinsicResolutionError(f"Fn::Sub expects a string, got {data!r}")
+
+        values: Dict[str, str] = {}
+        unresolved: List[str] = []
+        for name in _SUB_VARIABLE_PATTERN.findall(data):
+            if name in values or name.startswith("!"):
+                continue
+            try:
+                if name in variables:
+                    values[name] = self._string(variables[name])
+                elif name in self.parameters or name in self.pseudo_parameters or "." not in name:
+                    values[name] = _to_string(self._resolve_name(name))
+                else:
+                    logical_id, _, attribute = name.partition(".")
+                    values[name] = _to_string(self._resolve_attribute(logical_id, attribute))
+            except IntrinsicResolutionError as e:
+                unresolved.extend(e.names or [name])
+
+        if unresolved:
+            unresolved = sorted(set(unresolved))
+            raise IntrinsicResolutionError(f"Cannot resolve Fn::Sub variables: {', '.join(unresolved)}", unresolved)
+
+        # ${!Literal} is written out as ${Literal}
+        return _SUB_VARIABLE_PATTERN.sub(lambda match: "${" + match.group(1)[1:] + "}" if match.group(1).startswith("!") else values[match.group(1)], data)
+
+    def _join(self, data: Any) -> str:
+        delimiter, items = self._arguments(data, "Fn::Join", 2)
+        return self._string(delimiter).join(_to_string(item) for item in self._list(items, "Fn::Join"))
+
+    def _select(self, data: Any) -> Any:
+        index, items = self._arguments(data, "Fn::Select", 2)
+        items = self._list(items, "Fn::Select")
+        try:
+            return items[int(self._string(index))]
+        except (IndexError, ValueError) as e:
+            raise IntrinsicResolutionError(f"Invalid Fn::Select index {index!r} for {len(items)} values") from e
+
+    def _split(self, data: Any) -> List[str]:
+        delimiter, value = self._arguments(data, "Fn::Split", 2)
+        return self._string(value).split(self._string(delimiter))
+
+    def _if(self, data: Any) -> Any:
+        condition, when_true, when_false = self._arguments(data, "Fn::If", 3)
+        return self.evaluate(when_true if self.evaluate_condition(self._string(condition)) else when_false)
+
+    def _find_in_map(self, data: Any) -> Any:
+        if not isinstance(data, list) or len(data) not in (3, 4):
+            raise IntrinsicResolutionError(f"Fn::FindInMap expects 3 arguments, got {data!r}")
+        map_name, top_level_key, second_level_key = (self._string(item) for item in data[:3])
+        try:
+            return self.evaluate(self.template["Mappings"][map_name][top_level_key][second_level_key])
+        except (KeyError, TypeError) as e:
+            if len(data) == 4 and isinstance(data[3], dict) and "DefaultValue" in data[3]:
+                return self.evaluate(data[3]["DefaultValue"])
+            raise IntrinsicResolutionError(f"Mapping value {map_name}.{top_level_key}.{second_level_key} not found", [map_name]) from e
+
+    def _base64(self, data: Any) -> str:
+        return base64.b64encode(self._string(data).encode("utf-8")).decode("ascii")
+
+    def _get_azs(self, data: Any) -> List[str]:
+        region = self._string(data) or self._string({"Ref": "AWS::Region"})
+        return [f"{region}{zone}" for zone in "abc"]
@@ -0,0 +1,395 @@
+"""Lazy loading of large CloudFormation templates.
+
+Templates produced by CDK or other generators can be several megabytes large, while most consumers
+only need a few sections or the resources of a few types. A :class:`LazyTemplate` scans the template
+with the YAML event parser once, without constructing any Python objects, and records where every
+top-level section and every resource starts and ends in the text, together with the resource types.
+Sections and resources are constructed from their slice of the text only when they are accessed, and
+are cached afterwards.
+
+Templates the scan cannot split safely (anchors and aliases, merge keys, non-string keys, a root that
+is not a mapping, ...) are loaded in full on first access instead, so the result is always the same as
+the one of :func:`aws_sam_testing.cfn.load_yaml`.
+
+Example:
+    >>> template = load_template_lazy("cdk.out/Stack.template.json")
+    >>> functions = template.find_resources_by_type("AWS::Lambda::Function")  # only functions are constructed
+    >>> template["Globals"]
+    {'Function': {'Runtime': 'python3.13'}}
+"""
+
+from collections.abc import Mapping
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+import yaml
+from yaml.events import (
+    AliasEvent,
+    CollectionEndEvent,
+    CollectionStartEvent,
+    DocumentEndEvent,
+    DocumentStartEvent,
+    MappingStartEvent,
+    NodeEvent,
+    ScalarEvent,
+    StreamEndEvent,
+)
+from yaml.nodes import ScalarNode
+from yaml.resolver import Resolver
+
+from .cfn_tags import CloudFormationCLoader, CloudFormationIntrinsicCLoader
+
+_STR_TAG = "tag:yaml.org,2002:str"
+
+_resolver = Resolver()
+
+
+class _Span(NamedTuple):
+    """Location of a node in the template text, as character offsets."""
+
+    start: int
+    end: int
+    column: int
+
+
+class _Unsupported(Exception):
+    """Raised by the scan when the template cannot be split into independently loadable slices."""
+
+
+def _construct(text: str, span: _Span, loader: type) -> Any:
+    """Construct the node at the given location of the template text."""
+    # Indent the slice by its original column so that the following lines keep their relative indentation
+    return yaml.load(" " * span.column + text[span.start : span.end], Loader=loader)
+
+
+def _check_node(event: Any) -> None:
+    if isinstance(event, AliasEvent) or (isinstance(event, NodeEvent) and event.anchor is not None):
+        # An alias may point into another slice
+        raise _Unsupported()
+
+
+def _key(event: Any) -> str:
+    """Return the value of a mapping key, which must load as a string."""
+    _check_node(event)
+    if not isinstance(event, ScalarEvent):
+        raise _Unsupported()
+    tag = event.tag
+    if tag is None or tag == "!":
+        tag = _resolver.resolve(ScalarNode, event.value, event.implicit)
+    if tag != _STR_TAG:
+        raise _Unsupported()
+    return event.value
+
+
+def _skip(events: Iterator[Any], first: Any) -> int:
+    """Consume the node starting with the given event and return its end offset."""
+    _check_node(first)
+    if not isinstance(first, CollectionStartEvent):
+        return first.end_mark.index
+    depth = 1
+    for event in events:
+        if isinstance(event, CollectionStartEvent):
+            _check_node(event)
+            depth += 1
+        elif isinstance(event, CollectionEndEvent):
+            depth -= 1
+            if depth == 0:
+                return event.end_mark.index
+        else:
+            _check_node(event)
+    raise _Unsupported()
+
+
+def _span(first: Any, end: int) -> _Span:
+    return _Span(first.start_mark.index, end, first.start_mark.column)
+
+
+def _scan_resource(events: Iterator[Any], first: Any) -> Tuple[Optional[str], int]:
+    """Consume a resource definition and return its type and end offset."""
+    if not isinstance(first, MappingStartEvent):
+        return None, _skip(events, first)
+
+    _check_node(first)
+    resource_type = None
+    for event in events:
+        if isinstance(event, CollectionEndEvent):
+            return resource_type, event.end_mark.index
+        key = _key(event)
+        value = next(events)
+        if key == "Type" and isinstance(value, ScalarEvent) and value.tag is None:
+            resource_type = value.value
+        _skip(events, value)
+    raise _Unsupported()
+
+
+def _scan(text: str, loader: type) -> Tuple[Dict[str, _Span], Optional[Dict[str, _Span]], Dict[str, Optional[str]]]:
+    """Index the top-level sections and the resources of a template.
+
+    Returns:
+        The locations of the sections, the locations of the resources (None if the Resources
+        section is missing or is not a mapping) and the resource types.
+
+    Raises:
+        _Unsupported: If the template cannot be split into independently loadable slices.
+    """
+    sections: Dict[str, _Span] = {}
+    resources: Optional[Dict[str, _Span]] = None
+    types: Dict[str, Optional[str]] = {}
+
+    events = iter(yaml.parse(text, Loader=loader))
+    next(events)  # StreamStartEvent
+    if not isinstance(next(events), DocumentStartEvent):
+        raise _Unsupported()
+    root = next(events)
+    if not isinstance(root, MappingStartEvent):
+        raise _Unsupported()
+    _check_node(root)
+
+    for event in events:
+        if isinstance(event, CollectionEndEvent):
+            break
+        section = _key(event)
+        value = next(events)
+        if section == "Resources" and isinstance(value, MappingStartEvent):
+            _check_node(value)
+            resources = {}
+            types = {}
+            for resource_event in events:
+                if isinstance(resource_event, CollectionEndEvent):
+                    break
+                logical_id = _key(resource_event)
+                definition = next(events)
+                types[logical_id], end = _scan_resource(events, definition)
+                resources[logical_id] = _span(definition, end)
+            sections[section] = _span(value, resource_event.end_mark.index)
+        else:
+            if section == "Resources":
+                resources = None
+            sections[section] = _span(value, _skip(events, value))
+
+    # A second document is an error for yaml.load, let the full load report it
+    if not isinstance(next(events), DocumentEndEvent) or not isinstance(next(events), StreamEndEvent):
+        raise _Unsupported()
+    return sections, resources, types
+
+
+class LazyResources(Mapping):
+    """The Resources section of a :class:`LazyTemplate`, resources are constructed on first access.
+
+    The logical IDs and resource types are known from the scan, so iterating the section and
+    looking up types does not construct any resource.
+    """
+
+    __slots__ = ("_template", "_spans", "_types", "_loaded")
+
+    def __init__(self, template: "LazyTemplate", spans: Dict[str, _Span], types: Dict[str, Optional[str]]) -> None:
+        self._template = template
+        self._spans = spans
+        self._types = types
+        self._loaded: Dict[str, Any] = {}
+
+    def __getitem__(self, logical_id: str) -> Any:
+        try:
+            return self._loaded[logical_id]
+        except KeyError:
+            pass
+        resource = self._template._construct(self._spans[logical_id])
+        self._loaded[logical_id] = resource
+        return resource
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._spans)
+
+    def __len__(self) -> int:
+        return len(self._spans)
+
+    def __contains__(self, logical_id: Any) -> bool:
+        return logical_id in self._spans
+
+    def __repr__(self) -> str:
+        return f"LazyResources({len(self)} resources, {len(self._loaded)} loaded)"
+
+    def type_of(self, logical_id: str) -> Optional[str]:
+        """Return the type of a resource, or None if the resource does not exist or has no type."""
+        return self._types.get(logical_id)
+
+    def types(self) -> Tuple[str, ...]:
+        """Return the distinct resource types, in the order they first appear in the template."""
+        return tuple(dict.fromkeys(resource_type for resource_type in self._types.values() if resource_type is not None))
+
+    def of_type(self, resource_types: Union[str, Iterable[str]]) -> List[str]:
+        """Return the logical IDs of the resources of the given types, in template order.
+
+        Args:
+            resource_types: A resource type or an iterable of types. A type ending with ``*`` matches
+                all types with that prefix, e.g. ``AWS::Serverless::*``.
+
+        Returns:
+            List[str]: The logical IDs of the matching resources
+        """
+        resource_types = [resource_types] if isinstance(resource_types, str) else list(resource_types)
+        exact = {resource_type for resource_type in resource_types if not resource_type.endswith("*")}
+        prefixes = tuple(resource_type[:-1] for resource_type in resource_types if resource_type.endswith("*"))
+        return [logical_id for logical_id, resource_type in self._types.items() if resource_type is not None and (resource_type in exact or (prefixes and resource_type.startswith(prefixes)))]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Construct all resources and return them as a dictionary."""
+        return {logical_id: self[logical_id] for logical_id in self._spans}
+
+
+class LazyTemplate(Mapping):
+    """Read-only CloudFormation template whose sections and resources are constructed on first access.
+
+    The template text is scanned on first use. The scan only records the locations of the
+    top-level sections and of the resources, and the resource types; peak memory and time
+    are then proportional to the parts of the template that are actually used.
+
+    Accessed values are cached and returned as they are, so modifying them changes what later
+    accesses return. Use :meth:`to_dict` to get a plain template, e.g. for a
+    :class:`aws_sam_testing.cfn.CloudFormationTemplateProcessor`.
+
+    Args:
+        text: The template content.
+        native_intrinsics: If True, tags are loaded as JSON-style intrinsic functions,
+            see :func:`aws_sam_testing.cfn.load_yaml`.
+
+    Example:
+        >>> template = LazyTemplate(text)
+        >>> template["Resources"].of_type("AWS::SQS::Queue")
+        ['MyQueue']
+        >>> template["Resources"]["MyQueue"]["Properties"]
+        {'QueueName': 'my-queue'}
+    """
+
+    __slots__ = ("_text", "_loader", "_sections", "_resources", "_loaded", "_template")
+
+    def __init__(self, text: str, native_intrinsics: bool = False) -> None:
+        self._text = text
+        self._loader = CloudFormationIntrinsicCLoader if native_intrinsics else CloudFormationCLoader
+        self._sections: Optional[Dict[str, _Span]] = None
+        self._resources: Optional[LazyResources] = None
+        self._loaded: Dict[str, Any] = {}
+        # The fully loaded template, for templates that cannot be split
+        self._template: Optional[Dict[str, Any]] = None
+
+    @classmethod
+    def from_file(cls, file_path: Union[str, Path], native_intrinsics: bool = False) -> "LazyTemplate":
+        """Create a lazy template from a template file.
+
+        Args:
+            file_path: Path to the template file.
+            native_intrinsics: If True, tags are loaded as JSON-style intrinsic functions.
+
+        Returns:
+            LazyTemplate: The lazy template. The file is read, but not parsed yet.
+        """
+        return cls(Path(file_path).read_text(encoding="utf-8"), native_intrinsics=native_intrinsics)
+
+    @property
+    def is_lazy(self) -> bool:
+        """False if the template could not be split and was loaded in full."""
+        self._index()
+        return self._template is None
+
+    def _index(self) -> Dict[str, _Span]:
+        if self._sections is not None:
+            return self._sections
+
+        try:
+            sections, resources, types = _scan(self._text, self._loader)
+        except (_Unsupported, StopIteration, yaml.YAMLError):
+            self._template = self._load_all()
+            self._sections = {}
+            return self._sections
+
+        if resources is not None:
+            self._resources = LazyResources(self, resources, types)
+        self._sections = sections
+        return sections
+
+    def _load_all(self) -> Dict[str, Any]:
+        template = yaml.load(self._text, Loader=self._loader)
+        if not isinstance(template, dict):
+            raise ValueError("The template is not a mapping")
+        return template
+
+    def _construct(self, span: _Span) -> Any:
+        return _construct(self._text, span, self._loader)
+
+    def __getitem__(self, section: str) -> Any:
+        sections = self._index()
+        if self._template is not None:
+            return self._template[section]
+        if section == "Resources" and self._resources is not None:
+            return self._resources
+        try:
+            return self._loaded[section]
+        except KeyError:
+            pass
+        value = self._construct(sections[section])
+        self._loaded[section] = value
+        return value
+
+    def __iter__(self) -> Iterator[str]:
+        self._index()
+        return iter(self._template if self._template is not None else self._sections)  # type: ignore[arg-type]
+
+    def __len__(self) -> int:
+        self._index()
+        return len(self._template if self._template is not None else self._sections)  # type: ignore[arg-type]
+
+    def __contains__(self, section: Any) -> bool:
+        self._index()
+        return section in (self._template if self._template is not None else self._sections)  # type: ignore[operator]
+
+    def __repr__(self) -> str:
+        return f"LazyTemplate({len(self._text)} characters)"
+
+    def find_resources_by_type(self, resource_type: Union[str, Iterable[str]]) -> List[Tuple[str, Dict[str, Any]]]:
+        """Find all resources of a specific type, constructing only the matching resources.
+
+        Args:
+            resource_type: The resource type to search for. A type ending with '*' matches all types
+                with that prefix. An iterable of types finds resources matching any of them.
+
+        Returns:
+            List of (logical_id, resource_data) tuples in template order, in the format of
+            :meth:`aws_sam_testing.cfn.CloudFormationTemplateProcessor.find_resources_by_type`.
+        """
+        from aws_sam_testing.cfn import CloudFormationTemplateProcessor, _resource_data
+
+        self._index()
+        if self._template is not None:
+            return CloudFormationTemplateProcessor(self._template, copy_on_write=True).find_resources_by_type(resource_type)
+        if self._resources is None:
+            return []
+        return [(logical_id, _resource_data(logical_id, self._resources[logical_id])) for logical_id in self._resources.of_type(resource_type)]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Construct the whole template and return it as a dictionary.
+
+        Sections and resources that were already accessed are reused.
+        """
+        self._index()
+        if self._template is not None:
+            return self._template
+        return {section: self[section].to_dict() if section == "Resources" and self._resources is not None else self[section] for section in self._sections}  # type: ignore[union-attr]
+
+
+def load_template_lazy(template_path: Union[str, Path], native_intrinsics: bool = False) -> LazyTemplate:
+    """Load a CloudFormation template lazily, see :class:`LazyTemplate`.
+
+    Args:
+        template_path: Path to the CloudFormation template file.
+        native_intrinsics: If True, tags are loaded as JSON-style intrinsic functions.
+
+    Raises:
+        FileNotFoundError: If the template file does not exist.
+
+    Returns:
+        LazyTemplate: The lazy template.
+    """
+    path = Path(template_path)
+    if not path.exists():
+        raise FileNotFoundError(f"Template file not found at {path}")
+    return LazyTemplate.from_file(path, native_intrinsics=native_intrinsics)
@@ -0,0 +1,192 @@
+"""Immutable, compact resource table for read-heavy users of a template.
+
+A :class:`ResourceTable` indexes the Resources section of a template once and then answers
+lookups by logical ID and by resource type without copying the resources: the logical IDs and types
+are kept in tuples of interned strings, and the resource definitions are shared with the template.
+Resources are handed out as read-only views (:class:`FrozenMapping` / :class:`FrozenList`), so a
+table can be shared freely, e.g. between pytest fixtures, without anyone changing it by accident.
+
+The table is a snapshot: build a new one (or ask the processor for its current table, see
+:meth:`aws_sam_testing.cfn.CloudFormationTemplateProcessor.get_resource_table`) after modifying the template.
+"""
+
+import sys
+from collections.abc import Mapping, Sequence
+from typing import Any, Dict, Iterator, NamedTuple, Optional, Tuple
+
+
+class FrozenMapping(Mapping):
+    """Read-only view of a mapping, nested mappings and lists are returned as read-only views too."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Mapping) -> None:
+        self._data = data
+
+    def __getitem__(self, key: Any) -> Any:
+        return freeze(self._data[key])
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._data)
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Any) -> bool:
+        return key in self._data
+
+    def __repr__(self) -> str:
+        return f"FrozenMapping({self._data!r})"
+
+
+class FrozenList(Sequence):
+    """Read-only view of a list, nested mappings and lists are returned as read-only views too."""
+
+    __slots__ = ("_data",)
+
+    def __init__(self, data: Sequence) -> None:
+        self._data = data
+
+    def __getitem__(self, index: Any) -> Any:
+        if isinstance(index, slice):
+            return FrozenList(self._data[index])
+        return freeze(self._data[index])
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __eq__(self, other: Any) -> bool:
+        if isinstance(other, (FrozenList, list, tuple)):
+            return len(self) == len(other) and all(a == b for a, b in zip(self, other))
+        return NotImplemented
+
+    __hash__ = None  # type: ignore[assignment]
+
+    def __repr__(self) -> str:
+        return f"FrozenList({self._data!r})"
+
+
+def freeze(value: Any) -> Any:
+    """Wrap mappings and lists in read-only views, other values are returned as they are."""
+    if isinstance(value, dict):
+        return FrozenMapping(value)
+    if isinstance(value, list):
+        return FrozenList(value)
+    return value
+
+
+class Resource(NamedTuple):
+    """A resource of a :class:`ResourceTable`.
+
+    Attributes:
+        logical_id: The logical ID of the resource.
+        type: The resource type, or None if the resource has none.
+        properties: Read-only view of the resource properties.
+        definition: Read-only view of the whole resource definition, including Condition, DependsOn, Metadata, ...
+    """
+
+    logical_id: str
+    type: Optional[str]
+    properties: FrozenMapping
+    definition: FrozenMapping
+
+
+_EMPTY = FrozenMapping({})
+
+
+class ResourceTable(Mapping):
+    """Immutable table of the resources of a template, by logical ID and by type.
+
+    Args:
+        template: The template; only its Resources section is indexed.
+
+    Example:
+        >>> table = ResourceTable(template)
+        >>> table["MyQueue"].properties["QueueName"]
+        'my-queue'
+        >>> [resource.logical_id for resource in table.of_type("AWS::Serverless::*")]
+        ['MyFunction', 'MyApi']
+    """
+
+    __slots__ = ("_logical_ids", "_types", "_definitions", "_positions", "_by_type")
+
+    def __init__(self, template: Dict[str, Any]) -> None:
+        resources = template.get("Resources")
+        if not isinstance(resources, dict):
+            resources = {}
+
+        logical_ids = []
+        types = []
+        definitions = []
+        by_type: Dict[str, list] = {}
+        for position, (logical_id, resource) in enumerate(resources.items()):
+            resource_type = resource.get("Type") if isinstance(resource, dict) else None
+            if isinstance(resource_type, str):
+                resource_type = sys.intern(resource_type)
+                by_type.setdefault(resource_type, []).append(position)
+            else:
+                resource_type = None
+            logical_ids.append(sys.intern(logical_id) if isinstance(logical_id, str) else logical_id)
+            types.append(resource_type)
+            definitions.append(resource if isinstance(resource, dict) else {})
+
+        self._logical_ids: Tuple[str, ...] = tuple(logical_ids)
+        self._types: Tuple[Optional[str], ...] = tuple(types)
+        self._definitions: Tuple[dict, ...] = tuple(definitions)
+        self._positions: Dict[str, int] = {logical_id: position for position, logical_id in enumerate(self._logical_ids)}
+        self._by_type: Dict[str, Tuple[int, ...]] = {resource_type: tuple(positions) for resource_type, positions in by_type.items()}
+
+    def _resource(self, position: int) -> Resource:
+        definition = self._definitions[position]
+        properties = definition.get("Properties")
+        return Resource(
+            logical_id=self._logical_ids[position],
+            type=self._types[position],
+            properties=FrozenMapping(properties) if isinstance(properties, dict) else _EMPTY,
+            definition=FrozenMapping(definition),
+        )
+
+    def __getitem__(self, logical_id: str) -> Resource:
+        return self._resource(self._positions[logical_id])
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._logical_ids)
+
+    def __len__(self) -> int:
+        return len(self._logical_ids)
+
+    def __contains__(self, logical_id: Any) -> bool:
+        return logical_id in self._positions
+
+    def __repr__(self) -> str:
+        return f"ResourceTable({len(self)} resources)"
+
+    def type_of(self, logical_id: str) -> Optional[str]:
+        """Return the type of a resource, or None if the resource does not exist or has no type."""
+        position = self._positions.get(logical_id)
+        return self._types[position] if position is not None else None
+
+    def types(self) -> Tuple[str, ...]:
+        """Return the distinct resource types, in the order they first appear in the template."""
+        return tuple(self._by_type)
+
+    def of_type(self, *resource_types: str) -> Tuple[Resource, ...]:
+        """Return the resources of the given types, in template order.
+
+        Args:
+            *resource_types: Resource types. A type ending with ``*`` matches all types with that prefix,
+                e.g. ``AWS::Serverless::*``.
+
+        Returns:
+            Tuple[Resource, ...]: The matching resources
+        """
+        positions = set()
+        for resource_type in resource_types:
+            if resource_type.endswith("*"):
+                prefix = resource_type[:-1]
+                for indexed_type, indexed_positions in self._by_type.items():
+                    if indexed_type.startswith(prefix):
+                        positions.update(indexed_positions)
+            else:
+                positions.update(self._by_type.get(resource_type, ()))
+        return tuple(self._resource(position) for position in sorted(positions))
@@ -17,15 +17,31 @@ See the License for the specific language governing permissions and
 limitations under the License.
 """
 
-__version__ = "1.1.0"
+__version__ = "2.0.0"
 
-import itertools
 import json
-import re
+import sys
 
-import six
 import yaml
-from yaml.constructor import ConstructorError
+from yaml.constructor import ConstructorError, SafeConstructor
+from yaml.nodes import MappingNode, ScalarNode, SequenceNode
+from yaml.representer import SafeRepresenter
+
+# Strings up to this length are interned when loaded. Keys, logical IDs, resource types and intrinsic
+# function names repeat throughout a template and are short, long strings (inline code, policies) rarely repeat.
+INTERN_MAX_LENGTH = 128
+
+
+def intern_string(value):
+    """Return the interned copy of a short string, other values are returned as they are."""
+    if type(value) is str and len(value) <= INTERN_MAX_LENGTH:
+        return sys.intern(value)
+    return value
+
+
+def construct_interned_str(loader, node):
+    """Construct a YAML string, interning short strings so that repeated keys and names share memory."""
+    return intern_string(loader.construct_scalar(node))
 
 
 class CloudFormationObject(object):
@@ -35,6 +51,9 @@ class CloudFormationObject(object):
     MAPPING = "mapping"
     MAPPING_OR_SCALAR = "mapping_scalar"
 
+    # Templates hold thousands of tags, without __slots__ each would carry its own __dict__
+    __slots__ = ("data",)
+
     name = None
     tag = None
     type = None
@@ -49,7 +68,7 @@ class CloudFormationObject(object):
             return obj.to_json() if isinstance(obj, CloudFormationObject) else obj
 
         if isinstance(self.data, dict):
-            data = {key: convert(value) for key, value in six.iteritems(self.data)}
+            data = {key: convert(value) for key, value in self.data.items()}
         elif isinstance(self.data, (list, tuple)):
             data = [convert(value) for value in self.data]
         else:
@@ -57,8 +76,8 @@ class CloudFormationObject(object):
 
         name = self.name
 
-        if name == "Fn::GetAtt" and isinstance(data, six.string_types):
-            data = data.split(".")  # type: ignore[union-attr]
+        if name == "Fn::GetAtt" and isinstance(data, str):
+            data = data.split(".")
         elif name == "Ref" and "." in data:
             name = "Fn::GetAtt"
             data = data.split(".")  # type: ignore[union-attr]
@@ -67,24 +86,35 @@ class CloudFormationObject(object):
 
     @classmethod
     def construct(cls, loader, node):
-        if cls.type == cls.SCALAR:
-            return cls(loader.construct_scalar(node))
-        elif cls.type == cls.SEQUENCE:
-            return cls(loader.construct_sequence(node))
-        elif cls.type == cls.SEQUENCE_OR_SCALAR:
-            try:
+        # Dispatch on the kind of node the tag is applied to, e.g. !GetAtt Bucket.Arn or !GetAtt [Bucket, Arn]
+        node_class = node.__class__
+        if node_class is ScalarNode:
+            if cls.type in _SCALAR_TYPES:
+                return cls(intern_string(loader.construct_scalar(node)))
+        elif node_class is SequenceNode:
+            if cls.type in _SEQUENCE_TYPES:
                 return cls(loader.construct_sequence(node))
-            except ConstructorError:
-                return cls(loader.construct_scalar(node))
-        elif cls.type == cls.MAPPING:
-            return cls(loader.construct_mapping(node))
-        elif cls.type == cls.MAPPING_OR_SCALAR:
-            try:
+        elif node_class is MappingNode:
+            if cls.type in _MAPPING_TYPES:
                 return cls(loader.construct_mapping(node))
-            except ConstructorError:
-                return cls(loader.construct_scalar(node))
-        else:
+        if cls.type not in _NODE_KINDS:
             raise RuntimeError("Unknown type {}".format(cls.type))
+        raise ConstructorError(None, None, "expected a {} node for {}, but found {}".format(_NODE_KINDS[cls.type], cls.tag, node.id), node.start_mark)
+
+    @classmethod
+    def intrinsic(cls, data):
+        """Return the JSON-style intrinsic function for already converted data"""
+        name = cls.name
+        if name == "Fn::GetAtt" and isinstance(data, str):
+            data = [intern_string(part) for part in data.split(".")]
+        elif name == "Ref" and isinstance(data, str) and "." in data:
+            name = "Fn::GetAtt"
+            data = [intern_string(part) for part in data.split(".")]
+        return {name: data}
+
+    @classmethod
+    def construct_intrinsic(cls, loader, node):
+        return cls.intrinsic(cls.construct(loader, node).data)
 
     @classmethod
     def represent(cls, dumper, obj):
@@ -106,6 +136,18 @@ class CloudFormationObject(object):
         return isinstance(other, self.__class__) and other.data == self.data
 
 
+_SCALAR_TYPES = frozenset([CloudFormationObject.SCALAR, CloudFormationObject.SEQUENCE_OR_SCALAR, CloudFormationObject.MAPPING_OR_SCALAR])
+_SEQUENCE_TYPES = frozenset([CloudFormationObject.SEQUENCE, CloudFormationObject.SEQUENCE_OR_SCALAR])
+_MAPPING_TYPES = frozenset([CloudFormationObject.MAPPING, CloudFormationObject.MAPPING_OR_SCALAR])
+_NODE_KINDS = {
+    CloudFormationObject.SCALAR: "scalar",
+    CloudFormationObject.SEQUENCE: "sequence",
+    CloudFormationObject.SEQUENCE_OR_SCALAR: "sequence or scalar",
+    CloudFormationObject.MAPPING: "mapping",
+    CloudFormationObject.MAPPING_OR_SCALAR: "mapping or scalar",
+}
+
+
 class JSONFromYAMLEncoder(json.JSONEncoder):
     def default(self, o):
         if isinstance(o, CloudFormationObject):
@@ -113,65 +155,154 @@ class JSONFromYAMLEncoder(json.JSONEncoder):
         return json.JSONEncoder.default(self, o)
 
 
-# (name, tag, type)
+class And(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::And"
+    tag = "!And"
+    type = CloudFormationObject.SEQUENCE
 
-ref = ("Ref", "Ref", CloudFormationObject.SCALAR)
-
-functions = [
-    ("Fn::And", "And", CloudFormationObject.SEQUENCE),
-    ("Fn::Condition", "Condition", CloudFormationObject.SCALAR),
-    ("Fn::Base64", "Base64", CloudFormationObject.SCALAR),
-    ("Fn::Equals", "Equals", CloudFormationObject.SEQUENCE),
-    ("Fn::FindInMap", "FindInMap", CloudFormationObject.SEQUENCE),
-    ("Fn::GetAtt", "GetAtt", CloudFormationObject.SEQUENCE_OR_SCALAR),
-    ("Fn::GetAZs", "GetAZs", CloudFormationObject.SCALAR),
-    ("Fn::If", "If", CloudFormationObject.SEQUENCE),
-    ("Fn::ImportValue", "ImportValue", CloudFormationObject.SCALAR),
-    ("Fn::Join", "Join", CloudFormationObject.SEQUENCE),
-    ("Fn::Not", "Not", CloudFormationObject.SEQUENCE),
-    ("Fn::Or", "Or", CloudFormationObject.SEQUENCE),
-    ("Fn::Select", "Select", CloudFormationObject.SEQUENCE),
-    ("Fn::Split", "Split", CloudFormationObject.SEQUENCE),
-    ("Fn::Sub", "Sub", CloudFormationObject.SEQUENCE_OR_SCALAR),
-]
-
-_object_classes = None
 
+class Condition(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Condition"
+    tag = "!Condition"
+    type = CloudFormationObject.SCALAR
 
-def inject(*args):
-    global _object_classes
-    _object_classes = []
 
-    loaders = [arg for arg in args if issubclass(arg, yaml.SafeLoader)]
-    dumpers = [arg for arg in args if issubclass(arg, yaml.SafeDumper)]
+class Base64(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Base64"
+    tag = "!Base64"
+    type = CloudFormationObject.SCALAR
+
+
+class Equals(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Equals"
+    tag = "!Equals"
+    type = CloudFormationObject.SEQUENCE
+
+
+class FindInMap(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::FindInMap"
+    tag = "!FindInMap"
+    type = CloudFormationObject.SEQUENCE
+
+
+class GetAtt(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::GetAtt"
+    tag = "!GetAtt"
+    type = CloudFormationObject.SEQUENCE_OR_SCALAR
+
+
+class GetAZs(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::GetAZs"
+    tag = "!GetAZs"
+    type = CloudFormationObject.SCALAR
+
+
+class If(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::If"
+    tag = "!If"
+    type = CloudFormationObject.SEQUENCE
+
+
+class ImportValue(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::ImportValue"
+    tag = "!ImportValue"
+    type = CloudFormationObject.SCALAR
+
 
-    for name_, tag_, type_ in itertools.chain(functions, [ref]):
-        if not tag_.startswith("!"):
-            tag_ = "!{}".format(tag_)
-        tag_ = six.u(tag_)
+class Join(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Join"
+    tag = "!Join"
+    type = CloudFormationObject.SEQUENCE
 
-        class Object(CloudFormationObject):
-            name = name_
-            tag = tag_
-            type = type_
 
-        obj_cls_name = re.search(r"\w+$", tag_).group(0)  # type: ignore[union-attr]
-        if six.PY2:
-            obj_cls_name = str(obj_cls_name)
-        Object.__name__ = obj_cls_name
+class Not(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Not"
+    tag = "!Not"
+    type = CloudFormationObject.SEQUENCE
 
-        _object_classes.append(Object)
-        globals()[obj_cls_name] = Object
 
-        # Register constructors for all loaders
-        for loader in loaders:
-            loader.add_constructor(tag_, Object.construct)
+class Or(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Or"
+    tag = "!Or"
+    type = CloudFormationObject.SEQUENCE
 
-        # Register representers for all dumpers
-        for dumper in dumpers:
+
+class Select(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Select"
+    tag = "!Select"
+    type = CloudFormationObject.SEQUENCE
+
+
+class Split(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Split"
+    tag = "!Split"
+    type = CloudFormationObject.SEQUENCE
+
+
+class Sub(CloudFormationObject):
+    __slots__ = ()
+    name = "Fn::Sub"
+    tag = "!Sub"
+    type = CloudFormationObject.SEQUENCE_OR_SCALAR
+
+
+class Ref(CloudFormationObject):
+    __slots__ = ()
+    name = "Ref"
+    tag = "!Ref"
+    type = CloudFormationObject.SCALAR
+
+
+# All supported tags
+TAG_CLASSES = (And, Condition, Base64, Equals, FindInMap, GetAtt, GetAZs, If, ImportValue, Join, Not, Or, Select, Split, Sub, Ref)
+
+# (name, tag, type)
+
+ref = (Ref.name, Ref.tag[1:], Ref.type)
+
+functions = [(cls.name, cls.tag[1:], cls.type) for cls in TAG_CLASSES if cls is not Ref]
+
+
+def inject(*args):
+    """Register the tag constructors on the given loaders and the tag representers on the given dumpers."""
+    # Match on the constructor/representer bases so that libyaml-backed classes
+    # (CSafeLoader/CSafeDumper do not derive from SafeLoader/SafeDumper) are supported too.
+    loaders = list(dict.fromkeys(arg for arg in args if issubclass(arg, SafeConstructor)))
+    dumpers = list(dict.fromkeys(arg for arg in args if issubclass(arg, SafeRepresenter)))
+
+    for loader in loaders:
+        loader.add_constructor("tag:yaml.org,2002:str", construct_interned_str)
+        for Object in TAG_CLASSES:
+            loader.add_constructor(Object.tag, Object.construct)
+
+    for dumper in dumpers:
+        for Object in TAG_CLASSES:
             dumper.add_representer(Object, Object.represent)
 
 
+def inject_intrinsics(*loaders):
+    """Register constructors that load the tags as JSON-style intrinsic functions,
+    e.g. ``!GetAtt Bucket.Arn`` as ``{"Fn::GetAtt": ["Bucket", "Arn"]}``."""
+    for loader in dict.fromkeys(loaders):
+        loader.add_constructor("tag:yaml.org,2002:str", construct_interned_str)
+        for Object in TAG_CLASSES:
+            loader.add_constructor(Object.tag, Object.construct_intrinsic)
+
+
 class CloudFormationLoader(yaml.SafeLoader):
     """Custom YAML loader that supports CloudFormation tags."""
 
@@ -184,4 +315,35 @@ class CloudFormationDumper(yaml.SafeDumper):
     pass
 
 
-inject(CloudFormationLoader, CloudFormationDumper)
+class CloudFormationIntrinsicLoader(yaml.SafeLoader):
+    """Custom YAML loader that loads CloudFormation tags as intrinsic function dictionaries."""
+
+    pass
+
+
+if getattr(yaml, "__with_libyaml__", False):
+
+    class CloudFormationCLoader(yaml.CSafeLoader):  # type: ignore[name-defined]
+        """CloudFormation YAML loader backed by the libyaml C parser."""
+
+        pass
+
+    class CloudFormationCDumper(yaml.CSafeDumper):  # type: ignore[name-defined]
+        """CloudFormation YAML dumper backed by the libyaml C emitter."""
+
+        pass
+
+    class CloudFormationIntrinsicCLoader(yaml.CSafeLoader):  # type: ignore[name-defined]
+        """Intrinsic function YAML loader backed by the libyaml C parser."""
+
+        pass
+
+else:
+    # libyaml is not available, fall back to the pure-Python implementations
+    CloudFormationCLoader = CloudFormationLoader  # type: ignore[misc, assignment]
+    CloudFormationCDumper = CloudFormationDumper  # type: ignore[misc, assignment]
+    CloudFormationIntrinsicCLoader = CloudFormationIntrinsicLoader  # type: ignore[misc, assignment]
+
+
+inject(CloudFormationLoader, CloudFormationDumper, CloudFormationCLoader, CloudFormationCDumper)
+inject_intrinsics(CloudFormationIntrinsicLoader, CloudFormationIntrinsicCLoader)
@@ -0,0 +1,224 @@
+"""Cached translation of SAM templates to plain CloudFormation.
+
+Resources created by moto need plain CloudFormation: ``AWS::Serverless::*`` resources, their events,
+implicit APIs, roles and Globals have to be expanded first. :func:`translate_template` uses
+``aws-sam-translator``, the library behind the SAM CLI and the CloudFormation SAM transform, so the
+result matches what a real deployment creates.
+
+Translation takes a noticeable amount of time, so results are cached by the fingerprint of the input
+template (see :mod:`aws_sam_testing.cfn_fingerprint`), the parameters, the pseudo parameters and
+whether managed policies can be loaded:
+
+* in memory, in a small LRU cache shared by the whole process, and
+* optionally on disk, e.g. under ``.aws-sam/aws-sam-testing-cache/translations``, so other test sessions
+  can reuse them. Only the most recently used translations are kept on disk.
+
+Every call returns a fresh copy of the translated template that the caller is free to mutate.
+"""
+
+import os
+import pickle
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Union
+
+from .cfn_cache import CACHE_FORMAT_VERSION, prune_cache_files, read_cache_file, write_cache_file
+from .cfn_fingerprint import fingerprint, template_fingerprint
+from .cfn_visitor import rebuild
+
+TRANSLATIONS_DIR_NAME = "translations"
+
+ManagedPolicyMap = Callable[[], Dict[str, str]]
+"""Returns the mapping of AWS managed policy names to ARNs, used for function Policies given by name."""
+
+
+def _translator_version() -> str:
+    from samtranslator import __version__
+
+    return __version__
+
+
+class TranslationCache:
+    """Two level (in-process LRU and on-disk) cache of translated templates.
+
+    Attributes:
+        max_entries: Maximum number of translations kept in memory.
+        cache_dir: Default directory for the on-disk cache. If None and no directory is passed to
+            :meth:`translate`, translations are only cached in memory.
+        max_cache_files: Maximum number of translations kept in an on-disk cache directory, the least
+            recently used translations beyond it are deleted whenever a translation is written.
+
+    Example:
+        >>> cache = TranslationCache(cache_dir=".aws-sam/aws-sam-testing-cache/translations")
+        >>> translated = cache.translate(template, parameters={"Stage": "test"})  # translated
+        >>> translated = cache.translate(template, parameters={"Stage": "test"})  # served from memory
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 32,
+        cache_dir: Optional[Union[str, Path]] = None,
+        max_cache_files: int = 256,
+    ) -> None:
+        self.max_entries = max_entries
+        self.cache_dir = Path(cache_dir) if cache_dir is not None else None
+        self.max_cache_files = max_cache_files
+        self._entries: "OrderedDict[str, bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Drop all translations kept in memory. The on-disk cache is left untouched."""
+        self._entries.clear()
+
+    def translate(
+        self,
+        template: Dict[str, Any],
+        parameters: Optional[Dict[str, Any]] = None,
+        region_name: str = "us-east-1",
+        account_id: str = "123456789012",
+        stack_name: str = "my-stack",
+        managed_policy_map: Optional[ManagedPolicyMap] = None,
+        cache_dir: Optional[Union[str, Path]] = None,
+    ) -> Dict[str, Any]:
+        """Translate a SAM template to CloudFormation, using the cache when the same input was translated before.
+
+        The template must use JSON-style intrinsic functions (see
+        :meth:`aws_sam_testing.cfn.CloudFormationTemplateProcessor.transform_cfn_tags`) and code
+        locations must be S3 URIs, as for ``sam deploy``. The template is not modified.
+
+        Args:
+            template: The SAM template.
+            parameters: Parameter values, overriding the parameter defaults of the template.
+            region_name: The value of the AWS::Region pseudo parameter.
+            account_id: The value of the AWS::AccountId pseudo parameter.
+            stack_name: The value of the AWS::StackName pseudo parameter.
+            managed_policy_map: Loads the AWS managed policies, only called if a function uses one by name.
+                Defaults to no managed policies. Translations with and without a map are cached separately.
+            cache_dir: Directory for the on-disk cache, overriding ``cache_dir`` of the cache.
+
+        Raises:
+            samtranslator.model.exceptions.InvalidDocumentException: If the template is not a valid SAM template.
+
+        Returns:
+            Dict[str, Any]: A fresh copy of the translated template.
+        """
+        parameters = dict(parameters or {})
+        # Policies given by name are only expanded if the managed policies can be loaded
+        key = fingerprint(
+            [
+                CACHE_FORMAT_VERSION,
+                _translator_version(),
+                template_fingerprint(template),
+                parameters,
+                region_name,
+                account_id,
+                stack_name,
+                managed_policy_map is not None,
+            ]
+        )
+        cache_file = self._cache_file(key, cache_dir)
+
+        payload = self._entries.get(key)
+        if payload is not None:
+            self._entries.move_to_end(key)
+            return pickle.loads(payload)
+
+        payload = self._read_disk(cache_file, key)
+        if payload is None:
+            translated = _translate(template, parameters, region_name, account_id, stack_name, managed_policy_map)
+            payload = pickle.dumps(translated, protocol=pickle.HIGHEST_PROTOCOL)
+            self._write_disk(cache_file, key, payload)
+        else:
+            translated = pickle.loads(payload)
+
+        self._entries[key] = payload
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+        return translated
+
+    def _cache_file(self, key: str, cache_dir: Optional[Union[str, Path]]) -> Optional[Path]:
+        directory = Path(cache_dir) if cache_dir is not None else self.cache_dir
+        return directory / f"{key}.pickle" if directory is not None else None
+
+    def _read_disk(self, cache_file: Optional[Path], key: str) -> Optional[bytes]:
+        if cache_file is None:
+            return None
+        payload = read_cache_file(cache_file, key)
+        if payload is not None:
+            try:
+                # Mark the translation as recently used, so it is kept when the cache is pruned
+                os.utime(cache_file)
+            except OSError:
+                pass
+        return payload
+
+    def _write_disk(self, cache_file: Optional[Path], key: str, payload: bytes) -> None:
+        if cache_file is None:
+            return
+        write_cache_file(cache_file, key, payload)
+        prune_cache_files(cache_file.parent, "*.pickle", self.max_cache_files)
+
+
+def _translate(
+    template: Dict[str, Any],
+    parameters: Dict[str, Any],
+    region_name: str,
+    account_id: str,
+    stack_name: str,
+    managed_policy_map: Optional[ManagedPolicyMap],
+) -> Dict[str, Any]:
+    """Run aws-sam-translator on a copy of the template."""
+    import boto3
+    from samtranslator.parser.parser import Parser
+    from samtranslator.translator.translator import Translator
+
+    # The session only provides the region and partition, the translator makes no AWS calls with it
+    translator = Translator(None, Parser(), boto_session=boto3.Session(region_name=region_name))
+    return translator.translate(
+        rebuild(template),
+        parameter_values={
+            **parameters,
+            "AWS::Region": region_name,
+            "AWS::AccountId": account_id,
+            "AWS::StackName": stack_name,
+        },
+        get_managed_policy_map=managed_policy_map or dict,
+    )
+
+
+_default_cache = TranslationCache()
+
+
+def translate_template(
+    template: Dict[str, Any],
+    parameters: Optional[Dict[str, Any]] = None,
+    region_name: str = "us-east-1",
+    account_id: str = "123456789012",
+    stack_name: str = "my-stack",
+    managed_policy_map: Optional[ManagedPolicyMap] = None,
+    cache_dir: Optional[Union[str, Path]] = None,
+) -> Dict[str, Any]:
+    """Translate a SAM template to CloudFormation using the process-wide translation cache.
+
+    See :meth:`TranslationCache.translate` for the arguments.
+
+    Returns:
+        Dict[str, Any]: A fresh copy of the translated template.
+    """
+    return _default_cache.translate(
+        template,
+        parameters=parameters,
+        region_name=region_name,
+        account_id=account_id,
+        stack_name=stack_name,
+        managed_policy_map=managed_policy_map,
+        cache_dir=cache_dir,
+    )
+
+
+def clear_translation_cache() -> None:
+    """Drop all translations kept in memory by the process-wide translation cache."""
+    _default_cache.clear()
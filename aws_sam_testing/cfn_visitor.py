@@ -0,0 +1,185 @@
+"""Iterative traversal of CloudFormation template trees.
+
+The template processor analyses and rewrites templates in several passes (collecting
+references, finding references to removed resources, converting tags to intrinsic
+functions, ...). This module provides a single traversal engine for all of them. It
+walks the tree with an explicit stack instead of recursion, so deeply nested values,
+e.g. large Step Functions definitions, never hit Python's recursion limit.
+
+Intrinsic functions are reported the same way whether they were loaded as
+:class:`~aws_sam_testing.cfn_tags.CloudFormationObject` tags (``!Ref Bucket``) or as
+JSON-style dictionaries (``{"Ref": "Bucket"}``).
+"""
+
+from typing import Any, Callable, Iterator, List, Optional, Tuple
+
+from .cfn_tags import CloudFormationObject
+
+
+class _Sentinel:
+    def __init__(self, name: str) -> None:
+        self.name = name
+
+    def __repr__(self) -> str:
+        return self.name
+
+
+REMOVE: Any = _Sentinel("REMOVE")
+"""Returned from a :func:`rebuild` callback to drop the node from its parent."""
+
+
+class Keep:
+    """Returned from a :func:`rebuild` callback to keep a node as it is, without visiting or copying its children.
+
+    Attributes:
+        value: The node to keep.
+    """
+
+    __slots__ = ("value",)
+
+    def __init__(self, value: Any) -> None:
+        self.value = value
+
+
+def is_intrinsic_key(key: Any) -> bool:
+    """Check whether a mapping key is the name of an intrinsic function (``Ref`` or ``Fn::*``)."""
+    return isinstance(key, str) and (key == "Ref" or key.startswith("Fn::"))
+
+
+def is_intrinsic(value: Any) -> bool:
+    """Check whether a value is an intrinsic function, either a tag object or a dictionary with an intrinsic key."""
+    if isinstance(value, CloudFormationObject):
+        return True
+    return isinstance(value, dict) and any(is_intrinsic_key(key) for key in value)
+
+
+class TemplateVisitor:
+    """Base class for an analysis run by :func:`walk`.
+
+    Subclasses override :meth:`visit_intrinsic`. A visitor that has found what it was
+    looking for sets ``done`` to True and receives no further callbacks; the traversal
+    stops as soon as all visitors are done.
+
+    Attributes:
+        done: Whether the visitor needs no more callbacks.
+
+    Example:
+        >>> class RefCounter(TemplateVisitor):
+        ...     def __init__(self):
+        ...         self.count = 0
+        ...     def visit_intrinsic(self, name, data):
+        ...         if name == "Ref":
+        ...             self.count += 1
+        >>> counter = RefCounter()
+        >>> walk({"A": {"Ref": "B"}, "C": [{"Ref": "D"}]}, counter)
+        >>> counter.count
+        2
+    """
+
+    done: bool = False
+
+    def visit_intrinsic(self, name: str, data: Any) -> None:
+        """Called for every intrinsic function in the traversed tree.
+
+        Args:
+            name: The function name, e.g. "Ref" or "Fn::GetAtt"
+            data: The function arguments as they appear in the template
+        """
+
+
+def walk(value: Any, *visitors: TemplateVisitor) -> None:
+    """Traverse a tree once and report every intrinsic function to all visitors.
+
+    Dictionaries, lists and the data of tag objects are traversed, other values are leaves.
+    Nodes are visited depth-first in template order, each node before its children.
+
+    Args:
+        value: The root of the tree, e.g. a template, a resource or a property value
+        *visitors: The analyses to run
+    """
+    active: List[TemplateVisitor] = [visitor for visitor in visitors if not visitor.done]
+    stack = [value]
+
+    while stack and active:
+        node = stack.pop()
+
+        if isinstance(node, CloudFormationObject):
+            for visitor in active:
+                visitor.visit_intrinsic(node.name, node.data)  # type: ignore[arg-type]
+            stack.append(node.data)
+        elif isinstance(node, dict):
+            for key, item in node.items():
+                if is_intrinsic_key(key):
+                    for visitor in active:
+                        visitor.visit_intrinsic(key, item)
+            # Push in reverse so that siblings are visited in template order
+            stack.extend(reversed(node.values()))
+        elif isinstance(node, list):
+            stack.extend(reversed(node))
+        else:
+            continue
+
+        if any(visitor.done for visitor in active):
+            active = [visitor for visitor in active if not visitor.done]
+
+
+def rebuild(value: Any, replace: Optional[Callable[[Any], Any]] = None) -> Any:
+    """Create a copy of a tree, optionally replacing or dropping intrinsic functions.
+
+    All dictionaries, lists and tag objects are copied, other values are shared with the source.
+    ``replace`` is called with every intrinsic function node (see :func:`is_intrinsic`) before
+    its children are copied and may return:
+
+    - the node itself, to copy it as usual,
+    - a different value, which is copied in place of the node,
+    - :class:`Keep`, to use the wrapped value as it is without copying its children,
+    - :data:`REMOVE`, to drop the node from its parent dictionary or list.
+
+    Args:
+        value: The root of the tree
+        replace: Callback for intrinsic function nodes
+
+    Returns:
+        The copied tree, or REMOVE if the root itself was removed
+    """
+    root: List[Any] = []
+    # Each frame holds a copied container and an iterator over the (key, child) pairs still to be copied into it
+    stack: List[Tuple[Any, Iterator[Tuple[Any, Any]]]] = [(root, iter([(None, value)]))]
+
+    while stack:
+        target, items = stack[-1]
+        for key, child in items:
+            if replace is not None and is_intrinsic(child):
+                child = replace(child)
+                if child is REMOVE:
+                    continue
+
+            children: Optional[Iterator[Tuple[Any, Any]]] = None
+            if isinstance(child, Keep):
+                copied = child.value
+            elif isinstance(child, dict):
+                copied = {}
+                children = iter(child.items())
+            elif isinstance(child, list):
+                copied = []
+                children = ((None, item) for item in child)
+            elif isinstance(child, CloudFormationObject):
+                copied = child.__class__(None)
+                children = iter([(None, child.data)])
+            else:
+                copied = child
+
+            if isinstance(target, dict):
+                target[key] = copied
+            elif isinstance(target, list):
+                target.append(copied)
+            else:
+                target.data = copied
+
+            if children is not None:
+                stack.append((copied, children))
+                break
+        else:
+            stack.pop()
+
+    return root[0] if root else REMOVE
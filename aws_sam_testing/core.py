@@ -72,6 +72,8 @@ class CloudFormationTool:
 def _load_template(template_path: str | Path) -> dict[str, Any]:
     """Load a CloudFormation template from a file.
 
+    Parsed templates are cached in memory and on disk, see :mod:`aws_sam_testing.cfn_cache`.
+
     Args:
         template_path (str | Path): Path to the CloudFormation template file.
 
@@ -88,6 +90,6 @@ def _load_template(template_path: str | Path) -> dict[str, Any]:
     if not template_path.exists():
         raise FileNotFoundError(f"Template file not found at {template_path}")
 
-    from aws_sam_testing.cfn import load_yaml
+    from aws_sam_testing.cfn_cache import load_template
 
-    return load_yaml(template_path.read_text())
+    return load_template(template_path)
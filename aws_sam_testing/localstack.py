@@ -302,6 +302,7 @@ class LocalStackToolkit(CloudFormationTool):
         feature_set: LocalStackFeautureSet = LocalStackFeautureSet.NORMAL,
         build_dir: Path | None = None,
         region: str | None = None,
+        parameters: dict[str, Any] | None = None,
     ) -> Path:
         """
         Creates a new AWS SAM build that can be executed in localstack.
@@ -323,16 +324,25 @@ class LocalStackToolkit(CloudFormationTool):
             <project_root>/.aws-sam/aws-sam-testing-localstack-base-build
             <project_root>/.aws-sam/aws-sam-testing-localstack-processed-build
 
+        If parameters are given, the template conditions are evaluated against them and the resources,
+        outputs and Fn::If branches they disable are left out of the processed build.
+        Pass the same parameters to run_localstack.
+
         Args:
             feature_set (LocalStackFeautureSet, optional): _description_. Defaults to LocalStackFeautureSet.NORMAL.
             build_dir (Path | None, optional): _description_. Defaults to None.
+            region (str | None, optional): The AWS region. Defaults to the AWS_REGION environment variable or us-east-1.
+            parameters (dict[str, Any] | None, optional): The stack parameters used to evaluate the template conditions.
+                If None, the conditions are not evaluated.
 
         Returns:
             Path: The path to the processed build directory.
         """
         import os
 
-        from aws_sam_testing.cfn import dump_yaml
+        from aws_sam_testing.cfn import PASSES_DIR_NAME, PassManager
+        from aws_sam_testing.cfn_cache import default_cache_dir
+        from aws_sam_testing.cfn_intrinsics import DEFAULT_PSEUDO_PARAMETERS
 
         if region is None:
             region = os.environ.get("AWS_REGION", "us-east-1")
@@ -349,27 +359,33 @@ class LocalStackToolkit(CloudFormationTool):
 
         assert localstack_processed_build_dir is not None
 
-        processed_template_path = self.template_path.parent / "template.localstack.yaml"
         if feature_set == LocalStackFeautureSet.NORMAL:
-            processor = LocalStackCloudFormationTemplateProcessor(
-                template=self.template,
+            # The template passes run in memory, their outputs are memoized next to the template cache
+            manager = PassManager(
+                cache_dir=default_cache_dir(self.template_path) / PASSES_DIR_NAME,
+                processor_class=LocalStackCloudFormationTemplateProcessor,
+                copy_on_write=True,
             )
-            processor.remove_pro_resources()
-            processed_template = processor.processed_template
-            dump_yaml(processed_template, stream=processed_template_path.open("w"))
-
-            try:
-                # process the lambda layers
-                # this creates new AWS SAM build with flattened layers
-                self._process_lambda_layers(
-                    source_template_path=processed_template_path,
-                    build_dir=localstack_processed_build_dir,
-                    flatten_layers=True,
-                    layer_cache_dir=build_dir / "tmp" / "aws-sam-testing-localstack-layers",
-                    region=region,
+            if parameters is not None:
+                pseudo_parameters = {**DEFAULT_PSEUDO_PARAMETERS, "AWS::Region": region}
+                manager.add(
+                    "prune_conditions",
+                    lambda processor: processor.prune_conditions(parameters=parameters, pseudo_parameters=pseudo_parameters),
+                    inputs={"parameters": parameters, "pseudo_parameters": pseudo_parameters},
                 )
-            finally:
-                processed_template_path.unlink()
+            manager.add("remove_pro_resources", lambda processor: processor.remove_pro_resources())
+            processed_template = manager.run(self.template).template
+
+            # process the lambda layers
+            # this creates new AWS SAM build with flattened layers
+            self._process_lambda_layers(
+                source_template_path=self.template_path,
+                build_dir=localstack_processed_build_dir,
+                flatten_layers=True,
+                layer_cache_dir=build_dir / "tmp" / "aws-sam-testing-localstack-layers",
+                region=region,
+                template=processed_template,
+            )
         else:
             raise NotImplementedError("PRO features are not supported yet")
 
@@ -430,6 +446,7 @@ class LocalStackToolkit(CloudFormationTool):
         flatten_layers: bool = True,
         layer_cache_dir: Path | None = None,
         region: str | None = None,
+        template: dict[str, Any] | None = None,
     ) -> Path:
         """
         Processes the AWS SAM build directory so it can be executed safely in localstack.
@@ -489,16 +506,23 @@ class LocalStackToolkit(CloudFormationTool):
             build_dir (Path): The destination directory where the SAM build with processed build.
             flatten_layers (bool, optional): _description_. Defaults to True.
             layer_cache_dir (Path, optional): The directory where the layers will be cached. Defaults to None.
+            template (dict[str, Any] | None, optional): The already processed template. If given, it is used instead
+                of loading source_template_path again; code paths are still relative to source_template_path.
 
         Returns:
             Path: The path to the new build directory.
         """
         import shutil
 
+        from aws_sam_testing.cfn import dump_yaml, load_yaml_file
+
         # If not flattening layers, just copy the source to the build dir
         if not flatten_layers:
             if source_template_path.parent != build_dir:
                 shutil.copytree(source_template_path.parent, build_dir, dirs_exist_ok=True)
+            if template is not None:
+                with open(build_dir / "template.yaml", "w") as f:
+                    dump_yaml(template, stream=f)
             return build_dir
 
         # Set up layer cache directory
@@ -506,20 +530,17 @@ class LocalStackToolkit(CloudFormationTool):
             layer_cache_dir = build_dir / ".layer-cache"
         layer_cache_dir.mkdir(parents=True, exist_ok=True)
 
-        # Load the template
-        from aws_sam_testing.cfn import dump_yaml, load_yaml_file
-
-        template = load_yaml_file(str(source_template_path))
-        processor = CloudFormationTemplateProcessor(template)
+        # Load the template, unless the caller passes it in memory
+        if template is None:
+            template = load_yaml_file(str(source_template_path))
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
         template = processor.processed_template
 
         # Create build directory structure
         build_dir.mkdir(parents=True, exist_ok=True)
 
         # Find all Lambda and Serverless functions
-        lambda_functions = processor.find_resources_by_type("AWS::Lambda::Function")
-        serverless_functions = processor.find_resources_by_type("AWS::Serverless::Function")
-        all_functions = lambda_functions + serverless_functions
+        all_functions = processor.find_resources_by_type(["AWS::Lambda::Function", "AWS::Serverless::Function"])
 
         # Track which layers we've processed
         processed_layers = {}
@@ -587,12 +608,10 @@ class LocalStackToolkit(CloudFormationTool):
 
             # Remove Layers property from the function
             if "Layers" in processor.processed_template["Resources"][logical_id]["Properties"]:
-                del processor.processed_template["Resources"][logical_id]["Properties"]["Layers"]
+                del processor.get_mutable("Resources", logical_id, "Properties")["Layers"]
 
         # Remove layer resources that were flattened
-        for layer_id in layers_to_remove:
-            if layer_id in processor.processed_template.get("Resources", {}):
-                processor.remove_resource(layer_id, auto_remove_dependencies=False)
+        processor.remove_resources(sorted(layers_to_remove))
 
         # Save the modified template
         output_template_path = build_dir / "template.yaml"
@@ -605,6 +624,7 @@ class LocalStackToolkit(CloudFormationTool):
 
         This method substitutes CloudFormation variables (${variableName}) in a string
         with their actual values. Currently only supports AWS::Region variable.
+        Substitution is done by the local intrinsic function evaluator, see aws_sam_testing.cfn_intrinsics.
 
         Args:
             template_string: The string containing variables to substitute
@@ -623,27 +643,26 @@ class LocalStackToolkit(CloudFormationTool):
             >>> toolkit._substitute_cloudformation_variables("arn:aws:lambda:${AWS::Region}:123:layer:my-layer:1", "eu-west-1")
             'arn:aws:lambda:eu-west-1:123:layer:my-layer:1'
         """
-        import re
+        return self._evaluate_layer_reference({"Fn::Sub": template_string}, region)
 
-        # Find all variables in the string
-        variable_pattern = re.compile(r"\$\{([^}]+)\}")
-        variables = variable_pattern.findall(template_string)
+    def _evaluate_layer_reference(self, value: Any, region: str | None = None) -> Any:
+        """Evaluate intrinsic functions in a layer reference.
 
-        # Check for unsupported variables
-        supported_variables = {"AWS::Region"}
-        unsupported = set(variables) - supported_variables
-        if unsupported:
-            raise ValueError(f"Unsupported CloudFormation variables: {', '.join(sorted(unsupported))}")
+        Only the AWS::Region pseudo parameter is known before the stack is deployed, so all other
+        parameters, pseudo parameters and resource references are reported as unsupported.
 
-        # Substitute variables
-        result = template_string
-        if "AWS::Region" in variables:
-            # Use provided region or default
-            if region is None:
-                region = "us-east-1"
-            result = result.replace("${AWS::Region}", region)
+        Raises:
+            ValueError: If the value contains unsupported variables
+        """
+        from aws_sam_testing.cfn_intrinsics import IntrinsicEvaluator, IntrinsicResolutionError
 
-        return result
+        evaluator = IntrinsicEvaluator(pseudo_parameters={"AWS::Region": region or "us-east-1"})
+        try:
+            return evaluator.evaluate(value)
+        except IntrinsicResolutionError as e:
+            if e.names:
+                raise ValueError(f"Unsupported CloudFormation variables: {', '.join(e.names)}") from e
+            raise
 
     def _resolve_layer_arn(self, layer_ref: Any, region: str | None = None) -> str | None:
         """Resolve a layer reference to its ARN or a special reference identifier.
@@ -654,7 +673,10 @@ class LocalStackToolkit(CloudFormationTool):
         1. Direct ARN strings: "arn:aws:lambda:region:account:layer:name:version"
         2. CloudFormation Ref: {"Ref": "LayerLogicalId"}
         3. CloudFormation GetAtt: {"Fn::GetAtt": ["LayerLogicalId", "Arn"]}
-        4. CloudFormation Sub: {"Fn::Sub": "arn:aws:lambda:${AWS::Region}:..."}
+        4. CloudFormation Sub: {"Fn::Sub": "arn:aws:lambda:${AWS::Region}:..."}, including
+           the [template_string, {var: value}] format
+
+        Tag objects (!Ref, !Sub, ...) are handled the same way as their JSON forms.
 
         Args:
             layer_ref: The layer reference from the template. Can be:
@@ -680,23 +702,23 @@ class LocalStackToolkit(CloudFormationTool):
             >>> toolkit._resolve_layer_arn({"Fn::Sub": "arn:aws:lambda:${AWS::Region}:123:layer:my-layer:1"}, "eu-west-1")
             'arn:aws:lambda:eu-west-1:123:layer:my-layer:1'
         """
+        from aws_sam_testing.cfn_tags import CloudFormationObject
+
         if isinstance(layer_ref, str):
             return layer_ref
-        elif isinstance(layer_ref, dict):
+        elif isinstance(layer_ref, CloudFormationObject):
+            # Same as the JSON form, e.g. !Ref MyLayer -> {"Ref": "MyLayer"}
+            layer_ref = {layer_ref.name: layer_ref.data}
+
+        if isinstance(layer_ref, dict):
             if "Ref" in layer_ref:
                 # Local layer reference
                 return f"!Ref:{layer_ref['Ref']}"
             elif "Fn::Sub" in layer_ref:
-                # Handle Fn::Sub
+                # Handle Fn::Sub, both the string and the [template_string, {var: value}] format
                 sub_value = layer_ref["Fn::Sub"]
-                if isinstance(sub_value, str):
-                    # Simple string substitution
-                    return self._substitute_cloudformation_variables(sub_value, region)
-                elif isinstance(sub_value, list) and len(sub_value) == 2:
-                    # Format: [template_string, {var: value}]
-                    # For now, we don't support custom variables in the second parameter
-                    template_string = sub_value[0]
-                    return self._substitute_cloudformation_variables(template_string, region)
+                if isinstance(sub_value, str) or (isinstance(sub_value, list) and len(sub_value) == 2 and isinstance(sub_value[1], dict)):
+                    return self._evaluate_layer_reference({"Fn::Sub": sub_value}, region)
                 else:
                     return None
             elif "Fn::GetAtt" in layer_ref:
@@ -1263,17 +1285,11 @@ class LocalStackCloudFormationTemplateProcessor(CloudFormationTemplateProcessor)
         Remove all resources that require LocalStack PRO from the template.
         This includes removing the resources and all their dependencies.
         """
-        resources_to_remove = []
-
-        # Find all PRO resources in the template
-        for resource_type in self.PRO_RESOURCES:
-            pro_resources = self.find_resources_by_type(resource_type)
-            for logical_id, _ in pro_resources:
-                resources_to_remove.append(logical_id)
+        # Find all PRO resources in the template with a single type index lookup
+        resources_to_remove = [logical_id for logical_id, _ in self.find_resources_by_type(self.PRO_RESOURCES)]
 
-        # Remove each PRO resource (remove_resource will handle dependencies and references)
-        for resource_id in resources_to_remove:
-            self.remove_resource(resource_id, auto_remove_dependencies=False)
+        # Remove all PRO resources in a single pass (remove_resources will handle references)
+        self.remove_resources(resources_to_remove)
 
         # Clean up outputs that no longer have values
         self._clean_invalid_outputs()
@@ -1290,5 +1306,7 @@ class LocalStackCloudFormationTemplateProcessor(CloudFormationTemplateProcessor)
             if isinstance(output_value, dict) and "Value" not in output_value:
                 outputs_to_remove.append(output_name)
 
-        for output_name in outputs_to_remove:
-            del self.processed_template["Outputs"][output_name]
+        if outputs_to_remove:
+            outputs = self.get_mutable("Outputs")
+            for output_name in outputs_to_remove:
+                del outputs[output_name]
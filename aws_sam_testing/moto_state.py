@@ -0,0 +1,237 @@
+"""Snapshots of the state of the moto backends.
+
+Creating the resources of a template with moto is slow (every table, queue and bucket goes through
+the CloudFormation parser of moto), while copying the resulting backend state is cheap. A
+:class:`MotoSnapshot` captures the state of all moto backends in use, so that it can be restored
+before every test instead of creating the resources again.
+
+For the same reason, :func:`reset_backends` discards the state of an account and region at once,
+which is much cheaper than deleting the resources one by one.
+
+Both rely on internals of moto (the registry of backends in use and its lock), which are checked
+before use: :func:`is_supported` tells whether the installed moto version has them, otherwise
+:class:`UnsupportedMotoVersionError` is raised. The tested moto versions are pinned in ``pyproject.toml``.
+
+Example:
+    >>> with mock_aws():
+    ...     manager.create()
+    ...     snapshot = MotoSnapshot.take()
+    >>> with mock_aws():
+    ...     snapshot.restore()  # the resources exist again
+"""
+
+import io
+import pickle
+import threading
+import types
+import weakref
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Tuple
+
+if TYPE_CHECKING:
+    from moto.core.base_backend import BackendDict
+
+
+class UnsupportedMotoVersionError(RuntimeError):
+    """The installed moto version does not have the internals the backend state is accessed through."""
+
+
+def _backend_registry() -> Tuple[Any, Any]:
+    """Return moto's registry of backends and the lock that guards it.
+
+    Raises:
+        UnsupportedMotoVersionError: If moto does not keep its backends in use in ``BackendDict._instances``
+            or has no ``backend_lock``.
+
+    Returns:
+        Tuple[Any, Any]: The ``BackendDict`` class and the lock.
+    """
+    import moto
+    from moto.core import base_backend
+
+    backend_dict = getattr(base_backend, "BackendDict", None)
+    lock = getattr(base_backend, "backend_lock", None)
+    if backend_dict is None or lock is None or not isinstance(getattr(backend_dict, "_instances", None), list):
+        raise UnsupportedMotoVersionError(
+            f"moto {getattr(moto, '__version__', 'unknown')} does not expose BackendDict._instances and backend_lock, the moto backend state cannot be snapshotted or reset"
+        )
+    return backend_dict, lock
+
+
+def is_supported() -> bool:
+    """Return whether the installed moto version supports snapshots and resets of the backend state."""
+    try:
+        _backend_registry()
+    except UnsupportedMotoVersionError:
+        return False
+    return True
+
+
+# Synchronization primitives cannot be pickled, the restored state gets new (released) ones
+_SYNCHRONIZATION_PRIMITIVES = {
+    type(threading.Lock()): threading.Lock,
+    type(threading.RLock()): threading.RLock,
+    threading.Condition: threading.Condition,
+}
+
+
+class _SnapshotPickler(pickle.Pickler):
+    """Pickler for backend state.
+
+    The backend registries and local functions (e.g. the factories of ``defaultdict`` attributes) cannot
+    be pickled and are never modified, they are kept by reference in ``shared`` instead.
+    """
+
+    def __init__(self, file: io.BytesIO, shared: List[Any]) -> None:
+        super().__init__(file, protocol=pickle.HIGHEST_PROTOCOL)
+        self.shared = shared
+        self._shared_ids: Dict[int, int] = {}
+        self._backend_dict_class, _ = _backend_registry()
+
+    def persistent_id(self, obj: Any) -> Any:
+        if isinstance(obj, self._backend_dict_class) or (isinstance(obj, types.FunctionType) and "<" in obj.__qualname__):
+            index = self._shared_ids.get(id(obj))
+            if index is None:
+                index = self._shared_ids[id(obj)] = len(self.shared)
+                self.shared.append(obj)
+            return index
+        return None
+
+    def reducer_override(self, obj: Any) -> Any:
+        obj_type = type(obj)
+        factory = _SYNCHRONIZATION_PRIMITIVES.get(obj_type)
+        if factory is not None:
+            return factory, ()
+        if obj_type is weakref.WeakValueDictionary or obj_type is weakref.WeakKeyDictionary:
+            return obj_type, (dict(obj.items()),)
+        if obj_type is weakref.WeakSet:
+            return obj_type, (list(obj),)
+        return NotImplemented
+
+
+class _SnapshotUnpickler(pickle.Unpickler):
+    def __init__(self, file: io.BytesIO, shared: List[Any]) -> None:
+        super().__init__(file)
+        self.shared = shared
+
+    def persistent_load(self, pid: Any) -> Any:
+        return self.shared[pid]
+
+
+class MotoSnapshot:
+    """Snapshot of the state of all moto backends in use.
+
+    The snapshot is taken in pickled form, every :meth:`restore` creates a new copy of the state, so
+    a snapshot can be restored any number of times. Objects that reference the backend state, such
+    as the moto ``ResourceMap`` of a stack, can be captured together with it, their restored copies
+    then reference the restored backend state.
+
+    Use :meth:`take` to take a snapshot.
+
+    Attributes:
+        size: Size of the pickled state in bytes.
+    """
+
+    __slots__ = ("_backend_dicts", "_shared", "_payload")
+
+    def __init__(self, backend_dicts: List["BackendDict"], shared: List[Any], payload: bytes) -> None:
+        self._backend_dicts = backend_dicts
+        self._shared = shared
+        self._payload = payload
+
+    @classmethod
+    def take(cls, *objects: Any) -> "MotoSnapshot":
+        """Take a snapshot of the moto backends.
+
+        Args:
+            *objects: Objects that are captured together with the backend state and returned by :meth:`restore`.
+
+        Raises:
+            pickle.PicklingError: If the backend state holds objects that cannot be copied.
+            UnsupportedMotoVersionError: If the installed moto version is not supported.
+
+        Returns:
+            MotoSnapshot: The snapshot.
+        """
+        BackendDict, backend_lock = _backend_registry()
+
+        with backend_lock:
+            backend_dicts = list(BackendDict._instances)
+            state = [{account_id: dict(account_backends) for account_id, account_backends in backend_dict.items()} for backend_dict in backend_dicts]
+            shared: List[Any] = []
+            file = io.BytesIO()
+            _SnapshotPickler(file, shared).dump((state, objects))
+
+        return cls(backend_dicts, shared, file.getvalue())
+
+    @property
+    def size(self) -> int:
+        return len(self._payload)
+
+    def restore(self) -> Tuple[Any, ...]:
+        """Replace the state of the moto backends with a copy of the snapshot.
+
+        Backends that were not in use when the snapshot was taken are reset. Call this while the
+        moto mock is active, e.g. inside ``mock_aws()``.
+
+        Raises:
+            UnsupportedMotoVersionError: If the installed moto version is not supported.
+
+        Returns:
+            Tuple[Any, ...]: Copies of the objects captured with :meth:`take`.
+        """
+        BackendDict, backend_lock = _backend_registry()
+
+        state, objects = _SnapshotUnpickler(io.BytesIO(self._payload), self._shared).load()
+
+        with backend_lock:
+            for backend_dict in list(BackendDict._instances):
+                if backend_dict not in self._backend_dicts:
+                    for account_backends in backend_dict.values():
+                        account_backends.reset()
+                    backend_dict.clear()
+                    BackendDict._instances.remove(backend_dict)
+
+            for backend_dict, accounts in zip(self._backend_dicts, state):
+                backend_dict.clear()
+                for account_id, regions in accounts.items():
+                    # Registers the backend as in use, so that moto resets it when the mock stops
+                    account_backends = backend_dict[account_id]
+                    for region_name, backend in regions.items():
+                        account_backends[region_name] = backend
+
+        return objects
+
+
+def reset_backends(account_id: str, region_names: Iterable[str]) -> int:
+    """Reset the state of all moto backends in use for an account in the given regions.
+
+    This discards everything in those regions of the account at once, no matter how many resources
+    were created, instead of deleting the resources one by one. Global services (IAM, S3, ...) keep
+    their state under the partition name, e.g. ``aws``, include it to reset them too.
+
+    Args:
+        account_id: The account.
+        region_names: The regions and partitions.
+
+    Raises:
+        UnsupportedMotoVersionError: If the installed moto version is not supported.
+
+    Returns:
+        int: The number of backends that were reset.
+    """
+    BackendDict, backend_lock = _backend_registry()
+
+    region_names = list(region_names)
+    count = 0
+    with backend_lock:
+        for backend_dict in BackendDict._instances:
+            # dict.get does not create missing backends like BackendDict.__getitem__ does
+            account_backends = dict.get(backend_dict, account_id)
+            if account_backends is None:
+                continue
+            for region_name in region_names:
+                backend = dict.get(account_backends, region_name)
+                if backend is not None:
+                    backend.reset()
+                    count += 1
+    return count
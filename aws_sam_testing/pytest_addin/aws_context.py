@@ -1,11 +1,15 @@
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 
-import boto3
 import pytest
 
-from aws_sam_testing.aws_sam import IsolationLevel
-from aws_sam_testing.localstack import LocalStackFeautureSet
+# The plugins are loaded by every pytest session, the SAM CLI, moto and boto3 are only imported
+# when a fixture that needs them is requested
+if TYPE_CHECKING:
+    import boto3
+
+    from aws_sam_testing.aws_sam import IsolationLevel
+    from aws_sam_testing.localstack import LocalStackFeautureSet
 
 
 class AWSTestContext:
@@ -16,10 +20,10 @@ class AWSTestContext:
         self._pytest_request_context: pytest.FixtureRequest = pytest_request_context
         self._project_root: Path | None = None
         self._template_name: str = "template.yaml"
-        self._isolation_level: IsolationLevel = IsolationLevel.NONE
+        self._isolation_level: "IsolationLevel | None" = None
         self._build_dir: Path | None = None
         self._localstack_runs_build: bool = False
-        self._localstack_feature_set: LocalStackFeautureSet = LocalStackFeautureSet.NORMAL
+        self._localstack_feature_set: "LocalStackFeautureSet | None" = None
 
     def get_project_root(self) -> Path:
         from aws_sam_testing.util import find_project_root
@@ -51,10 +55,14 @@ class AWSTestContext:
     def get_template_path(self) -> Path:
         return self.get_project_root() / self._template_name
 
-    def get_api_isolation_level(self) -> IsolationLevel:
+    def get_api_isolation_level(self) -> "IsolationLevel":
+        if self._isolation_level is None:
+            from aws_sam_testing.aws_sam import IsolationLevel
+
+            self._isolation_level = IsolationLevel.NONE
         return self._isolation_level
 
-    def set_api_isolation_level(self, isolation_level: IsolationLevel) -> None:
+    def set_api_isolation_level(self, isolation_level: "IsolationLevel") -> None:
         self._isolation_level = isolation_level
 
     def get_localstack_runs_build(self) -> bool:
@@ -63,10 +71,14 @@ class AWSTestContext:
     def set_localstack_runs_build(self, localstack_runs_build: bool) -> None:
         self._localstack_runs_build = localstack_runs_build
 
-    def get_localstack_feature_set(self) -> LocalStackFeautureSet:
+    def get_localstack_feature_set(self) -> "LocalStackFeautureSet":
+        if self._localstack_feature_set is None:
+            from aws_sam_testing.localstack import LocalStackFeautureSet
+
+            self._localstack_feature_set = LocalStackFeautureSet.NORMAL
         return self._localstack_feature_set
 
-    def set_localstack_feature_set(self, localstack_feature_set: LocalStackFeautureSet) -> None:
+    def set_localstack_feature_set(self, localstack_feature_set: "LocalStackFeautureSet") -> None:
         self._localstack_feature_set = localstack_feature_set
 
 
@@ -96,7 +108,8 @@ def aws_region():
 
 
 @pytest.fixture
-def mock_aws_session() -> Generator[boto3.Session, None, None]:
+def mock_aws_session() -> Generator["boto3.Session", None, None]:
+    import boto3
     from moto import mock_aws
 
     with mock_aws():
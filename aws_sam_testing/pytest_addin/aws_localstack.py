@@ -1,11 +1,13 @@
 import logging
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 
 import pytest
 
-from aws_sam_testing.localstack import LocalStack
 from aws_sam_testing.pytest_addin.aws_context import AWSTestContext
 
+if TYPE_CHECKING:
+    from aws_sam_testing.localstack import LocalStack
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,7 +15,7 @@ logger = logging.getLogger(__name__)
 def aws_localstack(
     request,
     aws_context: AWSTestContext,
-) -> Generator[LocalStack, None, None]:
+) -> Generator["LocalStack", None, None]:
     """
     Pytest fixture that builds and runs a local AWS SAM API for the duration of the test session.
 
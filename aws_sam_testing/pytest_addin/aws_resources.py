@@ -1,25 +1,44 @@
 from contextlib import contextmanager
 from pathlib import Path
-from typing import Generator
+from typing import TYPE_CHECKING, Generator, Iterable
 
-import boto3
 import pytest
-from boto3.resources.base import ServiceResource
+
+from aws_sam_testing.cfn_table import ResourceTable
+
+if TYPE_CHECKING:
+    import boto3
+    from boto3.resources.base import ServiceResource
+
+    from aws_sam_testing.moto_state import MotoSnapshot
+
+
+def pytest_configure(config):
+    config.addinivalue_line(
+        "markers",
+        "aws_resources(*logical_ids, lazy=False): create only these template resources and the resources they reference for mock_aws_resources, with lazy=True create them on first use",
+    )
 
 
 class ResourceManager:
     def __init__(
         self,
-        session: boto3.Session,
+        session: "boto3.Session",
         working_dir: Path | None,
         template_name: str = "template.yaml",
         template: dict | None = None,
         region_name: str | None = None,
+        bulk_teardown: bool = False,
+        only: Iterable[str] | None = None,
+        lazy: bool = False,
     ):
         from aws_sam_testing.aws_resources import AWSResourceManager
-        from aws_sam_testing.cfn import load_yaml_file
+        from aws_sam_testing.cfn_cache import default_cache_dir, load_template
+        from aws_sam_testing.cfn_translation import TRANSLATIONS_DIR_NAME
         from aws_sam_testing.util import find_project_root
 
+        native_intrinsics = False
+        cache_dir = None
         if template is not None:
             self.template = template
         else:
@@ -27,16 +46,29 @@ class ResourceManager:
                 working_dir = Path(__file__).parent
 
             project_root = find_project_root(working_dir)
-            template = load_yaml_file(str(project_root / template_name))
+            # Load the tags directly as intrinsic functions, moto does not need them as objects
+            native_intrinsics = True
+            template = load_template(project_root / template_name, native_intrinsics=native_intrinsics)
             self.template = template
+            cache_dir = default_cache_dir(project_root / template_name) / TRANSLATIONS_DIR_NAME
 
         self.session = session
         self.manager = AWSResourceManager(
             session=session,
             template=self.template,
             region_name=region_name,
+            native_intrinsics=native_intrinsics,
+            cache_dir=cache_dir,
+            bulk_teardown=bulk_teardown,
+            only=only,
+            lazy=lazy,
         )
 
+    @property
+    def resources(self) -> ResourceTable:
+        """Read-only table of the resources created by the manager, by logical ID and type."""
+        return self.manager.resource_table
+
     def __enter__(self):
         self.manager.__enter__()
         return self
@@ -44,6 +76,21 @@ class ResourceManager:
     def __exit__(self, exc_type, exc_value, traceback):
         self.manager.__exit__(exc_type, exc_value, traceback)
 
+    def snapshot(self) -> "MotoSnapshot":
+        """Take a snapshot of the moto backends with the created resources."""
+        return self.manager.snapshot()
+
+    def restore(self, session: "boto3.Session", snapshot: "MotoSnapshot") -> None:
+        """Restore a snapshot taken with :meth:`snapshot`, e.g. in the mock of another test.
+
+        Args:
+            session: The boto3 session of the mock the snapshot is restored in.
+            snapshot: The snapshot.
+        """
+        self.session = session
+        self.manager.session = session
+        self.manager.restore(snapshot)
+
     @contextmanager
     def set_environment(
         self,
@@ -53,7 +100,7 @@ class ResourceManager:
         with self.manager.set_environment(lambda_function_logical_name, additional_environment):
             yield self
 
-    def get_resource(self, resource_name: str) -> ServiceResource:
+    def get_resource(self, resource_name: str) -> "ServiceResource":
         import boto3
         from moto.core.common_models import CloudFormationModel
 
@@ -78,18 +125,63 @@ class ResourceManager:
                 raise ValueError(f"Unsupported resource type: {resource_def.cloudformation_type()}")
 
 
+@pytest.fixture(scope="session")
+def _aws_resources_baselines() -> dict[tuple[Path, str, frozenset[str] | None, bool], tuple[ResourceManager, "MotoSnapshot"]]:  # noqa
+    """Resource managers and the snapshots of their created resources, by test directory, region, selected resources and lazy mode."""
+    return {}
+
+
 @pytest.fixture
 def mock_aws_resources(
     request,
-    mock_aws_session: boto3.Session,
+    mock_aws_session: "boto3.Session",
     aws_region,
+    _aws_resources_baselines,
 ) -> Generator[ResourceManager, None, None]:
+    """Resources of the project template, created in the mocked AWS account.
+
+    The resources are created once per session for every test directory and region, and the moto
+    backends are snapshotted right after. Every other test gets a restored copy of the snapshot, so
+    changes made by a test are never seen by the next one. The fixture owns the mock of
+    ``mock_aws_session``, so after the test the resources are discarded at once by resetting the moto
+    backends of the account and region, instead of being deleted one by one. If the installed moto
+    version does not support snapshots and resets (see :func:`aws_sam_testing.moto_state.is_supported`),
+    the resources are created for every test and deleted one by one instead.
+
+    Mark a test with ``@pytest.mark.aws_resources("OrdersTable", "ApiHandler")`` to create only these
+    resources and the resources they reference (e.g. the tables in the environment of a function), so
+    the setup cost of the test scales with the resources it uses rather than with the template.
+    With ``@pytest.mark.aws_resources(lazy=True)``, resources are only created when the test makes the
+    first request that targets them, see the ``lazy`` argument of :class:`AWSResourceManager`.
+    """
+    from aws_sam_testing import moto_state
+
     working_dir = Path(request.node.fspath.dirname)
     assert working_dir.exists()
 
-    with ResourceManager(
-        session=mock_aws_session,
-        working_dir=working_dir,
-        region_name=aws_region,
-    ) as manager:
-        yield manager
+    marker = request.node.get_closest_marker("aws_resources")
+    only = frozenset(marker.args) if marker is not None and marker.args else None
+    lazy = bool(marker.kwargs.get("lazy", False)) if marker is not None else False
+
+    snapshots = moto_state.is_supported()
+    key = (working_dir, aws_region, only, lazy)
+    baseline = _aws_resources_baselines.get(key) if snapshots else None
+    if baseline is None:
+        manager = ResourceManager(
+            session=mock_aws_session,
+            working_dir=working_dir,
+            region_name=aws_region,
+            bulk_teardown=snapshots,
+            only=sorted(only) if only is not None else None,
+            lazy=lazy,
+        )
+        manager.manager.create()
+        if snapshots:
+            _aws_resources_baselines[key] = (manager, manager.snapshot())
+    else:
+        manager, snapshot = baseline
+        manager.restore(mock_aws_session, snapshot)
+
+    yield manager
+
+    manager.manager.delete()
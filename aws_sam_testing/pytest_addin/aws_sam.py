@@ -1,11 +1,13 @@
 import logging
-from typing import Generator
+from typing import TYPE_CHECKING, Generator
 
 import pytest
 
-from aws_sam_testing.aws_sam import LocalApi
 from aws_sam_testing.pytest_addin.aws_context import AWSTestContext
 
+if TYPE_CHECKING:
+    from aws_sam_testing.aws_sam import LocalApi
+
 logger = logging.getLogger(__name__)
 
 
@@ -13,7 +15,7 @@ logger = logging.getLogger(__name__)
 def aws_local_api(
     request,
     aws_context: AWSTestContext,
-) -> Generator[list[LocalApi], None, None]:
+) -> Generator[list["LocalApi"], None, None]:
     """
     Pytest fixture that builds and runs a local AWS SAM API for the duration of the test session.
 
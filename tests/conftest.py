@@ -1,6 +1,18 @@
+import os
+
 import pytest
 
 
+def pytest_collection_modifyitems(config, items):
+    # Wall-clock assertions flake on loaded machines, timing tests only run on request
+    if os.environ.get("AWS_SAM_TESTING_TIMING_TESTS") == "1":
+        return
+    skip_timing = pytest.mark.skip(reason="timing test, set AWS_SAM_TESTING_TIMING_TESTS=1 to run it")
+    for item in items:
+        if "timing" in item.keywords:
+            item.add_marker(skip_timing)
+
+
 @pytest.fixture(scope="function", autouse=True)
 def isolated_aws(monkeypatch, aws_region):
     from moto import mock_aws
@@ -1,3 +1,6 @@
+import pytest
+
+
 def test_mock_aws_resources(
     mock_aws_session,
     mock_aws_resources,
@@ -10,3 +13,36 @@ def test_mock_aws_resources(
     assert len(queues["QueueUrls"]) == 1
     queue_url = queues["QueueUrls"][0]
     assert queue_url == f"https://sqs.{aws_region}.amazonaws.com/123456789012/my-queue"
+
+
+def test_mock_aws_resources_table(mock_aws_resources):
+    assert list(mock_aws_resources.resources) == ["MySQSQueue"]
+    assert mock_aws_resources.resources["MySQSQueue"].properties["QueueName"] == "my-queue"
+
+
+@pytest.mark.parametrize("run", [1, 2])
+def test_mock_aws_resources_isolation(mock_aws_session, mock_aws_resources, run):
+    """Every test gets a fresh copy of the resources, the message sent by the other run is gone."""
+    sqs = mock_aws_session.client("sqs")
+    queue_url = sqs.get_queue_url(QueueName="my-queue")["QueueUrl"]
+    assert "Messages" not in sqs.receive_message(QueueUrl=queue_url, WaitTimeSeconds=0)
+
+    sqs.send_message(QueueUrl=queue_url, MessageBody=f"run {run}")
+    assert mock_aws_resources.manager.get_cfn_resource_by_name("MySQSQueue").name == "my-queue"
+
+
+@pytest.mark.aws_resources("MySQSQueue")
+def test_mock_aws_resources_marker(mock_aws_session, mock_aws_resources):
+    """The marker selects the resources to create, the selection gets its own baseline."""
+    assert mock_aws_resources.manager.only == ("MySQSQueue",)
+    assert list(mock_aws_resources.resources) == ["MySQSQueue"]
+    assert mock_aws_session.client("sqs").get_queue_url(QueueName="my-queue")["QueueUrl"].endswith("/my-queue")
+
+
+@pytest.mark.aws_resources(lazy=True)
+@pytest.mark.parametrize("run", [1, 2])
+def test_mock_aws_resources_lazy(mock_aws_session, mock_aws_resources, run):
+    """In lazy mode the queue is created by the first request that targets it, in every test."""
+    assert mock_aws_resources.manager.creation_times == {}
+    assert mock_aws_session.client("sqs").get_queue_url(QueueName="my-queue")["QueueUrl"].endswith("/my-queue")
+    assert list(mock_aws_resources.manager.creation_times) == ["MySQSQueue"]
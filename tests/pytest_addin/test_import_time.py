@@ -0,0 +1,65 @@
+"""Guard the import cost of the pytest plugins, which are loaded by every pytest session."""
+
+import subprocess
+import sys
+
+import pytest
+
+PLUGIN_MODULES = [
+    "aws_sam_testing.pytest_addin.aws_context",
+    "aws_sam_testing.pytest_addin.aws_lambda_context",
+    "aws_sam_testing.pytest_addin.aws_resources",
+    "aws_sam_testing.pytest_addin.aws_sam",
+    "aws_sam_testing.pytest_addin.aws_localstack",
+    "aws_sam_testing.pytest_addin.database",
+]
+
+# Packages that must only be imported when a fixture that needs them is requested
+HEAVY_MODULES = ["boto3", "botocore", "moto", "samcli", "samtranslator", "docker", "aws_sam_testing.aws_sam", "aws_sam_testing.localstack"]
+
+# Cumulative import time budget of each plugin module, pytest itself is imported before and not counted.
+# Only checked by the opt-in timing tests, it depends on the machine and on the bytecode cache.
+IMPORT_TIME_BUDGET_US = 200_000
+
+
+def _import_times() -> dict[str, int]:
+    """Import the plugins in a fresh interpreter and return the cumulative import time of every module in microseconds."""
+    code = "import pytest; " + "; ".join(f"import {module}" for module in PLUGIN_MODULES)
+    result = subprocess.run([sys.executable, "-X", "importtime", "-c", code], capture_output=True, text=True, check=True)
+
+    import_times = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, module = line[len("import time:") :].split("|")
+        if cumulative.strip().isdigit():
+            import_times[module.strip()] = int(cumulative.strip())
+    return import_times
+
+
+@pytest.fixture(scope="module")
+def import_times() -> dict[str, int]:
+    return _import_times()
+
+
+def test_no_heavy_imports(import_times):
+    """Test that loading the plugins does not import the SAM CLI, moto, boto3 or docker."""
+    assert [module for module in import_times if module.split(".")[0] in HEAVY_MODULES or module in HEAVY_MODULES] == []
+
+
+@pytest.mark.timing
+@pytest.mark.parametrize("module", PLUGIN_MODULES)
+def test_import_time_budget(import_times, module):
+    """Test that every plugin module imports within the budget."""
+    assert module in import_times
+    assert import_times[module] < IMPORT_TIME_BUDGET_US, f"{module} took {import_times[module] / 1000:.1f} ms to import"
+
+
+def test_lazy_package_attribute():
+    """Test that the toolkit is still available from the package."""
+    import aws_sam_testing
+    from aws_sam_testing.aws_sam import AWSSAMToolkit
+
+    assert aws_sam_testing.AWSSAMToolkit is AWSSAMToolkit
+    with pytest.raises(AttributeError):
+        aws_sam_testing.Missing  # noqa: B018
@@ -311,6 +311,448 @@ class TestAWSResourceManager:
         assert os.environ.get("TEST_ENV_VAR_FUNCTION") is None
         assert os.environ.get("TEST_ENV_VAR_ADDITIONAL") is None
 
+    def test_native_intrinsics_template(self):
+        """Test a template loaded with native intrinsics, without mutating it."""
+        import copy
+        import os
+
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+        from aws_sam_testing.cfn import load_yaml
+
+        template = load_yaml(
+            """
+            Resources:
+              MyQueue:
+                Type: AWS::SQS::Queue
+                Properties:
+                  QueueName: test-queue
+              MyLambda:
+                Type: AWS::Serverless::Function
+                Properties:
+                  FunctionName: my-lambda
+                  Handler: app.lambda_handler
+                  Runtime: python3.13
+                  CodeUri: src/
+                  Environment:
+                    Variables:
+                      QUEUE_ARN: !GetAtt MyQueue.Arn
+                      QUEUE_NAME: !GetAtt MyQueue.QueueName
+            """,
+            native_intrinsics=True,
+        )
+        original = copy.deepcopy(template)
+
+        with mock_aws():
+            session = boto3.Session()
+            with AWSResourceManager(
+                session=session,
+                template=template,
+                native_intrinsics=True,
+            ) as resource_manager:
+                assert resource_manager.transformed_template["Resources"]["MyLambda"]["Type"] == "AWS::Lambda::Function"
+                with resource_manager.set_environment(lambda_function_logical_name="MyLambda"):
+                    assert os.environ.get("QUEUE_NAME") == "test-queue"
+                    assert os.environ.get("QUEUE_ARN", "").endswith(":test-queue")
+
+        assert template == original
+
+    def test_conditional_resources(self):
+        """Test that resources disabled by the template conditions are not created."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+        from aws_sam_testing.cfn import load_yaml
+
+        template = load_yaml(
+            """
+            Parameters:
+              Environment:
+                Type: String
+                Default: dev
+            Conditions:
+              IsProd: !Equals [!Ref Environment, prod]
+            Resources:
+              ProdQueue:
+                Type: AWS::SQS::Queue
+                Condition: IsProd
+                Properties:
+                  QueueName: prod-queue
+              Queue:
+                Type: AWS::SQS::Queue
+                Properties:
+                  QueueName: !If [IsProd, main-prod-queue, main-dev-queue]
+            """
+        )
+
+        with mock_aws():
+            session = boto3.Session()
+            with AWSResourceManager(session=session, template=template) as resource_manager:
+                assert list(resource_manager.transformed_template["Resources"]) == ["Queue"]
+                queue_urls = session.client("sqs").list_queues().get("QueueUrls", [])
+                assert [url.rsplit("/", 1)[-1] for url in queue_urls] == ["main-dev-queue"]
+
+            with AWSResourceManager(session=session, template=template, parameters={"Environment": "prod"}):
+                queue_urls = session.client("sqs").list_queues().get("QueueUrls", [])
+                assert sorted(url.rsplit("/", 1)[-1] for url in queue_urls) == ["main-prod-queue", "prod-queue"]
+
+    def test_serverless_translation(self):
+        """Test that events, layers and Globals of serverless functions are translated to CloudFormation resources."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+        from aws_sam_testing.cfn import load_yaml
+
+        template = load_yaml(
+            """
+            Transform: AWS::Serverless-2016-10-31
+            Globals:
+              Function:
+                Runtime: python3.13
+                Timeout: 10
+            Resources:
+              MyLayer:
+                Type: AWS::Serverless::LayerVersion
+                Properties:
+                  LayerName: my-layer
+                  ContentUri: layer/
+              MyLambda:
+                Type: AWS::Serverless::Function
+                Properties:
+                  FunctionName: my-lambda
+                  Handler: app.lambda_handler
+                  CodeUri: src/
+                  Layers:
+                    - !Ref MyLayer
+                  Events:
+                    Get:
+                      Type: Api
+                      Properties:
+                        Path: /items
+                        Method: get
+            """
+        )
+
+        with mock_aws():
+            session = boto3.Session()
+            with AWSResourceManager(session=session, template=template) as resource_manager:
+                resources = resource_manager.transformed_template["Resources"]
+                assert resources["MyLambdaRole"]["Type"] == "AWS::IAM::Role"
+                assert resources["ServerlessRestApi"]["Type"] == "AWS::ApiGateway::RestApi"
+                assert resources["MyLambdaGetPermissionProd"]["Type"] == "AWS::Lambda::Permission"
+
+                function = session.client("lambda").get_function(FunctionName="my-lambda")["Configuration"]
+                assert function["Timeout"] == 10
+                assert function["Role"].endswith(":role/" + resource_manager.get_cfn_resource_by_name("MyLambdaRole").name)
+
+                # The layer version gets a hashed logical ID, its code points to the packaging bucket
+                (layer_name,) = [name for name, resource in resources.items() if resource["Type"] == "AWS::Lambda::LayerVersion"]
+                assert resources["MyLambda"]["Properties"]["Layers"] == [{"Ref": layer_name}]
+                assert resources[layer_name]["Properties"]["Content"]["S3Bucket"] == resource_manager.packaging_bucket_name
+                assert len(session.client("lambda").list_layers()["Layers"]) == 1
+
+    def test_only_selected_resources(self):
+        """Test that only the selected resources and the resources they reference are created."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+        from aws_sam_testing.cfn import load_yaml
+
+        template = load_yaml(
+            """
+            Transform: AWS::Serverless-2016-10-31
+            Globals:
+              Function:
+                Runtime: python3.13
+                Environment:
+                  Variables:
+                    AUDIT_QUEUE_URL: !Ref AuditQueue
+            Resources:
+              AuditQueue:
+                Type: AWS::SQS::Queue
+                Properties:
+                  QueueName: audit-queue
+              OrdersTable:
+                Type: AWS::Serverless::SimpleTable
+                Properties:
+                  TableName: orders
+              CustomersTable:
+                Type: AWS::Serverless::SimpleTable
+                Properties:
+                  TableName: customers
+              ApiHandler:
+                Type: AWS::Serverless::Function
+                Properties:
+                  FunctionName: api-handler
+                  Handler: app.lambda_handler
+                  CodeUri: src/
+                  Environment:
+                    Variables:
+                      ORDERS_TABLE: !Ref OrdersTable
+              ReportHandler:
+                Type: AWS::Serverless::Function
+                Properties:
+                  FunctionName: report-handler
+                  Handler: app.lambda_handler
+                  CodeUri: src/
+                  Environment:
+                    Variables:
+                      CUSTOMERS_TABLE: !Ref CustomersTable
+            """
+        )
+
+        with mock_aws():
+            session = boto3.Session()
+            with AWSResourceManager(session=session, template=template, only=["ApiHandler"]) as resource_manager:
+                assert sorted(resource_manager.resource_table) == ["ApiHandler", "ApiHandlerRole", "AuditQueue", "OrdersTable"]
+                assert sorted(resource_manager.creation_times) == ["ApiHandler", "ApiHandlerRole", "AuditQueue", "OrdersTable"]
+
+                assert session.client("dynamodb").list_tables()["TableNames"] == ["orders"]
+                functions = session.client("lambda").list_functions()["Functions"]
+                assert [function["FunctionName"] for function in functions] == ["api-handler"]
+                variables = functions[0]["Environment"]["Variables"]
+                assert variables["ORDERS_TABLE"] == "orders"
+                assert variables["AUDIT_QUEUE_URL"].endswith("/audit-queue")
+
+            with pytest.raises(ValueError, match="Resource MissingTable not found"):
+                AWSResourceManager(session=session, template=template, only=["MissingTable"])
+
+    def test_lazy_creation(self):
+        """Test that in lazy mode resources are created by the first request that targets them."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+        from aws_sam_testing.cfn import load_yaml
+
+        template = load_yaml(
+            """
+            Transform: AWS::Serverless-2016-10-31
+            Resources:
+              OrdersTable:
+                Type: AWS::Serverless::SimpleTable
+                Properties:
+                  TableName: !Sub "${AWS::StackName}-orders"
+              CustomersTable:
+                Type: AWS::Serverless::SimpleTable
+                Properties:
+                  TableName: customers
+              OrdersQueue:
+                Type: AWS::SQS::Queue
+                Properties:
+                  QueueName: orders-queue
+              DeadLetterQueue:
+                Type: AWS::SQS::Queue
+              OrdersHandler:
+                Type: AWS::Serverless::Function
+                Properties:
+                  FunctionName: orders-handler
+                  Runtime: python3.13
+                  Handler: app.lambda_handler
+                  CodeUri: src/
+                  Environment:
+                    Variables:
+                      ORDERS_TABLE: !Ref OrdersTable
+                  Events:
+                    Orders:
+                      Type: SQS
+                      Properties:
+                        Queue: !GetAtt OrdersQueue.Arn
+            """
+        )
+
+        with mock_aws():
+            session = boto3.Session()
+            with AWSResourceManager(session=session, template=template, lazy=True) as resource_manager:
+                assert resource_manager.creation_times == {}
+
+                # The table is targeted by its name, the other table is not created
+                session.client("dynamodb").describe_table(TableName="my-stack-orders")
+                assert list(resource_manager.creation_times) == ["OrdersTable"]
+
+                # The function is created together with its dependencies
+                function = session.client("lambda").get_function(FunctionName="orders-handler")["Configuration"]
+                assert function["Environment"]["Variables"]["ORDERS_TABLE"] == "my-stack-orders"
+                assert sorted(resource_manager.creation_times) == ["OrdersHandler", "OrdersHandlerRole", "OrdersTable"]
+
+                # Requests that target no resource by name create all resources of the service
+                assert len(session.client("sqs").list_queues()["QueueUrls"]) == 2
+                assert "CustomersTable" not in resource_manager.creation_times
+
+                # Nothing targets the event source mapping of the queue
+                assert resource_manager.materialize("OrdersHandlerOrders") == ["OrdersHandlerOrders"]
+                assert resource_manager.materialize("OrdersHandlerOrders") == []
+                assert len(session.client("lambda").list_event_source_mappings()["EventSourceMappings"]) == 1
+                with pytest.raises(ValueError, match="Resource MissingTable not found"):
+                    resource_manager.materialize("MissingTable")
+
+                assert sorted(session.client("dynamodb").list_tables()["TableNames"]) == ["customers", "my-stack-orders"]
+
+            assert session.client("sqs").list_queues().get("QueueUrls", []) == []
+
+    def test_lazy_creation_default_session(self, monkeypatch):
+        """Test that in lazy mode requests through the default boto3 session create resources, even if it does not exist yet."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+
+        template = {"Resources": {"MyQueue": {"Type": "AWS::SQS::Queue", "Properties": {"QueueName": "my-queue"}}}}
+
+        monkeypatch.setattr(boto3, "DEFAULT_SESSION", None)
+        with mock_aws():
+            with AWSResourceManager(session=boto3.Session(), template=template, lazy=True) as resource_manager:
+                assert boto3.DEFAULT_SESSION is not None
+                assert boto3.client("sqs").get_queue_url(QueueName="my-queue")["QueueUrl"].endswith("/my-queue")
+                assert list(resource_manager.creation_times) == ["MyQueue"]
+
+        assert boto3.DEFAULT_SESSION is None
+
+    def test_lazy_creation_keeps_default_session(self):
+        """Test that in lazy mode an existing default boto3 session is kept when the resources are deleted."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+
+        template = {"Resources": {"MyQueue": {"Type": "AWS::SQS::Queue", "Properties": {"QueueName": "my-queue"}}}}
+
+        default_session = boto3._get_default_session()
+        with mock_aws():
+            with AWSResourceManager(session=boto3.Session(), template=template, lazy=True):
+                assert boto3.DEFAULT_SESSION is default_session
+
+        assert boto3.DEFAULT_SESSION is default_session
+
+    def test_parallel_creation(self):
+        """Test that resources are created level by level on a thread pool, after their dependencies."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+
+        resources: dict = {}
+        for number in range(8):
+            resources[f"Table{number}"] = {
+                "Type": "AWS::DynamoDB::Table",
+                "Properties": {
+                    "TableName": f"table-{number}",
+                    "BillingMode": "PAY_PER_REQUEST",
+                    "KeySchema": [{"AttributeName": "id", "KeyType": "HASH"}],
+                    "AttributeDefinitions": [{"AttributeName": "id", "AttributeType": "S"}],
+                },
+            }
+            resources[f"Queue{number}"] = {
+                "Type": "AWS::SQS::Queue",
+                "Properties": {"QueueName": {"Fn::Sub": f"${{Table{number}}}-queue"}},
+            }
+        resources["Bucket"] = {"Type": "AWS::S3::Bucket", "DependsOn": [f"Queue{number}" for number in range(8)], "Properties": {"BucketName": "my-bucket"}}
+
+        with mock_aws():
+            session = boto3.Session()
+            with AWSResourceManager(session=session, template={"Resources": resources}, max_workers=4) as resource_manager:
+                creation_order = list(resource_manager.creation_times)
+                assert sorted(creation_order) == sorted(resources)
+                assert all(seconds >= 0 for seconds in resource_manager.creation_times.values())
+                for number in range(8):
+                    assert creation_order.index(f"Table{number}") < creation_order.index(f"Queue{number}") < creation_order.index("Bucket")
+
+                assert len(session.client("dynamodb").list_tables()["TableNames"]) == 8
+                queue_urls = session.client("sqs").list_queues()["QueueUrls"]
+                assert sorted(url.rsplit("/", 1)[-1] for url in queue_urls) == sorted(f"table-{number}-queue" for number in range(8))
+                assert "my-bucket" in [bucket["Name"] for bucket in session.client("s3").list_buckets()["Buckets"]]
+
+    def test_bulk_teardown(self):
+        """Test that bulk teardown discards the resources by resetting the backends of the region."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+
+        template = {
+            "Resources": {
+                "MyQueue": {"Type": "AWS::SQS::Queue", "Properties": {"QueueName": "my-queue"}},
+                "MyBucket": {"Type": "AWS::S3::Bucket", "Properties": {"BucketName": "my-bucket"}},
+                "MyRole": {
+                    "Type": "AWS::IAM::Role",
+                    "Properties": {"RoleName": "my-role", "AssumeRolePolicyDocument": {"Version": "2012-10-17", "Statement": []}},
+                },
+            },
+        }
+
+        with mock_aws():
+            session = boto3.Session(region_name="us-east-1")
+            other_region = boto3.client("sqs", region_name="eu-west-1")
+            other_region.create_queue(QueueName="other-queue")
+
+            resource_manager = AWSResourceManager(session=session, template=template, region_name="us-east-1", bulk_teardown=True)
+            assert resource_manager.deletion_time is None
+            with resource_manager:
+                assert len(session.client("sqs").list_queues()["QueueUrls"]) == 1
+
+            assert not resource_manager.is_created
+            assert resource_manager.deletion_time is not None
+            assert session.client("sqs").list_queues().get("QueueUrls") is None
+            assert session.client("s3").list_buckets()["Buckets"] == []
+            assert session.client("iam").list_roles()["Roles"] == []
+            assert len(other_region.list_queues()["QueueUrls"]) == 1
+
+    def test_snapshot_restore(self):
+        """Test that restoring a snapshot brings back the created resources in a new mock."""
+        import boto3
+        from moto import mock_aws
+
+        from aws_sam_testing.aws_resources import AWSResourceManager
+        from aws_sam_testing.cfn import load_yaml
+
+        template = load_yaml(
+            """
+            Resources:
+              MyQueue:
+                Type: AWS::SQS::Queue
+                Properties:
+                  QueueName: my-queue
+              MyTable:
+                Type: AWS::DynamoDB::Table
+                Properties:
+                  TableName: my-table
+                  BillingMode: PAY_PER_REQUEST
+                  KeySchema:
+                    - AttributeName: id
+                      KeyType: HASH
+                  AttributeDefinitions:
+                    - AttributeName: id
+                      AttributeType: S
+            """
+        )
+
+        with mock_aws():
+            session = boto3.Session()
+            resource_manager = AWSResourceManager(session=session, template=template)
+            with pytest.raises(ValueError, match="Resources not created"):
+                resource_manager.snapshot()
+            resource_manager.create()
+            snapshot = resource_manager.snapshot()
+
+            for _ in range(2):
+                queue_url = session.client("sqs").get_queue_url(QueueName="my-queue")["QueueUrl"]
+                session.client("sqs").send_message(QueueUrl=queue_url, MessageBody="message")
+                session.resource("dynamodb").Table("my-table").put_item(Item={"id": "1"})
+                resource_manager.delete()
+                assert session.client("sqs").list_queues().get("QueueUrls") is None
+
+                resource_manager.restore(snapshot)
+
+                assert resource_manager.is_created
+                assert resource_manager.get_cfn_resource_by_name("MyQueue").name == "my-queue"
+                assert "Messages" not in session.client("sqs").receive_message(QueueUrl=queue_url, WaitTimeSeconds=0)
+                assert session.resource("dynamodb").Table("my-table").scan()["Count"] == 0
+
     def test_get_resource_sqs_queue(self):
         """Test get_resource method for SQS Queue using ResourceManager."""
         import boto3
@@ -520,7 +962,6 @@ class TestAWSResourceManager:
     def test_get_resource_unsupported_type(self):
         """Test get_resource method with unsupported resource type."""
         import boto3
-        import pytest
         from moto import mock_aws
 
         from aws_sam_testing.pytest_addin.aws_resources import ResourceManager
@@ -550,7 +991,6 @@ class TestAWSResourceManager:
     def test_get_resource_non_existent(self):
         """Test get_resource method with non-existent resource name."""
         import boto3
-        import pytest
         from moto import mock_aws
 
         from aws_sam_testing.pytest_addin.aws_resources import ResourceManager
@@ -612,3 +1052,37 @@ def test_transform_template():
     assert transformed_template["Resources"]["MyLambda"]["Properties"].get("CodeUri") is None
     assert transformed_template["Resources"]["MyLambda"]["Properties"]["Code"]["S3Bucket"] == "sam-mocks-fake"
     assert transformed_template["Resources"]["MyLambda"]["Properties"]["Code"]["S3Key"] == "package/MyLambda.zip"
+
+
+def test_transform_template_without_session(monkeypatch):
+    """Managed policies are not loaded from IAM without a session, so real credentials are never used."""
+    from samtranslator.translator.managed_policy_translator import ManagedPolicyLoader
+
+    from aws_sam_testing.aws_resources import _transform_template
+
+    def load(self):
+        raise AssertionError("Managed policies loaded from IAM")
+
+    monkeypatch.setattr(ManagedPolicyLoader, "load", load)
+
+    template = {
+        "Transform": "AWS::Serverless-2016-10-31",
+        "Resources": {
+            "MyLambda": {
+                "Type": "AWS::Serverless::Function",
+                "Properties": {
+                    "Handler": "app.lambda_handler",
+                    "Runtime": "python3.13",
+                    "CodeUri": "./src",
+                    "Policies": ["AmazonS3ReadOnlyAccess"],
+                },
+            },
+        },
+    }
+
+    transformed_template = _transform_template(
+        template=template,
+        packaging_bucket_name="sam-mocks-fake",
+        aws_account_id="123456789012",
+    )
+    assert transformed_template["Resources"]["MyLambdaRole"]["Type"] == "AWS::IAM::Role"
@@ -5,6 +5,7 @@ from pathlib import Path
 import pytest
 
 from aws_sam_testing.aws_sam import AWSSAMToolkit
+from aws_sam_testing.cfn import load_yaml
 
 
 class TestAWSSAMToolkit:
@@ -215,6 +216,53 @@ Resources:
             # The function directory might not exist or be empty due to missing source
             # This is expected behavior from SAM CLI
 
+        def test_sam_build_prunes_conditions(self, tmp_path: Path):
+            """Test that SAM build skips the functions disabled by the template conditions."""
+            template_content = """
+AWSTemplateFormatVersion: '2010-09-09'
+Transform: AWS::Serverless-2016-10-31
+
+Parameters:
+  Environment:
+    Type: String
+    Default: dev
+
+Conditions:
+  IsProd: !Equals [!Ref Environment, prod]
+
+Resources:
+  MainFunction:
+    Type: AWS::Serverless::Function
+    Properties:
+      CodeUri: src/
+      Handler: app.handler
+      Runtime: python3.13
+      MemorySize: !If [IsProd, 1024, 128]
+  ProdFunction:
+    Type: AWS::Serverless::Function
+    Condition: IsProd
+    Properties:
+      CodeUri: src/
+      Handler: app.handler
+      Runtime: python3.13
+"""
+
+            template_path = tmp_path / "template.yaml"
+            template_path.write_text(template_content)
+            src_dir = tmp_path / "src"
+            src_dir.mkdir()
+            (src_dir / "app.py").write_text("def handler(event, context):\n    return {}\n")
+
+            toolkit = AWSSAMToolkit(working_dir=str(tmp_path), template_path=str(template_path))
+            build_dir = toolkit.sam_build(parameters={"Environment": "dev"})
+
+            built_template = load_yaml((build_dir / "template.yaml").read_text())
+            assert list(built_template["Resources"]) == ["MainFunction"]
+            assert built_template["Resources"]["MainFunction"]["Properties"]["MemorySize"] == 128
+            assert (build_dir / "MainFunction").exists()
+            assert not (build_dir / "ProdFunction").exists()
+            assert sorted(path.name for path in tmp_path.iterdir()) == [".aws-sam", "src", "template.yaml"]
+
     class TestRunLocalApi:
         """Test cases for run_local_api method."""
 
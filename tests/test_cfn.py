@@ -1,7 +1,13 @@
+import copy
+
+import pytest
+
 from aws_sam_testing.cfn import (
     CloudFormationTemplateProcessor,
+    PassManager,
     load_yaml,
 )
+from aws_sam_testing.cfn_intrinsics import IntrinsicResolutionError
 from aws_sam_testing.cfn_tags import CloudFormationObject
 
 
@@ -322,6 +328,71 @@ class TestFindResources:
         assert len(buckets_lower) == 0
 
 
+class TestTypeIndex:
+    def test_find_resources_by_multiple_types(self):
+        """Test finding resources matching any of several types, in template order."""
+        template = {
+            "Resources": {
+                "FunctionA": {"Type": "AWS::Serverless::Function"},
+                "Bucket": {"Type": "AWS::S3::Bucket"},
+                "FunctionB": {"Type": "AWS::Lambda::Function"},
+                "FunctionC": {"Type": "AWS::Serverless::Function"},
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template)
+
+        functions = processor.find_resources_by_type(["AWS::Lambda::Function", "AWS::Serverless::Function"])
+
+        assert [logical_id for logical_id, _ in functions] == ["FunctionA", "FunctionB", "FunctionC"]
+        assert functions[1][1] == {"LogicalId": "FunctionB", "Type": "AWS::Lambda::Function"}
+
+    def test_find_resources_by_type_prefix(self):
+        """Test finding resources by a type prefix pattern."""
+        template = {
+            "Resources": {
+                "Domain": {"Type": "AWS::SageMaker::Domain"},
+                "Bucket": {"Type": "AWS::S3::Bucket"},
+                "Profile": {"Type": "AWS::SageMaker::UserProfile"},
+                "Invalid": "not-a-resource",
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template)
+
+        assert [logical_id for logical_id, _ in processor.find_resources_by_type("AWS::SageMaker::*")] == ["Domain", "Profile"]
+        assert [logical_id for logical_id, _ in processor.find_resources_by_type("AWS::*")] == ["Domain", "Bucket", "Profile"]
+        assert processor.find_resources_by_type([]) == []
+
+    def test_type_index_follows_processor_changes(self):
+        """Test that the type index is invalidated when the processor modifies resources."""
+        template = {
+            "Resources": {
+                "BucketA": {"Type": "AWS::S3::Bucket"},
+                "BucketB": {"Type": "AWS::S3::Bucket"},
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template)
+        assert len(processor.find_resources_by_type("AWS::S3::Bucket")) == 2
+
+        processor.remove_resource("BucketA")
+        assert [logical_id for logical_id, _ in processor.find_resources_by_type("AWS::S3::Bucket")] == ["BucketB"]
+
+        processor.update_template({"Resources": {"Queue": {"Type": "AWS::SQS::Queue"}}})
+        assert [logical_id for logical_id, _ in processor.find_resources_by_type("AWS::SQS::Queue")] == ["Queue"]
+
+        processor.get_mutable("Resources", "Queue")["Type"] = "AWS::SNS::Topic"
+        assert processor.find_resources_by_type("AWS::SQS::Queue") == []
+        assert [logical_id for logical_id, _ in processor.find_resources_by_type("AWS::SNS::Topic")] == ["Queue"]
+
+    def test_type_index_detects_added_resources(self):
+        """Test that resources added directly to the processed template are found."""
+        processor = CloudFormationTemplateProcessor({"Resources": {"BucketA": {"Type": "AWS::S3::Bucket"}}})
+        assert len(processor.find_resources_by_type("AWS::S3::Bucket")) == 1
+
+        processor.processed_template["Resources"]["BucketB"] = {"Type": "AWS::S3::Bucket"}
+
+        assert len(processor.find_resources_by_type("AWS::S3::Bucket")) == 2
+
+
 class TestRemoveResource:
     def test_remove_simple_resource(self):
         """Test removing a simple resource with no dependencies."""
@@ -567,6 +638,421 @@ class TestRemoveResource:
         assert "MyFunction" in processor.processed_template["Resources"]
 
 
+class TestRemoveResources:
+    def test_remove_resources_single_pass(self):
+        """Test removing several resources at once strips all of their references."""
+        yaml_content = """
+        Resources:
+          ApiA:
+            Type: AWS::Serverless::Api
+          ApiB:
+            Type: AWS::Serverless::Api
+          ApiC:
+            Type: AWS::Serverless::Api
+          MyFunction:
+            Type: AWS::Serverless::Function
+            DependsOn:
+              - ApiA
+              - ApiC
+            Properties:
+              Environment:
+                Variables:
+                  API_A: !Ref ApiA
+                  API_B_ROOT: !GetAtt ApiB.RootResourceId
+              Events:
+                GetA:
+                  Type: Api
+                  Properties:
+                    RestApiId: !Ref ApiA
+                GetB:
+                  Type: Api
+                  Properties:
+                    RestApiId: !Ref ApiB
+                GetC:
+                  Type: Api
+                  Properties:
+                    RestApiId: !Ref ApiC
+          UnrelatedBucket:
+            Type: AWS::S3::Bucket
+        Outputs:
+          ApiAId:
+            Value: !Ref ApiA
+          ApiBId:
+            Value: !Ref ApiB
+          ApiCId:
+            Value: !Ref ApiC
+        """
+        template = load_yaml(yaml_content)
+        processor = CloudFormationTemplateProcessor(template)
+
+        result = processor.remove_resources(["ApiA", "ApiB", "MissingApi"])
+
+        assert result.removed_resources == ["ApiA", "ApiB"]
+        assert sorted(result.removed_outputs) == ["ApiAId", "ApiBId"]
+        assert result.removed_events == {"MyFunction": ["GetA", "GetB"]}
+        assert result.updated_resources == ["MyFunction"]
+
+        resources = processor.processed_template["Resources"]
+        assert sorted(resources) == ["ApiC", "MyFunction", "UnrelatedBucket"]
+        function = resources["MyFunction"]
+        assert function["DependsOn"] == ["ApiC"]
+        assert function["Properties"]["Environment"]["Variables"] == {}
+        assert list(function["Properties"]["Events"]) == ["GetC"]
+        assert list(processor.processed_template["Outputs"]) == ["ApiCId"]
+
+    def test_remove_resources_referencing_each_other(self):
+        """Test that removed resources referencing each other are not rewritten."""
+        template = {
+            "Resources": {
+                "Role": {"Type": "AWS::IAM::Role"},
+                "Policy": {"Type": "AWS::IAM::Policy", "Properties": {"Roles": [{"Ref": "Role"}]}},
+                "Function": {"Type": "AWS::Lambda::Function", "Properties": {"Role": {"Fn::GetAtt": ["Role", "Arn"]}}},
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template)
+
+        result = processor.remove_resources(["Role", "Policy"])
+
+        assert result.updated_resources == ["Function"]
+        assert processor.processed_template["Resources"] == {"Function": {"Type": "AWS::Lambda::Function", "Properties": {}}}
+
+    def test_remove_resources_nothing_to_remove(self):
+        """Test that removing unknown resources reports nothing."""
+        processor = CloudFormationTemplateProcessor({"Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}}})
+
+        result = processor.remove_resources(["Missing"])
+
+        assert result.removed_resources == []
+        assert result.removed_outputs == []
+        assert result.removed_events == {}
+        assert result.updated_resources == []
+
+    def test_remove_resources_no_resources_section(self):
+        """Test removing resources from a template without Resources."""
+        processor = CloudFormationTemplateProcessor({"Parameters": {}})
+
+        assert processor.remove_resources(["MyBucket"]).removed_resources == []
+
+
+class TestReferenceIndex:
+    def test_remove_resource_only_rewrites_referrers(self):
+        """Test that removing a resource leaves resources that do not reference it untouched."""
+        yaml_content = """
+        Resources:
+          MyBucket:
+            Type: AWS::S3::Bucket
+          MyQueue:
+            Type: AWS::SQS::Queue
+          MyFunction:
+            Type: AWS::Lambda::Function
+            Properties:
+              Environment:
+                Variables:
+                  BUCKET_NAME: !Ref MyBucket
+                  QUEUE_URL: !Ref MyQueue
+          OtherFunction:
+            Type: AWS::Lambda::Function
+            Properties:
+              Environment:
+                Variables:
+                  QUEUE_URL: !Ref MyQueue
+        """
+        template = load_yaml(yaml_content)
+        processor = CloudFormationTemplateProcessor(template)
+        other_function = processor.processed_template["Resources"]["OtherFunction"]
+
+        processor.remove_resource("MyBucket")
+
+        resources = processor.processed_template["Resources"]
+        assert resources["OtherFunction"] is other_function
+        assert "BUCKET_NAME" not in resources["MyFunction"]["Properties"]["Environment"]["Variables"]
+        assert "QUEUE_URL" in resources["MyFunction"]["Properties"]["Environment"]["Variables"]
+
+    def test_index_tracks_sub_placeholders_and_depends_on(self):
+        """Test that Fn::Sub placeholders and DependsOn entries are indexed as references."""
+        yaml_content = """
+        Resources:
+          MyBucket:
+            Type: AWS::S3::Bucket
+          MyPolicy:
+            Type: AWS::S3::BucketPolicy
+            Properties:
+              PolicyDocument:
+                Statement:
+                  - Resource: !Sub "${MyBucket.Arn}/*"
+          MyFunction:
+            Type: AWS::Lambda::Function
+            DependsOn: MyBucket
+          LiteralFunction:
+            Type: AWS::Lambda::Function
+            Properties:
+              Description: !Sub
+                - "${!MyBucket} ${Name}"
+                - Name: MyBucket
+        """
+        template = load_yaml(yaml_content)
+        processor = CloudFormationTemplateProcessor(template)
+
+        references = processor._references()
+
+        assert references.referrers("MyBucket", "Resources") == ["MyFunction", "MyPolicy"]
+        assert references.forward[("Resources", "LiteralFunction")] == set()
+
+    def test_index_is_updated_across_removals(self):
+        """Test that repeated removals keep the index consistent with the template."""
+        template = {
+            "Resources": {
+                "TopicA": {"Type": "AWS::SNS::Topic"},
+                "TopicB": {"Type": "AWS::SNS::Topic"},
+                "Subscriber": {
+                    "Type": "AWS::SNS::Subscription",
+                    "DependsOn": ["TopicA", "TopicB"],
+                    "Properties": {"TopicArn": {"Ref": "TopicA"}},
+                },
+            },
+            "Outputs": {"TopicB": {"Value": {"Ref": "TopicB"}}},
+        }
+        processor = CloudFormationTemplateProcessor(template)
+
+        processor.remove_resource("TopicA")
+        assert processor.processed_template["Resources"]["Subscriber"] == {"Type": "AWS::SNS::Subscription", "DependsOn": ["TopicB"], "Properties": {}}
+
+        processor.remove_resource("TopicB")
+        assert "DependsOn" not in processor.processed_template["Resources"]["Subscriber"]
+        assert processor.processed_template["Outputs"] == {}
+        assert processor._references().referrers("TopicB", "Resources") == []
+
+    def test_index_picks_up_replaced_resources(self):
+        """Test that resources assigned directly into the processed template are re-indexed."""
+        template = {
+            "Resources": {
+                "MyBucket": {"Type": "AWS::S3::Bucket"},
+                "MyFunction": {"Type": "AWS::Lambda::Function", "Properties": {}},
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template)
+        processor._references()
+
+        processor.processed_template["Resources"]["MyFunction"] = {
+            "Type": "AWS::Lambda::Function",
+            "Properties": {"Environment": {"Variables": {"BUCKET": {"Ref": "MyBucket"}}}},
+        }
+        processor.remove_resource("MyBucket")
+
+        assert processor.processed_template["Resources"]["MyFunction"]["Properties"]["Environment"]["Variables"] == {}
+
+    def test_index_picks_up_in_place_edits(self):
+        """Test that nested values edited in place in the processed template are re-indexed."""
+        template = {
+            "Resources": {
+                "A": {"Type": "AWS::S3::Bucket"},
+                "B": {"Type": "AWS::Lambda::Function", "Properties": {"X": {"Ref": "C"}}},
+                "C": {"Type": "AWS::SQS::Queue"},
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template)
+        processor.get_dependency_graph()
+
+        processor.processed_template["Resources"]["B"]["Properties"]["X"] = {"Ref": "A"}
+        graph = processor.get_dependency_graph()
+        assert graph.names(graph.adjacency[graph.index["B"]]) == ["A"]
+
+        processor.remove_resource("A")
+
+        assert processor.processed_template["Resources"]["B"]["Properties"] == {}
+        graph = processor.get_dependency_graph()
+        assert graph.adjacency[graph.index["B"]] == []
+
+    def test_invalidate_indexes_after_in_place_edit(self):
+        """Test that in-place edits are picked up after invalidate_indexes."""
+        template = {
+            "Resources": {
+                "MyBucket": {"Type": "AWS::S3::Bucket"},
+                "MyFunction": {"Type": "AWS::Lambda::Function", "Properties": {}},
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template)
+        processor._references()
+
+        processor.processed_template["Resources"]["MyFunction"]["Properties"]["Role"] = {"Fn::GetAtt": ["MyBucket", "Arn"]}
+        processor.invalidate_indexes().remove_resource("MyBucket")
+
+        assert "Role" not in processor.processed_template["Resources"]["MyFunction"]["Properties"]
+
+
+class TestCopyOnWrite:
+    def test_processor_copies_template_by_default(self):
+        """Test that without copy-on-write, editing the processed template in place leaves the original intact."""
+        template = {"Resources": {"MyBucket": {"Type": "AWS::S3::Bucket", "Properties": {"BucketName": "my-bucket"}}}}
+        processor = CloudFormationTemplateProcessor(template)
+
+        processor.processed_template["Resources"]["MyBucket"]["Properties"]["BucketName"] = "other-bucket"
+
+        assert template["Resources"]["MyBucket"]["Properties"]["BucketName"] == "my-bucket"
+        processor.reset()
+        assert processor.processed_template == template
+        assert processor.processed_template["Resources"] is not template["Resources"]
+
+    def test_in_place_writes_never_reach_template_by_default(self):
+        """Test that without copy-on-write, no in-place write through the processed template reaches the original."""
+        template = {
+            "Globals": {"Function": {"Environment": {"Variables": {"STAGE": "dev"}}}},
+            "Resources": {
+                "MyBucket": {"Type": "AWS::S3::Bucket"},
+                "MyFunction": {
+                    "Type": "AWS::Serverless::Function",
+                    "Properties": {
+                        "Environment": {"Variables": {"BUCKET": {"Ref": "MyBucket"}}},
+                        "Policies": [{"S3ReadPolicy": {"BucketName": {"Ref": "MyBucket"}}}],
+                    },
+                },
+            },
+            "Outputs": {"Bucket": {"Value": {"Ref": "MyBucket"}}},
+        }
+        original = copy.deepcopy(template)
+        processor = CloudFormationTemplateProcessor(template)
+
+        processed = processor.processed_template
+        processed["Globals"]["Function"]["Environment"]["Variables"]["STAGE"] = "prod"
+        processed["Resources"]["MyFunction"]["Properties"]["Policies"][0]["S3ReadPolicy"]["BucketName"] = "other"
+        processed["Resources"]["MyFunction"]["Properties"]["Policies"].append("AWSLambdaBasicExecutionRole")
+        processed["Outputs"]["Bucket"]["Export"] = {"Name": "bucket"}
+        processor.remove_resource("MyBucket")
+        processor.processed_template["Resources"]["MyFunction"]["Properties"]["Environment"]["Variables"]["OTHER"] = "value"
+
+        assert template == original
+
+    def test_processor_shares_unmodified_resources(self):
+        """Test that creating a copy-on-write processor does not copy resources."""
+        template = {"Resources": {"MyBucket": {"Type": "AWS::S3::Bucket", "Properties": {"BucketName": "my-bucket"}}}}
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+        derived = CloudFormationTemplateProcessor(processor.processed_template, copy_on_write=True)
+
+        assert processor.processed_template is not template
+        assert processor.processed_template["Resources"]["MyBucket"] is template["Resources"]["MyBucket"]
+        assert derived.processed_template["Resources"]["MyBucket"] is template["Resources"]["MyBucket"]
+
+    def test_remove_resource_does_not_modify_original(self):
+        """Test that removals clone only what they modify and leave the original template intact."""
+        yaml_content = """
+        Resources:
+          MyApi:
+            Type: AWS::Serverless::Api
+          MyBucket:
+            Type: AWS::S3::Bucket
+          MyFunction:
+            Type: AWS::Serverless::Function
+            Properties:
+              Events:
+                ApiEvent:
+                  Type: Api
+                  Properties:
+                    RestApiId: !Ref MyApi
+                S3Event:
+                  Type: S3
+                  Properties:
+                    Bucket: !Ref MyBucket
+        Outputs:
+          ApiId:
+            Value: !Ref MyApi
+        """
+        template = load_yaml(yaml_content)
+        snapshot = copy.deepcopy(template)
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+
+        processor.remove_resource("MyApi")
+
+        assert template == snapshot
+        assert list(processor.processed_template["Resources"]["MyFunction"]["Properties"]["Events"]) == ["S3Event"]
+        assert processor.processed_template["Outputs"] == {}
+        assert processor.processed_template["Resources"]["MyBucket"] is template["Resources"]["MyBucket"]
+
+    def test_update_template_clones_only_changed_path(self):
+        """Test that updates clone the containers on the updated path only."""
+        template = {
+            "Globals": {"Function": {"Timeout": 3, "Environment": {"Variables": {"A": "1"}}}},
+            "Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}},
+        }
+        snapshot = copy.deepcopy(template)
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+
+        processor.update_template({"Globals": {"Function": {"Environment": {"Variables": {"B": "2"}}}}})
+
+        assert template == snapshot
+        assert processor.processed_template["Globals"]["Function"]["Environment"]["Variables"] == {"A": "1", "B": "2"}
+        assert processor.processed_template["Resources"] is template["Resources"]
+
+    def test_get_mutable(self):
+        """Test that get_mutable returns a private container and keeps the index up to date."""
+        template = {
+            "Resources": {
+                "MyLayer": {"Type": "AWS::Serverless::LayerVersion"},
+                "MyFunction": {"Type": "AWS::Serverless::Function", "Properties": {"Layers": [{"Ref": "MyLayer"}]}},
+            }
+        }
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+        assert processor._references().referrers("MyLayer", "Resources") == ["MyFunction"]
+
+        del processor.get_mutable("Resources", "MyFunction", "Properties")["Layers"]
+
+        assert "Layers" in template["Resources"]["MyFunction"]["Properties"]
+        assert "Layers" not in processor.processed_template["Resources"]["MyFunction"]["Properties"]
+        assert processor._references().referrers("MyLayer", "Resources") == []
+
+    def test_get_mutable_rejects_scalars(self):
+        """Test that get_mutable only returns containers."""
+        processor = CloudFormationTemplateProcessor({"Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}}}, copy_on_write=True)
+
+        with pytest.raises(TypeError):
+            processor.get_mutable("Resources", "MyBucket", "Type")
+
+    def test_reset_restores_original(self):
+        """Test that reset discards modifications."""
+        template = {"Resources": {"MyBucket": {"Type": "AWS::S3::Bucket"}}}
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+        processor.remove_resource("MyBucket")
+
+        processor.reset()
+
+        assert processor.processed_template == template
+
+
+class TestDependencyGraph:
+    def test_get_dependency_graph(self):
+        """Test that references, Fn::Sub placeholders and DependsOn become edges of the graph."""
+        template = load_yaml(
+            """
+            Resources:
+              Function:
+                Type: AWS::Lambda::Function
+                DependsOn: Policy
+                Properties:
+                  Role: !GetAtt Role.Arn
+                  Environment:
+                    Variables:
+                      TABLE: !Ref Table
+                      QUEUE: !Sub "${Queue.QueueName}-${AWS::Region}"
+              Role:
+                Type: AWS::IAM::Role
+              Policy:
+                Type: AWS::IAM::Policy
+                Properties:
+                  Roles: [!Ref Role]
+              Table:
+                Type: AWS::DynamoDB::Table
+              Queue:
+                Type: AWS::SQS::Queue
+            """
+        )
+
+        graph = CloudFormationTemplateProcessor(template).get_dependency_graph()
+
+        assert graph.nodes == ["Function", "Role", "Policy", "Table", "Queue"]
+        assert sorted(graph.names(graph.adjacency[graph.index["Function"]])) == ["Policy", "Queue", "Role", "Table"]
+        levels = [[graph.names(component) for component in level] for level in graph.topological_levels()]
+        assert levels == [[["Role"], ["Table"], ["Queue"]], [["Policy"]], [["Function"]]]
+
+
 class TestRemoveDependencies:
     def test_remove_circular_reference_island(self):
         """Test removing a circular reference island (resources that only reference each other)."""
@@ -799,6 +1285,47 @@ class TestRemoveDependencies:
         assert "Bucket1" in processor.processed_template["Resources"]
         assert "Bucket2" in processor.processed_template["Resources"]
 
+    def test_keep_resources_referenced_in_output_sub(self):
+        """Test that resources referenced through Fn::Sub placeholders in outputs are kept."""
+        yaml_content = """
+        Resources:
+          MyApi:
+            Type: AWS::Serverless::Api
+            Properties:
+              StageName: prod
+          UnreferencedBucket:
+            Type: AWS::S3::Bucket
+        Outputs:
+          ApiUrl:
+            Value: !Sub "https://${MyApi}.execute-api.${AWS::Region}.amazonaws.com/prod"
+        """
+        template = load_yaml(yaml_content)
+        processor = CloudFormationTemplateProcessor(template)
+
+        processor.remove_dependencies("")
+
+        assert "MyApi" in processor.processed_template["Resources"]
+        assert "UnreferencedBucket" not in processor.processed_template["Resources"]
+
+    def test_large_template(self):
+        """Test remove_dependencies on a template with thousands of resources."""
+        resources = {}
+        for number in range(3000):
+            resources[f"Queue{number}"] = {"Type": "AWS::SQS::Queue"}
+            resources[f"Function{number}"] = {
+                "Type": "AWS::Lambda::Function",
+                "Properties": {"Environment": {"Variables": {"QUEUE_URL": {"Ref": f"Queue{number}"}}}},
+            }
+        outputs = {f"Function{number}": {"Value": {"Fn::GetAtt": [f"Function{number}", "Arn"]}} for number in range(0, 3000, 2)}
+        processor = CloudFormationTemplateProcessor({"Resources": resources, "Outputs": outputs})
+
+        processor.remove_dependencies("")
+
+        remaining = processor.processed_template["Resources"]
+        assert len(remaining) == 3000
+        assert "Function0" in remaining and "Queue0" in remaining
+        assert "Function1" not in remaining and "Queue1" not in remaining
+
     def test_empty_template(self):
         """Test remove_dependencies on empty template."""
         processor = CloudFormationTemplateProcessor({})
@@ -1262,3 +1789,603 @@ class TestUpdateTemplate:
         # Original update dict should be unchanged
         assert update_dict == update_copy
         assert update_dict["Resources"]["MyBucket"]["Properties"]["BucketName"] == "test-bucket"
+
+    def test_update_template_shares_unchanged_subtrees(self):
+        """Test that only the containers on the changed paths are cloned."""
+        template = {
+            "Globals": {"Function": {"Environment": {"Variables": {"A": "1"}}, "Layers": ["layer"]}},
+            "Resources": {
+                "MyFunction": {"Type": "AWS::Serverless::Function", "Properties": {"Handler": "index.handler"}},
+                "MyQueue": {"Type": "AWS::SQS::Queue"},
+            },
+        }
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+
+        processor.update_template({"Globals": {"Function": {"Environment": {"Variables": {"B": "2"}}}}, "Resources": {"MyFunction": {"Properties": {"Handler": "index.handler"}}}})
+
+        processed = processor.processed_template
+        assert processed["Globals"]["Function"]["Environment"]["Variables"] == {"A": "1", "B": "2"}
+        assert template["Globals"]["Function"]["Environment"]["Variables"] == {"A": "1"}
+        assert processed["Globals"]["Function"]["Layers"] is template["Globals"]["Function"]["Layers"]
+        # Updating a value with an equal value does not clone anything
+        assert processed["Resources"] is template["Resources"]
+
+    def test_update_template_keeps_indexes(self):
+        """Test that updating sections that are not indexed keeps the indexes."""
+        template = {"Globals": {"Function": {}}, "Resources": {"MyQueue": {"Type": "AWS::SQS::Queue"}}}
+        processor = CloudFormationTemplateProcessor(template)
+        processor.find_resources_by_type("AWS::SQS::Queue")
+        type_index = processor._type_index
+
+        processor.update_template({"Globals": {"Function": {"Timeout": 30}}})
+        assert processor._type_index is type_index
+
+        processor.update_template({"Resources": {"MyQueue": {"Type": "AWS::SNS::Topic"}}})
+        assert processor.find_resources_by_type("AWS::SQS::Queue") == []
+        assert [logical_id for logical_id, _ in processor.find_resources_by_type("AWS::SNS::Topic")] == ["MyQueue"]
+
+    def test_apply_patches_json_pointer(self):
+        """Test JSON pointer patches."""
+        template = {"Resources": {"MyFunction": {"Type": "AWS::Serverless::Function", "Properties": {"Layers": ["a"], "Handler": "index.handler"}}}}
+        processor = CloudFormationTemplateProcessor(template)
+
+        processor.apply_patches(
+            [
+                ("/Globals/Function/Environment/Variables/AWS_ENDPOINT_URL", "http://localhost:5000"),
+                ("/Resources/MyFunction/Properties/Layers/-", "b"),
+                ("/Resources/MyFunction/Properties/Layers/0", "c"),
+                ("/Resources/MyFunction/Metadata/path~1with~0escapes", {"Value": ["x"]}),
+            ]
+        )
+
+        processed = processor.processed_template
+        assert processed["Globals"] == {"Function": {"Environment": {"Variables": {"AWS_ENDPOINT_URL": "http://localhost:5000"}}}}
+        assert processed["Resources"]["MyFunction"]["Properties"]["Layers"] == ["c", "b"]
+        assert processed["Resources"]["MyFunction"]["Metadata"] == {"path/with~escapes": {"Value": ["x"]}}
+        assert template == {"Resources": {"MyFunction": {"Type": "AWS::Serverless::Function", "Properties": {"Layers": ["a"], "Handler": "index.handler"}}}}
+
+    def test_apply_patches_mixed(self):
+        """Test that overlays and JSON pointer patches are applied in order."""
+        template = {"Resources": {"MyQueue": {"Type": "AWS::SQS::Queue", "Properties": {"DelaySeconds": 0}}}}
+        processor = CloudFormationTemplateProcessor(template)
+        patch_value = {"Key": "Env", "Value": "test"}
+
+        result = processor.apply_patches(
+            [
+                {"Resources": {"MyQueue": {"Properties": {"DelaySeconds": 5, "Tags": []}}}},
+                ("/Resources/MyQueue/Properties/Tags/-", patch_value),
+                {"Resources": {"MyQueue": {"Properties": {"DelaySeconds": 10}}}},
+            ]
+        )
+
+        assert result is processor
+        properties = processor.processed_template["Resources"]["MyQueue"]["Properties"]
+        assert properties == {"DelaySeconds": 10, "Tags": [{"Key": "Env", "Value": "test"}]}
+        properties["Tags"][0]["Value"] = "changed"
+        assert patch_value["Value"] == "test"
+
+    def test_apply_patches_invalid_pointer(self):
+        """Test that invalid JSON pointers are rejected."""
+        processor = CloudFormationTemplateProcessor({"Resources": {"MyQueue": {"Type": "AWS::SQS::Queue", "Properties": {"Tags": []}}}})
+
+        with pytest.raises(ValueError):
+            processor.apply_patches([("Resources/MyQueue", {})])
+        with pytest.raises(ValueError):
+            processor.apply_patches([("", {})])
+        with pytest.raises(ValueError):
+            processor.apply_patches([("/Resources/MyQueue/Properties/Tags/first", "x")])
+        with pytest.raises(ValueError):
+            processor.apply_patches([("/Resources/MyQueue/Type/Name", "x")])
+
+
+class TestFunctionEnvironment:
+    """Test resolving function environment variables without moto."""
+
+    TEMPLATE = """
+    Parameters:
+      Stage:
+        Type: String
+        Default: dev
+    Globals:
+      Function:
+        Environment:
+          Variables:
+            STAGE: !Ref Stage
+            SHARED: global
+    Resources:
+      MyTable:
+        Type: AWS::DynamoDB::Table
+      MyFunction:
+        Type: AWS::Serverless::Function
+        Properties:
+          Environment:
+            Variables:
+              SHARED: local
+              TABLE_NAME: !Ref MyTable
+              TABLE_ARN: !GetAtt MyTable.Arn
+              PREFIX: !Sub "${AWS::StackName}-${Stage}"
+      MyLambda:
+        Type: AWS::Lambda::Function
+        Properties:
+          Environment:
+            Variables:
+              REGION: !Ref AWS::Region
+    """
+
+    def test_merges_globals(self):
+        """Test that global and function variables are merged and resolved."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+        evaluator = processor.create_evaluator(
+            parameters={"Stage": "test"},
+            resource_resolver=lambda logical_id: f"{logical_id.lower()}",
+            attribute_resolver=lambda logical_id, attribute: f"arn:{logical_id}:{attribute}",
+        )
+
+        assert processor.get_function_environment("MyFunction", evaluator) == {
+            "STAGE": "test",
+            "SHARED": "local",
+            "TABLE_NAME": "mytable",
+            "TABLE_ARN": "arn:MyTable:Arn",
+            "PREFIX": "my-stack-test",
+        }
+
+    def test_lambda_function_ignores_globals(self):
+        """Test that Globals only apply to serverless functions."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+
+        assert processor.get_function_environment("MyLambda") == {"REGION": "us-east-1"}
+
+    def test_unresolved_and_missing(self):
+        """Test errors for unresolved references and unknown functions."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+
+        with pytest.raises(IntrinsicResolutionError):
+            processor.get_function_environment("MyFunction")
+        with pytest.raises(ValueError, match="not found"):
+            processor.get_function_environment("Missing")
+
+
+class TestPruneConditions:
+    """Test evaluating conditions and removing what they disable."""
+
+    TEMPLATE = """
+    Parameters:
+      Environment:
+        Type: String
+        Default: dev
+      Owner:
+        Type: String
+    Conditions:
+      IsProd: !Equals [!Ref Environment, prod]
+      IsDev: !Not [!Condition IsProd]
+      HasMonitoring: !Or [!Condition IsProd, !Equals [!Ref Environment, staging]]
+      IsOwned: !And [!Condition IsDev, !Not [!Equals [!Ref Owner, ""]]]
+    Resources:
+      Table:
+        Type: AWS::DynamoDB::Table
+      Alarm:
+        Type: AWS::CloudWatch::Alarm
+        Condition: HasMonitoring
+        Properties:
+          Dimensions:
+            - Name: TableName
+              Value: !Ref Table
+      DevQueue:
+        Type: AWS::SQS::Queue
+        Condition: IsDev
+      Function:
+        Type: AWS::Serverless::Function
+        DependsOn: Alarm
+        Properties:
+          MemorySize: !If [IsProd, 1024, 128]
+          ReservedConcurrentExecutions: !If [IsProd, 100, !Ref AWS::NoValue]
+          Environment:
+            Variables:
+              ALARM: !If [HasMonitoring, !Ref Alarm, none]
+              QUEUE: !If [IsDev, !Ref DevQueue, !Ref AWS::NoValue]
+              OWNED: !If [IsOwned, "yes", "no"]
+      OwnedQueue:
+        Type: AWS::SQS::Queue
+        Condition: IsOwned
+    Outputs:
+      AlarmName:
+        Condition: HasMonitoring
+        Value: !Ref Alarm
+      QueueUrl:
+        Condition: IsDev
+        Value: !Ref DevQueue
+      TableName:
+        Value: !Ref Table
+    """
+
+    def test_prune_dev(self):
+        """Test pruning with the parameter defaults."""
+        template = load_yaml(self.TEMPLATE)
+        original = copy.deepcopy(template)
+        processor = CloudFormationTemplateProcessor(template)
+
+        result = processor.prune_conditions()
+
+        assert result.conditions == {"IsProd": False, "IsDev": True, "HasMonitoring": False}
+        assert result.removed_resources == ["Alarm"]
+        assert result.removed_outputs == ["AlarmName"]
+        assert result.removed_conditions == ["HasMonitoring"]
+
+        processed = processor.processed_template
+        assert list(processed["Resources"]) == ["Table", "DevQueue", "Function", "OwnedQueue"]
+        assert "Condition" not in processed["Resources"]["DevQueue"]
+        function = processed["Resources"]["Function"]
+        assert "DependsOn" not in function
+        assert function["Properties"]["MemorySize"] == 128
+        assert "ReservedConcurrentExecutions" not in function["Properties"]
+        variables = function["Properties"]["Environment"]["Variables"]
+        assert variables["ALARM"] == "none"
+        assert variables["QUEUE"] == load_yaml("!Ref DevQueue")
+        assert variables["OWNED"] == load_yaml("!If [IsOwned, 'yes', 'no']")
+        assert processed["Outputs"] == {"QueueUrl": {"Value": load_yaml("!Ref DevQueue")}, "TableName": {"Value": load_yaml("!Ref Table")}}
+
+        # IsOwned uses a parameter without a value, it is kept together with the conditions it uses
+        assert list(processed["Conditions"]) == ["IsProd", "IsDev", "IsOwned"]
+        assert processed["Resources"]["OwnedQueue"]["Condition"] == "IsOwned"
+
+        assert template == original
+
+    def test_prune_prod(self):
+        """Test pruning with parameter overrides."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+
+        result = processor.prune_conditions(parameters={"Environment": "prod", "Owner": "team"})
+
+        assert result.conditions == {"IsProd": True, "IsDev": False, "HasMonitoring": True, "IsOwned": False}
+        assert sorted(result.removed_resources) == ["DevQueue", "OwnedQueue"]
+        assert result.removed_outputs == ["QueueUrl"]
+
+        processed = processor.processed_template
+        assert "Conditions" not in processed
+        assert list(processed["Resources"]) == ["Table", "Alarm", "Function"]
+        assert "Condition" not in processed["Resources"]["Alarm"]
+        function = processed["Resources"]["Function"]
+        assert function["DependsOn"] == "Alarm"
+        assert function["Properties"]["MemorySize"] == 1024
+        assert function["Properties"]["ReservedConcurrentExecutions"] == 100
+        assert function["Properties"]["Environment"]["Variables"] == {"ALARM": load_yaml("!Ref Alarm"), "OWNED": "no"}
+        assert list(processed["Outputs"]) == ["AlarmName", "TableName"]
+
+    def test_json_intrinsics_and_nested_if(self):
+        """Test pruning a template with JSON-style intrinsic functions and nested Fn::If."""
+        template = {
+            "Parameters": {"Stage": {"Type": "String", "Default": "test"}},
+            "Conditions": {
+                "IsProd": {"Fn::Equals": [{"Ref": "Stage"}, "prod"]},
+                "IsTest": {"Fn::Equals": [{"Ref": "Stage"}, "test"]},
+            },
+            "Resources": {
+                "Queue": {
+                    "Type": "AWS::SQS::Queue",
+                    "Properties": {
+                        "DelaySeconds": {"Fn::If": ["IsProd", 0, {"Fn::If": ["IsTest", 5, 10]}]},
+                        "Tags": [{"Fn::If": ["IsProd", {"Key": "prod", "Value": "1"}, {"Ref": "AWS::NoValue"}]}, {"Key": "a", "Value": "b"}],
+                    },
+                }
+            },
+        }
+        processor = CloudFormationTemplateProcessor(template)
+
+        result = processor.prune_conditions()
+
+        assert result.updated_resources == ["Queue"]
+        assert processor.processed_template["Resources"]["Queue"]["Properties"] == {"DelaySeconds": 5, "Tags": [{"Key": "a", "Value": "b"}]}
+
+    def test_unresolved_conditions_are_kept(self):
+        """Test that a template whose conditions cannot be evaluated is left as it is."""
+        template = load_yaml(self.TEMPLATE)
+        del template["Parameters"]["Environment"]["Default"]
+        processor = CloudFormationTemplateProcessor(template)
+
+        result = processor.prune_conditions()
+
+        assert result.conditions == {}
+        assert processor.processed_template == template
+
+    def test_no_conditions(self):
+        """Test that a template without conditions is not modified."""
+        template = {"Resources": {"Queue": {"Type": "AWS::SQS::Queue"}}}
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+
+        result = processor.prune_conditions()
+
+        assert result.conditions == {}
+        assert processor.processed_template == template
+        assert processor.processed_template["Resources"] is template["Resources"]
+
+
+class TestSlice:
+    """Test slicing the template down to what a set of resources needs."""
+
+    TEMPLATE = """
+    Transform: AWS::Serverless-2016-10-31
+    Parameters:
+      Stage:
+        Type: String
+        Default: dev
+      TableName:
+        Type: String
+        Default: orders
+      Unused:
+        Type: String
+        Default: unused
+    Conditions:
+      IsProd: !Equals [!Ref Stage, prod]
+      HasAlarms: !Condition IsProd
+      IsOther: !Not [!Condition IsProd]
+    Globals:
+      Function:
+        Runtime: python3.13
+        Environment:
+          Variables:
+            CONFIG_TABLE: !Ref ConfigTable
+    Resources:
+      ConfigTable:
+        Type: AWS::DynamoDB::Table
+      OrdersTable:
+        Type: AWS::DynamoDB::Table
+        Properties:
+          TableName: !Sub "${TableName}-${Stage}"
+      OrdersQueue:
+        Type: AWS::SQS::Queue
+      PublicApi:
+        Type: AWS::Serverless::Api
+        Properties:
+          StageName: !Ref Stage
+      AdminApi:
+        Type: AWS::Serverless::Api
+        Properties:
+          StageName: admin
+      OrdersFunction:
+        Type: AWS::Serverless::Function
+        Properties:
+          MemorySize: !If [HasAlarms, 1024, 128]
+          Environment:
+            Variables:
+              TABLE: !Ref OrdersTable
+          Events:
+            GetOrders:
+              Type: Api
+              Properties:
+                RestApiId: !Ref PublicApi
+                Path: /orders
+                Method: get
+      QueueWorker:
+        Type: AWS::Serverless::Function
+        Properties:
+          Events:
+            Queue:
+              Type: SQS
+              Properties:
+                Queue: !GetAtt OrdersQueue.Arn
+      AdminFunction:
+        Type: AWS::Serverless::Function
+        Condition: IsOther
+        Properties:
+          Events:
+            Admin:
+              Type: Api
+              Properties:
+                RestApiId: !Ref AdminApi
+                Path: /admin
+                Method: get
+      Permission:
+        Type: AWS::Lambda::Permission
+        Properties:
+          FunctionName: !Ref OrdersFunction
+    Outputs:
+      PublicApiUrl:
+        Value: !Sub "https://${PublicApi}.execute-api.${AWS::Region}.amazonaws.com/${Stage}"
+      AdminApiUrl:
+        Value: !Sub "https://${AdminApi}.execute-api.${AWS::Region}.amazonaws.com/admin"
+      Stage:
+        Value: !Ref Stage
+    """
+
+    def test_slice_api(self):
+        """Test slicing an API keeps the functions it routes to and what they need."""
+        template = load_yaml(self.TEMPLATE)
+        processor = CloudFormationTemplateProcessor(template, copy_on_write=True)
+
+        sliced = processor.slice(["PublicApi"])
+
+        assert list(sliced["Resources"]) == ["ConfigTable", "OrdersTable", "PublicApi", "OrdersFunction"]
+        assert list(sliced["Outputs"]) == ["PublicApiUrl", "Stage"]
+        assert list(sliced["Conditions"]) == ["IsProd", "HasAlarms"]
+        assert list(sliced["Parameters"]) == ["Stage", "TableName"]
+        assert sliced["Transform"] == template["Transform"]
+        assert sliced["Globals"] is template["Globals"]
+        assert sliced["Resources"]["OrdersFunction"] is template["Resources"]["OrdersFunction"]
+
+        # The processed template is not modified
+        assert processor.processed_template == template
+        assert len(processor.processed_template["Resources"]) == 9
+
+    def test_slice_function(self):
+        """Test slicing a function keeps its event sources, but not the resources referencing it."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+
+        sliced = processor.slice(["QueueWorker"])
+
+        assert list(sliced["Resources"]) == ["ConfigTable", "OrdersQueue", "QueueWorker"]
+        assert list(sliced["Outputs"]) == ["Stage"]
+        assert "Conditions" not in sliced
+        assert list(sliced["Parameters"]) == ["Stage"]
+
+    def test_slice_conditional_resource(self):
+        """Test that the conditions of the kept resources are kept."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+
+        sliced = processor.slice(["AdminApi"])
+
+        assert list(sliced["Resources"]) == ["ConfigTable", "AdminApi", "AdminFunction"]
+        assert list(sliced["Conditions"]) == ["IsProd", "IsOther"]
+        assert list(sliced["Outputs"]) == ["AdminApiUrl", "Stage"]
+
+    def test_slice_without_globals(self):
+        """Test that resources referenced from Globals are not needed by non-serverless resources."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+
+        sliced = processor.slice(["OrdersTable"])
+
+        assert list(sliced["Resources"]) == ["OrdersTable"]
+        assert list(sliced["Parameters"]) == ["Stage", "TableName"]
+
+    def test_slice_missing_root(self):
+        """Test slicing a resource that does not exist."""
+        processor = CloudFormationTemplateProcessor(load_yaml(self.TEMPLATE))
+
+        with pytest.raises(ValueError, match="Resource Missing not found"):
+            processor.slice(["Missing"])
+
+
+class TestPassManager:
+    TEMPLATE = """
+    Parameters:
+      Stage:
+        Type: String
+        Default: dev
+    Conditions:
+      IsProd: !Equals [!Ref Stage, prod]
+    Resources:
+      Queue:
+        Type: AWS::SQS::Queue
+      ProdQueue:
+        Type: AWS::SQS::Queue
+        Condition: IsProd
+      Topic:
+        Type: AWS::SNS::Topic
+    """
+
+    @staticmethod
+    def _manager(cache_dir, calls, stage="dev"):
+        def prune(processor):
+            calls.append("prune_conditions")
+            processor.prune_conditions(parameters={"Stage": stage})
+
+        def remove_topic(processor):
+            calls.append("remove_topic")
+            processor.remove_resources(["Topic"])
+
+        return PassManager(cache_dir=cache_dir).add("prune_conditions", prune, inputs={"Stage": stage}).add("remove_topic", remove_topic)
+
+    def test_run_in_memory(self):
+        """Test that the passes run in order on one processor without modifying the input template."""
+        template = load_yaml(self.TEMPLATE)
+        original = copy.deepcopy(template)
+        calls = []
+
+        result = self._manager(None, calls).run(template)
+
+        assert calls == ["prune_conditions", "remove_topic"]
+        assert result.executed == ["prune_conditions", "remove_topic"]
+        assert result.reused == []
+        assert list(result.template["Resources"]) == ["Queue"]
+        assert template == original
+
+    def test_in_place_pass_does_not_modify_input(self):
+        """Test that a pass writing into nested values of the processed template does not modify the input template."""
+        template = {"Resources": {"F": {"Type": "AWS::Lambda::Function", "Properties": {"Environment": {"Variables": {"A": "original"}}}}}}
+        original = copy.deepcopy(template)
+
+        def patch(processor):
+            processor.processed_template["Resources"]["F"]["Properties"]["Environment"]["Variables"]["A"] = "patched"
+
+        result = PassManager().add("patch", patch).add("slice", lambda processor: processor.slice(["F"])).add("patch_slice", patch).run(template)
+
+        assert result.template["Resources"]["F"]["Properties"]["Environment"]["Variables"]["A"] == "patched"
+        assert template == original
+
+    def test_copy_on_write_pass_modifies_through_processor(self):
+        """Test that copy-on-write passes modifying the template through the processor do not modify the input template."""
+        template = {"Resources": {"F": {"Type": "AWS::Lambda::Function", "Properties": {"Environment": {"Variables": {"A": "original"}}}}}}
+        original = copy.deepcopy(template)
+
+        def patch(processor):
+            processor.get_mutable("Resources", "F", "Properties", "Environment", "Variables")["A"] = "patched"
+
+        result = PassManager(copy_on_write=True).add("patch", patch).run(template)
+
+        assert result.template["Resources"]["F"]["Properties"]["Environment"]["Variables"]["A"] == "patched"
+        assert template == original
+
+    def test_memoized_outputs(self, tmp_path):
+        """Test that memoized outputs are reused by later runs and invalidated by the template and the inputs."""
+        calls = []
+
+        first = self._manager(tmp_path, calls).run(load_yaml(self.TEMPLATE))
+        second = self._manager(tmp_path, calls).run(load_yaml(self.TEMPLATE))
+
+        assert calls == ["prune_conditions", "remove_topic"]
+        assert second.reused == ["prune_conditions", "remove_topic"]
+        assert second.template == first.template
+
+        calls.clear()
+        prod = self._manager(tmp_path, calls, stage="prod").run(load_yaml(self.TEMPLATE))
+        assert calls == ["prune_conditions", "remove_topic"]
+        assert list(prod.template["Resources"]) == ["Queue", "ProdQueue"]
+
+        calls.clear()
+        changed = load_yaml(self.TEMPLATE)
+        changed["Resources"]["Queue"]["Properties"] = {"DelaySeconds": 5}
+        self._manager(tmp_path, calls).run(changed)
+        assert calls == ["prune_conditions", "remove_topic"]
+
+    def test_memoized_prefix(self, tmp_path):
+        """Test that only the passes after the memoized prefix run again, and passes that are not memoized always run."""
+        calls = []
+        self._manager(tmp_path, calls).run(load_yaml(self.TEMPLATE))
+
+        calls.clear()
+        manager = self._manager(tmp_path, calls).add("rename", lambda processor: calls.append("rename"), memoize=False)
+        manager.add("count", lambda processor: calls.append("count"))
+        result = manager.run(load_yaml(self.TEMPLATE))
+        assert result.reused == ["prune_conditions", "remove_topic"]
+        assert calls == ["rename", "count"]
+
+        calls.clear()
+        manager.run(load_yaml(self.TEMPLATE))
+        assert calls == ["rename", "count"]
+
+    def test_replace_template(self, tmp_path):
+        """Test that a pass can replace the processed template by returning a new one."""
+        template = load_yaml(self.TEMPLATE)
+
+        result = PassManager(cache_dir=tmp_path).add("slice", lambda processor: processor.slice(["Topic"])).run(template)
+
+        assert list(result.template["Resources"]) == ["Topic"]
+        assert isinstance(result.processor, CloudFormationTemplateProcessor)
+        assert PassManager(cache_dir=tmp_path).add("slice", lambda processor: processor.slice(["Topic"])).run(template).reused == ["slice"]
+
+    def test_processor_class_in_key(self, tmp_path):
+        """Test that outputs memoized with one processor class are not reused with another."""
+
+        class OtherProcessor(CloudFormationTemplateProcessor):
+            pass
+
+        template = load_yaml(self.TEMPLATE)
+        PassManager(cache_dir=tmp_path).add("slice", lambda processor: processor.slice(["Topic"])).run(template)
+
+        result = PassManager(cache_dir=tmp_path, processor_class=OtherProcessor).add("slice", lambda processor: processor.slice(["Topic"])).run(template)
+
+        assert result.reused == []
+        assert isinstance(result.processor, OtherProcessor)
+
+    def test_cache_limit(self, tmp_path):
+        """Test that only the most recently used outputs are kept in the cache directory."""
+        calls = []
+        for stage in ["dev", "test", "prod"]:
+            manager = self._manager(tmp_path, calls, stage=stage)
+            manager.max_cache_files = 2
+            manager.run(load_yaml(self.TEMPLATE))
+
+        assert len(list(tmp_path.glob("*.pickle"))) == 2
+
+        calls.clear()
+        result = self._manager(tmp_path, calls, stage="prod").run(load_yaml(self.TEMPLATE))
+        assert result.reused == ["prune_conditions", "remove_topic"]
@@ -0,0 +1,154 @@
+"""Tests for the parsed template cache."""
+
+import os
+import pickle
+
+import pytest
+
+from aws_sam_testing.cfn import load_yaml
+from aws_sam_testing.cfn_cache import CACHE_DIR_NAME, TemplateCache, default_cache_dir
+from aws_sam_testing.cfn_tags import CloudFormationObject
+
+TEMPLATE = """
+AWSTemplateFormatVersion: '2010-09-09'
+Resources:
+  MyBucket:
+    Type: AWS::S3::Bucket
+    Properties:
+      BucketName: !Sub '${AWS::StackName}-bucket'
+  MyFunction:
+    Type: AWS::Serverless::Function
+    Properties:
+      Environment:
+        Variables:
+          BUCKET_ARN: !GetAtt MyBucket.Arn
+          BUCKET_NAME: !Ref MyBucket
+"""
+
+
+class TestTemplateCache:
+    """Test TemplateCache functionality."""
+
+    def test_load_matches_parser(self, tmp_path):
+        """Test that cached templates are equal to freshly parsed ones, including tags."""
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+        cache = TemplateCache()
+
+        first = cache.load(template_path)
+        second = cache.load(template_path)
+
+        assert first == load_yaml(TEMPLATE)
+        assert second == first
+        assert isinstance(second["Resources"]["MyFunction"]["Properties"]["Environment"]["Variables"]["BUCKET_ARN"], CloudFormationObject)
+
+    def test_load_returns_independent_copies(self, tmp_path):
+        """Test that mutating a loaded template does not affect later loads."""
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+        cache = TemplateCache()
+
+        first = cache.load(template_path)
+        del first["Resources"]["MyBucket"]
+
+        assert "MyBucket" in cache.load(template_path)["Resources"]
+
+    def test_memory_cache_skips_parsing(self, tmp_path, monkeypatch):
+        """Test that an unchanged template is parsed only once."""
+        import aws_sam_testing.cfn
+
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+        cache = TemplateCache(persistent=False)
+
+        calls = []
+        original_load_yaml = aws_sam_testing.cfn.load_yaml
+        monkeypatch.setattr(aws_sam_testing.cfn, "load_yaml", lambda stream, **kwargs: calls.append(stream) or original_load_yaml(stream, **kwargs))
+
+        cache.load(template_path)
+        cache.load(template_path)
+
+        assert len(calls) == 1
+        assert len(cache) == 1
+
+    def test_disk_cache_shared_between_instances(self, tmp_path, monkeypatch):
+        """Test that a new cache instance loads the template from disk without parsing."""
+        import aws_sam_testing.cfn
+
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+        expected = TemplateCache().load(template_path)
+
+        cache_files = list((tmp_path / ".aws-sam" / CACHE_DIR_NAME).glob("*.pickle"))
+        assert len(cache_files) == 1
+
+        def fail(stream, **kwargs):
+            raise AssertionError("Template should not be parsed")
+
+        monkeypatch.setattr(aws_sam_testing.cfn, "load_yaml", fail)
+        assert TemplateCache().load(template_path) == expected
+
+    def test_modified_template_invalidates_cache(self, tmp_path):
+        """Test that editing the template is picked up even if size and mtime do not change."""
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+        cache = TemplateCache()
+        cache.load(template_path)
+        stat = template_path.stat()
+
+        template_path.write_text(TEMPLATE.replace("MyBucket", "MyBuckeX"))
+        os.utime(template_path, ns=(stat.st_atime_ns, stat.st_mtime_ns))
+
+        assert "MyBuckeX" in cache.load(template_path)["Resources"]
+        assert "MyBuckeX" in TemplateCache().load(template_path)["Resources"]
+
+    def test_corrupted_cache_file_is_ignored(self, tmp_path):
+        """Test that an unreadable cache file is replaced."""
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+        cache_dir = tmp_path / "cache"
+        TemplateCache(cache_dir=cache_dir).load(template_path)
+
+        (cache_file,) = cache_dir.glob("*.pickle")
+        cache_file.write_bytes(b"not a pickle")
+
+        assert TemplateCache(cache_dir=cache_dir).load(template_path) == load_yaml(TEMPLATE)
+        with open(cache_file, "rb") as f:
+            assert pickle.load(f)[2]
+
+    def test_lru_eviction(self, tmp_path):
+        """Test that the least recently used template is evicted."""
+        cache = TemplateCache(max_entries=2, persistent=False)
+        paths = []
+        for name in ["a", "b", "c"]:
+            template_path = tmp_path / f"{name}.yaml"
+            template_path.write_text(TEMPLATE)
+            paths.append(template_path)
+            cache.load(template_path)
+
+        assert len(cache) == 2
+        assert [key[0] for key in cache._entries] == [str(paths[1]), str(paths[2])]
+
+    def test_native_intrinsics_cached_separately(self, tmp_path):
+        """Test that both loader modes are cached independently."""
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+        cache = TemplateCache()
+
+        tagged = cache.load(template_path)
+        native = cache.load(template_path, native_intrinsics=True)
+
+        assert isinstance(tagged["Resources"]["MyBucket"]["Properties"]["BucketName"], CloudFormationObject)
+        assert native["Resources"]["MyBucket"]["Properties"]["BucketName"] == {"Fn::Sub": "${AWS::StackName}-bucket"}
+        assert TemplateCache().load(template_path, native_intrinsics=True) == native
+        assert len(list((tmp_path / ".aws-sam" / CACHE_DIR_NAME).glob("*.pickle"))) == 2
+
+    def test_missing_template(self, tmp_path):
+        """Test that a missing template raises FileNotFoundError."""
+        with pytest.raises(FileNotFoundError):
+            TemplateCache().load(tmp_path / "template.yaml")
+
+    def test_default_cache_dir(self, tmp_path):
+        """Test that the cache is placed in the enclosing .aws-sam directory."""
+        assert default_cache_dir(tmp_path / "template.yaml") == tmp_path / ".aws-sam" / CACHE_DIR_NAME
+        assert default_cache_dir(tmp_path / ".aws-sam" / "build" / "template.yaml") == tmp_path / ".aws-sam" / CACHE_DIR_NAME
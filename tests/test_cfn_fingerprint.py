@@ -0,0 +1,177 @@
+"""Tests for structural template fingerprints."""
+
+import os
+import sys
+
+from aws_sam_testing import cfn_fingerprint
+from aws_sam_testing.cfn import CloudFormationTemplateProcessor, load_yaml
+from aws_sam_testing.cfn_fingerprint import directory_fingerprint, fingerprint, resource_fingerprint, template_fingerprint
+
+TEMPLATE = """
+Globals:
+  Function:
+    Runtime: python3.13
+    CodeUri: shared/
+Resources:
+  Queue:
+    Type: AWS::SQS::Queue
+    Properties:
+      QueueName: !Sub "${AWS::StackName}-queue"
+  Function:
+    Type: AWS::Serverless::Function
+    Properties:
+      CodeUri: src/
+      Handler: app.handler
+      Environment:
+        Variables:
+          QUEUE_ARN: !GetAtt Queue.Arn
+  SharedFunction:
+    Type: AWS::Serverless::Function
+    Properties:
+      Handler: app.handler
+"""
+
+
+def _project(tmp_path):
+    (tmp_path / "src").mkdir()
+    (tmp_path / "src" / "app.py").write_text("def handler(event, context):\n    return 1\n")
+    (tmp_path / "shared").mkdir()
+    (tmp_path / "shared" / "app.py").write_text("def handler(event, context):\n    return 2\n")
+    (tmp_path / "template.yaml").write_text(TEMPLATE)
+    return load_yaml(TEMPLATE)
+
+
+class TestFingerprint:
+    """Test the fingerprint function."""
+
+    def test_key_order_and_tags(self):
+        """Test that key order does not matter and tags hash the same as JSON intrinsic functions."""
+        tagged = load_yaml("{B: !GetAtt Queue.Arn, A: [!Ref Queue, !Sub '${Queue}']}")
+        native = {"A": [{"Ref": "Queue"}, {"Fn::Sub": "${Queue}"}], "B": {"Fn::GetAtt": ["Queue", "Arn"]}}
+
+        assert fingerprint(tagged) == fingerprint(native)
+        assert fingerprint(load_yaml("!Ref Queue.Arn")) == fingerprint(load_yaml("!GetAtt Queue.Arn"))
+
+    def test_types_and_structure(self):
+        """Test that values of different types or structure have different fingerprints."""
+        values = [1, "1", True, 1.0, None, [], {}, [1, 2], [[1], 2], {"a": "b"}, {"ab": ""}, ["a", "b"], ["ab"]]
+
+        assert len({fingerprint(value) for value in values}) == len(values)
+
+    def test_unhashable_tags(self):
+        """Test that fingerprints can be used to index tag objects, which are not hashable."""
+        index = {fingerprint(value): value for value in load_yaml("[!Ref A, !Ref B, !Ref A]")}
+
+        assert len(index) == 2
+
+    def test_deep_nesting(self):
+        """Test that values nested deeper than the recursion limit can be fingerprinted."""
+        value: object = "leaf"
+        for _ in range(sys.getrecursionlimit() * 3):
+            value = {"Next": [value]}
+
+        assert len(fingerprint(value)) == 64
+
+
+class TestDirectoryFingerprint:
+    """Test fingerprints of code directories."""
+
+    def test_directory_content(self, tmp_path):
+        """Test that the fingerprint changes with file contents and names, but not with ignored directories."""
+        (tmp_path / "pkg").mkdir()
+        (tmp_path / "pkg" / "module.py").write_text("a = 1\n")
+        before = directory_fingerprint(tmp_path)
+
+        (tmp_path / "__pycache__").mkdir()
+        (tmp_path / "__pycache__" / "module.pyc").write_bytes(b"\x00")
+        assert directory_fingerprint(tmp_path) == before
+
+        (tmp_path / "pkg" / "module.py").write_text("a = 2\n")
+        changed = directory_fingerprint(tmp_path)
+        assert changed != before
+
+        (tmp_path / "pkg" / "module.py").rename(tmp_path / "pkg" / "other.py")
+        assert directory_fingerprint(tmp_path) not in (before, changed)
+
+    def test_file_digests_are_bounded(self, tmp_path, monkeypatch):
+        """Test that edited files replace their cached digest and only the most recently used files are kept."""
+        monkeypatch.setattr(cfn_fingerprint, "_file_digests", type(cfn_fingerprint._file_digests)())
+        monkeypatch.setattr(cfn_fingerprint, "_MAX_FILE_DIGESTS", 2)
+        module = tmp_path / "module.py"
+        for version in range(3):
+            module.write_text(f"a = {version}\n")
+            os.utime(module, ns=(version, version))
+            directory_fingerprint(tmp_path)
+        assert list(cfn_fingerprint._file_digests) == [str(module)]
+
+        for name in ["a.py", "b.py"]:
+            (tmp_path / name).write_text("b = 1\n")
+        before = directory_fingerprint(tmp_path)
+
+        assert len(cfn_fingerprint._file_digests) == 2
+        assert directory_fingerprint(tmp_path) == before
+
+    def test_missing_path(self, tmp_path):
+        """Test that a missing path has no fingerprint."""
+        assert directory_fingerprint(tmp_path / "missing") is None
+
+
+class TestResourceFingerprints:
+    """Test resource and template fingerprints."""
+
+    def test_code_changes(self, tmp_path):
+        """Test that only the resources whose code changed get a new fingerprint."""
+        template = _project(tmp_path)
+        processor = CloudFormationTemplateProcessor(template)
+
+        before = processor.get_resource_fingerprints(base_dir=tmp_path)
+        (tmp_path / "src" / "app.py").write_text("def handler(event, context):\n    return 3\n")
+        after = processor.get_resource_fingerprints(base_dir=tmp_path)
+
+        assert [logical_id for logical_id in after if after[logical_id] != before[logical_id]] == ["Function"]
+        assert processor.get_resource_fingerprints() == CloudFormationTemplateProcessor(template).get_resource_fingerprints()
+
+    def test_globals_code_uri(self, tmp_path):
+        """Test that functions without a CodeUri use the code directory from Globals."""
+        template = _project(tmp_path)
+        processor = CloudFormationTemplateProcessor(template)
+
+        before = processor.get_resource_fingerprints(base_dir=tmp_path)
+        (tmp_path / "shared" / "app.py").write_text("def handler(event, context):\n    return 4\n")
+        after = processor.get_resource_fingerprints(base_dir=tmp_path)
+
+        assert [logical_id for logical_id in after if after[logical_id] != before[logical_id]] == ["SharedFunction"]
+
+    def test_template_changes(self, tmp_path):
+        """Test that modifying the processed template changes the fingerprints of the modified resources."""
+        template = _project(tmp_path)
+        processor = CloudFormationTemplateProcessor(template)
+        before = processor.get_resource_fingerprints()
+        template_before = processor.get_template_fingerprint(base_dir=tmp_path)
+
+        processor.get_mutable("Resources", "Queue", "Properties")["DelaySeconds"] = 5
+        after = processor.get_resource_fingerprints()
+        assert [logical_id for logical_id in after if after[logical_id] != before[logical_id]] == ["Queue"]
+
+        processor.get_mutable("Globals", "Function")["Timeout"] = 30
+        after_globals = processor.get_resource_fingerprints()
+        assert [logical_id for logical_id in after if after[logical_id] != after_globals[logical_id]] == ["Function", "SharedFunction"]
+
+        assert processor.get_template_fingerprint(base_dir=tmp_path) != template_before
+
+    def test_module_functions_match_processor(self, tmp_path):
+        """Test that the module functions compute the same fingerprints as the processor."""
+        template = _project(tmp_path)
+        processor = CloudFormationTemplateProcessor(template)
+
+        assert processor.get_template_fingerprint(base_dir=tmp_path) == template_fingerprint(template, base_dir=tmp_path)
+        assert processor.get_resource_fingerprints()["Queue"] == resource_fingerprint(template["Resources"]["Queue"], template["Globals"])
+
+    def test_native_intrinsics(self, tmp_path):
+        """Test that templates loaded with and without native intrinsics have the same fingerprint."""
+        _project(tmp_path)
+
+        tagged = load_yaml(TEMPLATE)
+        native = load_yaml(TEMPLATE, native_intrinsics=True)
+
+        assert template_fingerprint(tagged, base_dir=tmp_path) == template_fingerprint(native, base_dir=tmp_path)
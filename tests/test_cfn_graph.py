@@ -0,0 +1,95 @@
+import pytest
+
+from aws_sam_testing.cfn_graph import DependencyGraph
+
+
+class TestDependencyGraph:
+    def test_from_edges_builds_reverse_adjacency(self):
+        """Test that reverse adjacency lists the dependents of each node."""
+        graph = DependencyGraph.from_edges(
+            {
+                "Function": ["Role", "Table"],
+                "Role": [],
+                "Table": [],
+                "Alarm": ["Function"],
+            }
+        )
+
+        assert len(graph) == 4
+        assert graph.names(graph.adjacency[graph.index["Function"]]) == ["Role", "Table"]
+        assert graph.names(graph.reverse_adjacency[graph.index["Role"]]) == ["Function"]
+        assert graph.names(graph.reverse_adjacency[graph.index["Function"]]) == ["Alarm"]
+
+    def test_from_edges_ignores_unknown_targets(self):
+        """Test that edges to nodes outside of the graph (e.g. parameters) are dropped."""
+        graph = DependencyGraph.from_edges({"Bucket": ["BucketNameParam", "AWS::Region"]})
+
+        assert graph.adjacency == [[]]
+
+    def test_integer_adjacency(self):
+        """Test that a graph can be created directly from integer-indexed adjacency."""
+        graph = DependencyGraph(["A", "B", "C"], [[1], [2], []])
+
+        assert graph.reverse_adjacency == [[], [0], [1]]
+
+    def test_adjacency_length_mismatch(self):
+        """Test that adjacency must match the number of nodes."""
+        with pytest.raises(ValueError):
+            DependencyGraph(["A", "B"], [[1]])
+
+    def test_weakly_connected_components(self):
+        """Test that components follow edges in both directions."""
+        graph = DependencyGraph.from_edges(
+            {
+                "A": ["B"],
+                "B": [],
+                "C": ["B"],
+                "D": ["E"],
+                "E": ["D"],
+                "F": [],
+            }
+        )
+
+        components = sorted(sorted(graph.names(component)) for component in graph.weakly_connected_components())
+        assert components == [["A", "B", "C"], ["D", "E"], ["F"]]
+
+    def test_strongly_connected_components(self):
+        """Test that cycles are grouped and components come after their dependencies."""
+        graph = DependencyGraph.from_edges(
+            {
+                "Function": ["Role"],
+                "Role": ["Policy"],
+                "Policy": ["Role", "Table"],
+                "Table": [],
+                "Self": ["Self"],
+            }
+        )
+
+        components = [sorted(graph.names(component)) for component in graph.strongly_connected_components()]
+        assert sorted(components) == [["Function"], ["Policy", "Role"], ["Self"], ["Table"]]
+        assert components.index(["Table"]) < components.index(["Policy", "Role"]) < components.index(["Function"])
+
+    def test_topological_levels(self):
+        """Test that components are grouped by dependency depth and cycles stay together."""
+        graph = DependencyGraph.from_edges(
+            {
+                "Function": ["Role", "Table"],
+                "Role": ["Policy"],
+                "Policy": ["Role", "Bucket"],
+                "Table": [],
+                "Bucket": [],
+                "Alarm": ["Function"],
+            }
+        )
+
+        levels = [[graph.names(component) for component in level] for level in graph.topological_levels()]
+        assert levels == [[["Table"], ["Bucket"]], [["Role", "Policy"]], [["Function"]], [["Alarm"]]]
+
+    def test_deep_chain_does_not_recurse(self):
+        """Test that very long dependency chains do not hit the recursion limit."""
+        size = 20000
+        graph = DependencyGraph([f"R{number}" for number in range(size)], [[number + 1] if number + 1 < size else [] for number in range(size)])
+
+        assert len(graph.strongly_connected_components()) == size
+        assert len(graph.weakly_connected_components()) == 1
+        assert len(graph.topological_levels()) == size
@@ -0,0 +1,177 @@
+"""Tests for the local intrinsic function evaluator."""
+
+import pytest
+
+from aws_sam_testing.cfn import load_yaml
+from aws_sam_testing.cfn_intrinsics import NO_VALUE, IntrinsicEvaluator, IntrinsicResolutionError
+
+TEMPLATE = """
+Parameters:
+  Stage:
+    Type: String
+    Default: dev
+  Subnets:
+    Type: CommaDelimitedList
+    Default: subnet-a, subnet-b
+  Required:
+    Type: String
+Mappings:
+  StageConfig:
+    dev:
+      MemorySize: 128
+    prod:
+      MemorySize: 1024
+Conditions:
+  IsProd: !Equals [!Ref Stage, prod]
+  IsNotProd: !Not [!Condition IsProd]
+  IsDevOrProd: !Or [!Equals [!Ref Stage, dev], !Condition IsProd]
+  IsBoth: !And [!Condition IsProd, !Condition IsNotProd]
+Resources:
+  MyQueue:
+    Type: AWS::SQS::Queue
+"""
+
+
+@pytest.fixture
+def template():
+    return load_yaml(TEMPLATE)
+
+
+@pytest.fixture
+def evaluator(template):
+    return IntrinsicEvaluator(
+        template,
+        resource_resolver=lambda logical_id: f"{logical_id}-physical-id",
+        attribute_resolver=lambda logical_id, attribute: f"{logical_id}:{attribute}",
+    )
+
+
+class TestIntrinsicEvaluator:
+    """Test IntrinsicEvaluator functionality."""
+
+    def test_ref(self, evaluator):
+        """Test Ref to parameters, pseudo parameters and resources."""
+        assert evaluator.evaluate(load_yaml("!Ref Stage")) == "dev"
+        assert evaluator.evaluate({"Ref": "Subnets"}) == ["subnet-a", "subnet-b"]
+        assert evaluator.evaluate({"Ref": "AWS::Region"}) == "us-east-1"
+        assert evaluator.evaluate({"Ref": "AWS::AccountId"}) == "123456789012"
+        assert evaluator.evaluate({"Ref": "MyQueue"}) == "MyQueue-physical-id"
+
+    def test_parameters_override_defaults(self, template):
+        """Test that given parameters override the defaults."""
+        evaluator = IntrinsicEvaluator(template, parameters={"Stage": "prod", "Required": "value"}, pseudo_parameters={"AWS::Region": "eu-west-1"})
+        assert evaluator.evaluate({"Fn::Sub": "${Stage}-${Required}-${AWS::Region}"}) == "prod-value-eu-west-1"
+
+        with pytest.raises(IntrinsicResolutionError) as e:
+            evaluator.evaluate({"Ref": "AWS::AccountId"})
+        assert e.value.names == ["AWS::AccountId"]
+
+    def test_get_att(self, evaluator):
+        """Test both forms of Fn::GetAtt."""
+        assert evaluator.evaluate(load_yaml("!GetAtt MyQueue.Arn")) == "MyQueue:Arn"
+        assert evaluator.evaluate({"Fn::GetAtt": ["MyQueue", "QueueName"]}) == "MyQueue:QueueName"
+
+    def test_sub(self, evaluator):
+        """Test Fn::Sub with parameters, attributes, literals and the variable map form."""
+        assert evaluator.evaluate(load_yaml("!Sub '${AWS::StackName}-${Stage}-${MyQueue.Arn}-${!Literal}'")) == "my-stack-dev-MyQueue:Arn-${Literal}"
+        assert evaluator.evaluate(load_yaml("!Sub ['${Name}-${Stage}', {Name: !Ref MyQueue}]")) == "MyQueue-physical-id-dev"
+
+    def test_sub_reports_all_unresolved_variables(self, template):
+        """Test that all unresolved variables are reported at once."""
+        evaluator = IntrinsicEvaluator(template)
+
+        with pytest.raises(IntrinsicResolutionError) as e:
+            evaluator.evaluate({"Fn::Sub": "${Unknown}-${MyQueue}-${MyQueue.Arn}-${Stage}"})
+
+        assert e.value.names == ["MyQueue", "MyQueue.Arn", "Unknown"]
+        assert isinstance(e.value, ValueError)
+
+    def test_join_select_split(self, evaluator):
+        """Test Fn::Join, Fn::Select and Fn::Split."""
+        assert evaluator.evaluate(load_yaml("!Join ['-', [a, !Ref Stage, 1]]")) == "a-dev-1"
+        assert evaluator.evaluate(load_yaml("!Select [1, !Ref Subnets]")) == "subnet-b"
+        assert evaluator.evaluate(load_yaml("!Select ['0', !Split [',', 'x,y']]")) == "x"
+
+        with pytest.raises(IntrinsicResolutionError):
+            evaluator.evaluate(load_yaml("!Select [5, !Ref Subnets]"))
+
+    def test_find_in_map(self, evaluator):
+        """Test Fn::FindInMap, including the default value."""
+        assert evaluator.evaluate(load_yaml("!FindInMap [StageConfig, !Ref Stage, MemorySize]")) == 128
+        assert evaluator.evaluate({"Fn::FindInMap": ["StageConfig", "test", "MemorySize", {"DefaultValue": 256}]}) == 256
+
+        with pytest.raises(IntrinsicResolutionError):
+            evaluator.evaluate({"Fn::FindInMap": ["StageConfig", "test", "MemorySize"]})
+
+    def test_base64_and_get_azs(self, evaluator):
+        """Test Fn::Base64 and Fn::GetAZs."""
+        assert evaluator.evaluate(load_yaml("!Base64 hello")) == "aGVsbG8="
+        assert evaluator.evaluate(load_yaml("!GetAZs ''")) == ["us-east-1a", "us-east-1b", "us-east-1c"]
+
+    def test_conditions(self, template):
+        """Test condition functions and Fn::If."""
+        dev = IntrinsicEvaluator(template)
+        prod = IntrinsicEvaluator(template, parameters={"Stage": "prod"})
+
+        assert [dev.evaluate_condition(name) for name in ("IsProd", "IsNotProd", "IsDevOrProd", "IsBoth")] == [False, True, True, False]
+        assert [prod.evaluate_condition(name) for name in ("IsProd", "IsNotProd", "IsDevOrProd", "IsBoth")] == [True, False, True, False]
+        assert dev.evaluate(load_yaml("!If [IsProd, 1024, 128]")) == 128
+        assert prod.evaluate(load_yaml("!If [IsProd, 1024, !Ref Unresolvable]")) == 1024
+
+        with pytest.raises(IntrinsicResolutionError):
+            dev.evaluate_condition("Missing")
+
+    def test_circular_condition(self):
+        """Test that circular conditions are reported."""
+        evaluator = IntrinsicEvaluator({"Conditions": {"A": {"Fn::Not": [{"Condition": "B"}]}, "B": {"Fn::Not": [{"Condition": "A"}]}}})
+
+        with pytest.raises(IntrinsicResolutionError, match="references itself"):
+            evaluator.evaluate_condition("A")
+
+    def test_no_value(self, evaluator):
+        """Test that AWS::NoValue entries are dropped."""
+        value = load_yaml("{A: !Ref AWS::NoValue, B: [1, !If [IsProd, 2, !Ref AWS::NoValue]], C: c}")
+
+        assert evaluator.evaluate(value) == {"B": [1], "C": "c"}
+        assert evaluator.evaluate({"Ref": "AWS::NoValue"}) is NO_VALUE
+
+    def test_nested_values(self, evaluator):
+        """Test evaluating a whole resource."""
+        resource = load_yaml(
+            """
+            Type: AWS::Serverless::Function
+            Properties:
+              Environment:
+                Variables:
+                  QUEUE_URL: !Ref MyQueue
+                  QUEUE_ARN: !GetAtt MyQueue.Arn
+                  NAME: !Join ['', [!Ref 'AWS::StackName', '-', !Select [0, !Ref Subnets]]]
+            """
+        )
+
+        assert evaluator.evaluate(resource)["Properties"]["Environment"]["Variables"] == {
+            "QUEUE_URL": "MyQueue-physical-id",
+            "QUEUE_ARN": "MyQueue:Arn",
+            "NAME": "my-stack-subnet-a",
+        }
+
+    def test_memoization(self, template):
+        """Test that results are memoized per node."""
+        calls = []
+
+        def attribute_resolver(logical_id, attribute):
+            calls.append((logical_id, attribute))
+            return "arn"
+
+        evaluator = IntrinsicEvaluator(template, attribute_resolver=attribute_resolver)
+        value = {"Fn::GetAtt": ["MyQueue", "Arn"]}
+        container = {"A": value, "B": [value]}
+
+        assert evaluator.evaluate(container) == {"A": "arn", "B": ["arn"]}
+        assert evaluator.evaluate(container) is evaluator.evaluate(container)
+        assert calls == [("MyQueue", "Arn")]
+
+    def test_unsupported_function(self, evaluator):
+        """Test that unsupported functions are reported."""
+        with pytest.raises(IntrinsicResolutionError, match="Fn::ImportValue"):
+            evaluator.evaluate(load_yaml("!ImportValue SharedValue"))
@@ -0,0 +1,141 @@
+"""Tests for the lazy loading of large templates."""
+
+import pytest
+
+from aws_sam_testing import cfn_lazy
+from aws_sam_testing.cfn import CloudFormationTemplateProcessor, load_yaml
+from aws_sam_testing.cfn_lazy import LazyTemplate, load_template_lazy
+
+TEMPLATE = """
+AWSTemplateFormatVersion: '2010-09-09'
+# Globals of the serverless resources
+Globals:
+  Function:
+    Runtime: python3.13   # trailing comment
+    Environment:
+      Variables:
+        TABLE: !Ref Table
+
+Resources:
+  Queue:
+    Type: AWS::SQS::Queue
+    Properties:
+      QueueName: !Sub "${AWS::StackName}-queue"
+
+  Function: {Type: "AWS::Lambda::Function", Properties: {Role: !GetAtt [Role, Arn], Handler: index.handler}}
+  Role:
+    Type: AWS::IAM::Role
+    Properties:
+      Description: a long description
+        that continues on the next line
+      Policies:
+        - PolicyName: inline
+          PolicyDocument: !If
+            - IsProd
+            - Statement: []
+            - !Ref AWS::NoValue
+  Code:
+    Type: AWS::Lambda::Function
+    Properties:
+      Code:
+        ZipFile: |
+          def handler(event, context):
+              return event
+  Table:
+    Type: AWS::Serverless::SimpleTable
+Outputs:
+  QueueUrl:
+    Value: !Ref Queue
+"""
+
+
+@pytest.fixture
+def constructed(monkeypatch):
+    """Record the slices of the template that are constructed."""
+    calls = []
+    construct = cfn_lazy._construct
+
+    def recording_construct(text, span, loader):
+        value = construct(text, span, loader)
+        calls.append(value)
+        return value
+
+    monkeypatch.setattr(cfn_lazy, "_construct", recording_construct)
+    return calls
+
+
+class TestLazyTemplate:
+    """Test the LazyTemplate class."""
+
+    @pytest.mark.parametrize("native_intrinsics", [False, True])
+    def test_same_as_load_yaml(self, native_intrinsics):
+        """Test that sections and resources load exactly as with load_yaml."""
+        template = LazyTemplate(TEMPLATE, native_intrinsics=native_intrinsics)
+        expected = load_yaml(TEMPLATE, native_intrinsics=native_intrinsics)
+
+        assert template.is_lazy
+        assert list(template) == list(expected)
+        assert list(template["Resources"]) == list(expected["Resources"])
+        assert template["Globals"] == expected["Globals"]
+        for logical_id in expected["Resources"]:
+            assert template["Resources"][logical_id] == expected["Resources"][logical_id]
+        assert template.to_dict() == expected
+
+    def test_constructs_only_accessed_parts(self, constructed):
+        """Test that the scan constructs nothing and accessed values are constructed once."""
+        template = LazyTemplate(TEMPLATE)
+
+        assert len(template) == 4
+        assert len(template["Resources"]) == 5
+        assert template["Resources"].type_of("Role") == "AWS::IAM::Role"
+        assert constructed == []
+
+        globals_section = template["Globals"]
+        assert template["Globals"] is globals_section
+        assert len(constructed) == 1
+
+    def test_find_resources_by_type(self, constructed):
+        """Test that only the matching resources are constructed."""
+        template = LazyTemplate(TEMPLATE)
+        expected = CloudFormationTemplateProcessor(load_yaml(TEMPLATE))
+
+        functions = template.find_resources_by_type("AWS::Lambda::Function")
+
+        assert functions == expected.find_resources_by_type("AWS::Lambda::Function")
+        assert [logical_id for logical_id, _ in functions] == ["Function", "Code"]
+        assert len(constructed) == 2
+        assert template.find_resources_by_type(["AWS::Serverless::*", "AWS::IAM::Role"]) == expected.find_resources_by_type(["AWS::Serverless::*", "AWS::IAM::Role"])
+        assert template.find_resources_by_type("AWS::S3::Bucket") == []
+        assert template["Resources"].types() == ("AWS::SQS::Queue", "AWS::Lambda::Function", "AWS::IAM::Role", "AWS::Serverless::SimpleTable")
+
+    @pytest.mark.parametrize(
+        "text",
+        [
+            "Mappings:\n  Shared: &shared\n    Key: value\nResources:\n  Queue:\n    Type: AWS::SQS::Queue\n    Properties: *shared\n",
+            "Resources:\n  Queue:\n    <<: {Type: AWS::SQS::Queue}\n",
+            "Resources:\n  1: {Type: AWS::SQS::Queue}\n",
+        ],
+    )
+    def test_fallback_to_full_load(self, text):
+        """Test that templates that cannot be split are loaded in full."""
+        template = LazyTemplate(text)
+
+        assert template.find_resources_by_type("AWS::SQS::Queue") == CloudFormationTemplateProcessor(load_yaml(text)).find_resources_by_type("AWS::SQS::Queue")
+        assert not template.is_lazy
+        assert template.to_dict() == load_yaml(text)
+
+    def test_without_resources(self):
+        """Test templates without a Resources mapping."""
+        assert LazyTemplate("Parameters:\n  Stage:\n    Type: String\n").find_resources_by_type("*") == []
+        template = LazyTemplate("Resources: []\n")
+        assert template["Resources"] == []
+        assert template.find_resources_by_type("*") == []
+
+    def test_load_template_lazy(self, tmp_path):
+        """Test loading a lazy template from a file."""
+        template_path = tmp_path / "template.yaml"
+        template_path.write_text(TEMPLATE)
+
+        assert load_template_lazy(template_path).to_dict() == load_yaml(TEMPLATE)
+        with pytest.raises(FileNotFoundError):
+            load_template_lazy(tmp_path / "missing.yaml")
@@ -0,0 +1,90 @@
+"""Tests for the immutable resource table."""
+
+import pytest
+
+from aws_sam_testing.cfn import CloudFormationTemplateProcessor, load_yaml
+from aws_sam_testing.cfn_table import FrozenList, FrozenMapping, ResourceTable
+
+TEMPLATE = """
+Resources:
+  Queue:
+    Type: AWS::SQS::Queue
+    Properties:
+      QueueName: my-queue
+      Tags:
+        - Key: team
+          Value: core
+  Function:
+    Type: AWS::Serverless::Function
+    Condition: IsProd
+    Properties:
+      Handler: app.handler
+      Environment:
+        Variables:
+          QUEUE_URL: !Ref Queue
+  Api:
+    Type: AWS::Serverless::Api
+  Topic:
+    Type: AWS::SNS::Topic
+"""
+
+
+class TestResourceTable:
+    """Test the ResourceTable class."""
+
+    def test_lookup(self):
+        """Test lookups by logical ID and by type."""
+        table = ResourceTable(load_yaml(TEMPLATE))
+
+        assert list(table) == ["Queue", "Function", "Api", "Topic"]
+        assert len(table) == 4
+        assert "Queue" in table and "Missing" not in table
+        assert table["Queue"].type == "AWS::SQS::Queue"
+        assert table["Queue"].properties["QueueName"] == "my-queue"
+        assert table["Function"].definition["Condition"] == "IsProd"
+        assert table["Api"].properties == {}
+        assert table.type_of("Topic") == "AWS::SNS::Topic"
+        assert table.type_of("Missing") is None
+        assert table.types() == ("AWS::SQS::Queue", "AWS::Serverless::Function", "AWS::Serverless::Api", "AWS::SNS::Topic")
+        assert [resource.logical_id for resource in table.of_type("AWS::Serverless::*", "AWS::SQS::Queue")] == ["Queue", "Function", "Api"]
+        assert table.of_type("AWS::Lambda::Function") == ()
+
+        with pytest.raises(KeyError):
+            table["Missing"]
+
+    def test_read_only(self):
+        """Test that resources are read-only views that share the template definitions."""
+        template = load_yaml(TEMPLATE)
+        table = ResourceTable(template)
+
+        properties = table["Queue"].properties
+        assert isinstance(properties, FrozenMapping)
+        assert isinstance(properties["Tags"], FrozenList)
+        assert isinstance(properties["Tags"][0], FrozenMapping)
+        assert properties["Tags"] == [{"Key": "team", "Value": "core"}]
+
+        with pytest.raises(TypeError):
+            properties["QueueName"] = "other"  # type: ignore[index]
+        with pytest.raises(TypeError):
+            properties["Tags"][0] = {}  # type: ignore[index]
+        with pytest.raises(AttributeError):
+            table.extra = 1  # type: ignore[attr-defined]
+
+        template["Resources"]["Queue"]["Properties"]["QueueName"] = "changed"
+        assert properties["QueueName"] == "changed"
+
+    def test_processor_table(self):
+        """Test that the processor caches its table until the Resources section changes."""
+        processor = CloudFormationTemplateProcessor(load_yaml(TEMPLATE))
+
+        table = processor.get_resource_table()
+        assert processor.get_resource_table() is table
+
+        processor.get_mutable("Resources", "Queue", "Properties")["QueueName"] = "other"
+        updated = processor.get_resource_table()
+        assert updated is not table
+        assert updated["Queue"].properties["QueueName"] == "other"
+        assert table["Queue"].properties["QueueName"] == "my-queue"
+
+        processor.remove_resources(["Topic"])
+        assert list(processor.get_resource_table()) == ["Queue", "Function", "Api"]
@@ -1,13 +1,34 @@
 """Tests for CloudFormation YAML tag support."""
 
 import json
+import subprocess
+import sys
+from pathlib import Path
 
-from aws_sam_testing.cfn import dump_yaml, load_yaml
+import pytest
+import yaml
+
+from aws_sam_testing.cfn import HAS_LIBYAML, CloudFormationTemplateProcessor, dump_yaml, load_yaml
 from aws_sam_testing.cfn_tags import (
+    CloudFormationCDumper,
+    CloudFormationCLoader,
+    CloudFormationDumper,
+    CloudFormationIntrinsicCLoader,
+    CloudFormationIntrinsicLoader,
+    CloudFormationLoader,
     CloudFormationObject,
     JSONFromYAMLEncoder,
 )
 
+PROJECT_ROOT = Path(__file__).parent.parent
+TEMPLATE_PATHS = sorted(
+    [
+        PROJECT_ROOT / "tests" / "template.yaml",
+        *PROJECT_ROOT.glob("test_stacks/*/*/template.yaml"),
+        *PROJECT_ROOT.glob("examples/*/template.yaml"),
+    ]
+)
+
 
 class TestCloudFormationLoader:
     """Test CloudFormationLoader functionality."""
@@ -521,3 +542,223 @@ Outputs:
         repr_str = repr(obj)
         assert "Sub(" in repr_str
         assert "${AWS::StackName}-bucket" in repr_str
+
+
+class TestIntrinsicLoader:
+    """Test loading CloudFormation tags directly as intrinsic function dictionaries."""
+
+    def test_load_scalar_tags(self):
+        """Test loading scalar tags."""
+        loaded = load_yaml("[!Ref MyBucket, !Base64 data, !Condition IsProd]", native_intrinsics=True)
+        assert loaded == [{"Ref": "MyBucket"}, {"Fn::Base64": "data"}, {"Fn::Condition": "IsProd"}]
+
+    def test_load_getatt(self):
+        """Test that the dotted !GetAtt form is split into a list."""
+        loaded = load_yaml("[!GetAtt MyBucket.Arn, !GetAtt [MyBucket, Arn]]", native_intrinsics=True)
+        assert loaded == [{"Fn::GetAtt": ["MyBucket", "Arn"]}, {"Fn::GetAtt": ["MyBucket", "Arn"]}]
+
+    def test_load_dotted_ref(self):
+        """Test that a dotted !Ref is rewritten to Fn::GetAtt."""
+        assert load_yaml("!Ref MyBucket.Arn", native_intrinsics=True) == {"Fn::GetAtt": ["MyBucket", "Arn"]}
+
+    def test_load_nested_tags(self):
+        """Test that nested tags are converted at every level."""
+        yaml_content = """
+        Value: !Join
+          - ''
+          - - !Sub '${AWS::StackName}-'
+            - !Select [0, !Split [',', !ImportValue Export]]
+            - !If [IsProd, !Ref Bucket, !Sub ['${Name}', {Name: !GetAtt Bucket.Arn}]]
+        """
+        assert load_yaml(yaml_content, native_intrinsics=True) == {
+            "Value": {
+                "Fn::Join": [
+                    "",
+                    [
+                        {"Fn::Sub": "${AWS::StackName}-"},
+                        {"Fn::Select": [0, {"Fn::Split": [",", {"Fn::ImportValue": "Export"}]}]},
+                        {"Fn::If": ["IsProd", {"Ref": "Bucket"}, {"Fn::Sub": ["${Name}", {"Name": {"Fn::GetAtt": ["Bucket", "Arn"]}}]}]},
+                    ],
+                ]
+            }
+        }
+
+    @pytest.mark.parametrize("loader", [CloudFormationIntrinsicLoader, CloudFormationIntrinsicCLoader])
+    @pytest.mark.parametrize("template_path", TEMPLATE_PATHS, ids=lambda path: str(path.relative_to(PROJECT_ROOT)))
+    def test_matches_transform_cfn_tags(self, template_path, loader):
+        """Test that the native mode produces the same tree as transform_cfn_tags."""
+        content = template_path.read_text()
+        expected = CloudFormationTemplateProcessor(load_yaml(content)).transform_cfn_tags().processed_template
+        assert yaml.load(content, Loader=loader) == expected
+
+
+@pytest.mark.skipif(not HAS_LIBYAML, reason="libyaml is not available")
+class TestLibYAML:
+    """Test that the libyaml-backed loader and dumper match the pure-Python ones."""
+
+    @pytest.mark.parametrize("template_path", TEMPLATE_PATHS, ids=lambda path: str(path.relative_to(PROJECT_ROOT)))
+    def test_load_equivalence(self, template_path):
+        """Test that both loaders produce the same tree for real templates."""
+        content = template_path.read_text()
+        assert yaml.load(content, Loader=CloudFormationCLoader) == yaml.load(content, Loader=CloudFormationLoader)
+
+    @pytest.mark.parametrize("template_path", TEMPLATE_PATHS, ids=lambda path: str(path.relative_to(PROJECT_ROOT)))
+    def test_dump_equivalence(self, template_path):
+        """Test that both dumpers produce equivalent output for real templates.
+
+        libyaml quotes tagged scalars (``!Ref 'Bucket'``), so the outputs are compared after loading them back.
+        """
+        data = yaml.load(template_path.read_text(), Loader=CloudFormationLoader)
+        dump_kwargs = {"default_flow_style": False, "sort_keys": False, "allow_unicode": True}
+        c_dumped = yaml.dump(data, Dumper=CloudFormationCDumper, **dump_kwargs)
+        py_dumped = yaml.dump(data, Dumper=CloudFormationDumper, **dump_kwargs)
+        assert yaml.load(c_dumped, Loader=CloudFormationLoader) == yaml.load(py_dumped, Loader=CloudFormationLoader) == data
+
+    def test_all_tags_equivalence(self):
+        """Test that every supported tag round-trips the same way with both implementations."""
+        yaml_content = """
+        Ref: !Ref MyBucket
+        GetAtt: !GetAtt MyBucket.Arn
+        GetAttList: !GetAtt [MyBucket, Arn]
+        Sub: !Sub '${AWS::StackName}-bucket'
+        SubList: !Sub ['${Name}-bucket', {Name: test}]
+        Join: !Join ['-', [a, b]]
+        Select: !Select [0, !GetAZs '']
+        Split: !Split [',', 'a,b']
+        If: !If [IsProd, prod, dev]
+        Equals: !Equals [!Ref Env, prod]
+        Condition: !Condition IsProd
+        FindInMap: !FindInMap [Map, Key, Value]
+        Base64: !Base64 data
+        ImportValue: !ImportValue Export
+        """
+        c_loaded = yaml.load(yaml_content, Loader=CloudFormationCLoader)
+        py_loaded = yaml.load(yaml_content, Loader=CloudFormationLoader)
+        assert c_loaded == py_loaded
+        c_dumped = yaml.dump(c_loaded, Dumper=CloudFormationCDumper)
+        py_dumped = yaml.dump(py_loaded, Dumper=CloudFormationDumper)
+        assert yaml.load(c_dumped, Loader=CloudFormationCLoader) == yaml.load(py_dumped, Loader=CloudFormationLoader) == py_loaded
+
+    def test_load_yaml_uses_libyaml(self):
+        """Test that load_yaml and dump_yaml use the libyaml-backed classes."""
+        assert issubclass(CloudFormationCLoader, yaml.CSafeLoader)
+        assert issubclass(CloudFormationCDumper, yaml.CSafeDumper)
+        assert load_yaml(dump_yaml({"Value": load_yaml("!Ref Bucket")})) == {"Value": load_yaml("!Ref Bucket")}
+
+
+def test_fallback_without_libyaml():
+    """Test that the pure-Python loader and dumper are used when libyaml is missing."""
+    script = """
+import yaml
+yaml.__with_libyaml__ = False
+from aws_sam_testing import cfn, cfn_tags
+assert cfn.HAS_LIBYAML is False
+assert cfn_tags.CloudFormationCLoader is cfn_tags.CloudFormationLoader
+assert cfn_tags.CloudFormationCDumper is cfn_tags.CloudFormationDumper
+loaded = cfn.load_yaml("Value: !GetAtt Bucket.Arn")
+assert cfn.load_yaml(cfn.dump_yaml(loaded)) == loaded
+"""
+    result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True)
+    assert result.returncode == 0, result.stderr
+
+
+class TestCompactRepresentation:
+    """Test that loaded templates share repeated strings and tags carry no __dict__."""
+
+    @pytest.mark.parametrize("loader", [CloudFormationLoader, CloudFormationCLoader, CloudFormationIntrinsicLoader, CloudFormationIntrinsicCLoader])
+    def test_interned_strings(self, loader):
+        """Test that keys, logical IDs and types are interned across templates and long strings are not."""
+        yaml_content = "Resources: {Queue: {Type: AWS::SQS::Queue, Properties: {Arn: !GetAtt Queue.Arn, Name: !Ref Queue, Code: '%s'}}}" % ("x" * 200)
+        first = yaml.load(yaml_content, Loader=loader)
+        second = yaml.load(yaml_content, Loader=loader)
+
+        (first_id,) = first["Resources"]
+        (second_id,) = second["Resources"]
+        assert first_id is second_id
+        first_properties = first["Resources"]["Queue"]["Properties"]
+        second_properties = second["Resources"]["Queue"]["Properties"]
+        assert first["Resources"]["Queue"]["Type"] is second["Resources"]["Queue"]["Type"]
+        assert first_properties["Code"] == second_properties["Code"]
+        assert first_properties["Code"] is not second_properties["Code"]
+
+        first_ref = first_properties["Name"]
+        second_ref = second_properties["Name"]
+        if isinstance(first_ref, CloudFormationObject):
+            assert first_ref.data is second_ref.data
+        else:
+            assert first_ref["Ref"] is second_ref["Ref"]
+            assert first_properties["Arn"]["Fn::GetAtt"][0] is first_id
+
+    def test_tag_slots(self):
+        """Test that tag objects have no __dict__ and can still be pickled and copied."""
+        import copy
+        import pickle
+
+        tags = load_yaml("[!Ref Bucket, !GetAtt Bucket.Arn, !Sub ['${A}', {A: !Ref B}]]")
+
+        for tag in tags:
+            assert not hasattr(tag, "__dict__")
+            assert pickle.loads(pickle.dumps(tag)) == tag
+            assert copy.deepcopy(tag) == tag
+
+
+def _step_functions_template(states: int, tagged: bool) -> str:
+    """Return a Step Functions template full of !Sub and !GetAtt, or the same document without the tags."""
+    tag = (lambda name: f"!{name} ") if tagged else (lambda name: "")
+    lines = ["Resources:", "  StateMachine:", "    Type: AWS::StepFunctions::StateMachine", "    Properties:", "      Definition:", "        States:"]
+    for index in range(states):
+        lines += [
+            f"          Step{index}:",
+            "            Type: Task",
+            f"            Resource: {tag('GetAtt')}Function{index}.Arn",
+            "            Parameters:",
+            f"              QueueUrl: {tag('Sub')}'https://sqs.${{AWS::Region}}.amazonaws.com/${{AWS::AccountId}}/${{Queue{index}}}'",
+            f"              TableName: {tag('Sub')}['${{Table}}', {{Table: {tag('Ref')}Table{index}}}]",
+            f"              BucketArn: {tag('GetAtt')}[Bucket{index}, Arn]",
+        ]
+    return "\n".join(lines)
+
+
+class TestLoadPerformance:
+    """Guard the load time of tag-dense templates."""
+
+    @pytest.mark.parametrize("loader", [CloudFormationLoader, CloudFormationCLoader, CloudFormationIntrinsicLoader, CloudFormationIntrinsicCLoader])
+    def test_no_exceptions_while_loading(self, loader, monkeypatch):
+        """Test that tags are constructed by dispatching on the node kind, without raising exceptions."""
+        raised = []
+        original_init = yaml.constructor.ConstructorError.__init__
+
+        def counting_init(self, *args, **kwargs):
+            raised.append(args)
+            original_init(self, *args, **kwargs)
+
+        monkeypatch.setattr(yaml.constructor.ConstructorError, "__init__", counting_init)
+        yaml.load(_step_functions_template(20, tagged=True), Loader=loader)
+
+        assert raised == []
+
+    def test_wrong_node_kind(self):
+        """Test that tags applied to an unsupported node kind are rejected."""
+        with pytest.raises(yaml.constructor.ConstructorError, match="expected a sequence or scalar node for !GetAtt, but found mapping"):
+            load_yaml("!GetAtt {Bucket: Arn}")
+        with pytest.raises(yaml.constructor.ConstructorError, match="expected a scalar node for !Ref, but found sequence"):
+            load_yaml("!Ref [Bucket]")
+
+    @pytest.mark.slow
+    @pytest.mark.timing
+    def test_tag_dense_load_time(self):
+        """Test that a tag-dense template loads about as fast as the same document without tags."""
+        import time
+
+        def best_time(content: str) -> float:
+            timings = []
+            for _ in range(15):
+                start = time.perf_counter()
+                load_yaml(content)
+                timings.append(time.perf_counter() - start)
+            return min(timings)
+
+        tagged = best_time(_step_functions_template(500, tagged=True))
+        plain = best_time(_step_functions_template(500, tagged=False))
+
+        assert tagged < plain * 1.5, f"tag-dense template loaded in {tagged * 1000:.1f} ms, without tags in {plain * 1000:.1f} ms"
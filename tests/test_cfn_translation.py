@@ -0,0 +1,142 @@
+"""Tests for the cached SAM to CloudFormation translation."""
+
+import pytest
+
+from aws_sam_testing import cfn_translation
+from aws_sam_testing.cfn import load_yaml
+from aws_sam_testing.cfn_translation import TranslationCache
+
+TEMPLATE = """
+Transform: AWS::Serverless-2016-10-31
+Parameters:
+  Stage:
+    Type: String
+    Default: dev
+Resources:
+  Function:
+    Type: AWS::Serverless::Function
+    Properties:
+      Handler: app.handler
+      Runtime: python3.13
+      CodeUri: s3://bucket/function.zip
+      Environment:
+        Variables:
+          STAGE: !Ref Stage
+"""
+
+
+@pytest.fixture
+def translations(monkeypatch):
+    """Count the calls to the translator."""
+    calls = []
+    translate = cfn_translation._translate
+
+    def counting_translate(*args, **kwargs):
+        calls.append(args)
+        return translate(*args, **kwargs)
+
+    monkeypatch.setattr(cfn_translation, "_translate", counting_translate)
+    return calls
+
+
+class TestTranslationCache:
+    """Test the TranslationCache class."""
+
+    def test_translate(self):
+        """Test that serverless resources are translated without modifying the template."""
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+
+        translated = TranslationCache().translate(template)
+
+        assert translated["Resources"]["Function"]["Type"] == "AWS::Lambda::Function"
+        assert translated["Resources"]["FunctionRole"]["Type"] == "AWS::IAM::Role"
+        assert translated["Resources"]["Function"]["Properties"]["Code"] == {"S3Bucket": "bucket", "S3Key": "function.zip"}
+        assert template == load_yaml(TEMPLATE, native_intrinsics=True)
+
+    def test_memory_cache(self, translations):
+        """Test that the same input is translated once and every call returns a fresh copy."""
+        cache = TranslationCache()
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+
+        first = cache.translate(template)
+        first["Resources"].clear()
+        second = cache.translate(load_yaml(TEMPLATE, native_intrinsics=True))
+
+        assert len(translations) == 1
+        assert "Function" in second["Resources"]
+
+    def test_cache_key(self, translations):
+        """Test that changes of the template, the parameters or the pseudo parameters are translated again."""
+        cache = TranslationCache()
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+
+        cache.translate(template)
+        cache.translate(template, parameters={"Stage": "prod"})
+        cache.translate(template, region_name="eu-west-1")
+        template["Resources"]["Function"]["Properties"]["Timeout"] = 30
+        cache.translate(template)
+        cache.translate(template, parameters={"Stage": "prod"})
+
+        assert len(translations) == 5
+        assert len(cache) == 5
+
+    def test_disk_cache(self, tmp_path, translations):
+        """Test that translations are reused from disk by other caches."""
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+
+        translated = TranslationCache(cache_dir=tmp_path).translate(template)
+        assert len(list(tmp_path.glob("*.pickle"))) == 1
+
+        assert TranslationCache(cache_dir=tmp_path).translate(template) == translated
+        assert TranslationCache().translate(template, cache_dir=tmp_path) == translated
+        assert len(translations) == 1
+
+    def test_corrupted_disk_cache(self, tmp_path, translations):
+        """Test that corrupted cache files are translated again and overwritten."""
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+        translated = TranslationCache(cache_dir=tmp_path).translate(template)
+
+        (cache_file,) = tmp_path.glob("*.pickle")
+        cache_file.write_bytes(b"corrupted")
+
+        assert TranslationCache(cache_dir=tmp_path).translate(template) == translated
+        assert len(translations) == 2
+        assert TranslationCache(cache_dir=tmp_path).translate(template) == translated
+        assert len(translations) == 2
+
+    def test_lru_eviction(self, translations):
+        """Test that the least recently used translations are evicted from memory."""
+        cache = TranslationCache(max_entries=2)
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+
+        for stage in ["a", "b", "a", "c", "a", "b"]:
+            cache.translate(template, parameters={"Stage": stage})
+
+        assert len(cache) == 2
+        assert [call[1] for call in translations] == [{"Stage": "a"}, {"Stage": "b"}, {"Stage": "c"}, {"Stage": "b"}]
+
+    def test_managed_policy_map_in_key(self, tmp_path, translations):
+        """Test that translations with and without managed policies are not served for each other."""
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+        template["Resources"]["Function"]["Properties"]["Policies"] = ["MyTeamPolicy"]
+        policy_arn = "arn:aws:iam::aws:policy/MyTeamPolicy"
+
+        without_map = TranslationCache(cache_dir=tmp_path).translate(template)
+        with_map = TranslationCache(cache_dir=tmp_path).translate(template, managed_policy_map=lambda: {"MyTeamPolicy": policy_arn})
+
+        assert len(translations) == 2
+        assert policy_arn in with_map["Resources"]["FunctionRole"]["Properties"]["ManagedPolicyArns"]
+        assert policy_arn not in without_map["Resources"]["FunctionRole"]["Properties"]["ManagedPolicyArns"]
+
+    def test_disk_cache_limit(self, tmp_path, translations):
+        """Test that only the most recently used translations are kept on disk."""
+        template = load_yaml(TEMPLATE, native_intrinsics=True)
+        cache = TranslationCache(cache_dir=tmp_path, max_cache_files=2)
+
+        for stage in ["a", "b", "c"]:
+            cache.translate(template, parameters={"Stage": stage})
+
+        assert len(list(tmp_path.glob("*.pickle"))) == 2
+        cache.clear()
+        cache.translate(template, parameters={"Stage": "a"})
+        assert len(translations) == 4
@@ -0,0 +1,179 @@
+"""Tests for the iterative template traversal engine."""
+
+import sys
+
+from aws_sam_testing.cfn import CloudFormationTemplateProcessor, load_yaml
+from aws_sam_testing.cfn_tags import CloudFormationObject
+from aws_sam_testing.cfn_visitor import REMOVE, Keep, TemplateVisitor, is_intrinsic, rebuild, walk
+
+
+class _Recorder(TemplateVisitor):
+    def __init__(self, stop_after: int | None = None):
+        self.calls = []
+        self.stop_after = stop_after
+
+    def visit_intrinsic(self, name, data):
+        self.calls.append((name, data))
+        if self.stop_after is not None and len(self.calls) >= self.stop_after:
+            self.done = True
+
+
+def _nested(depth: int, leaf):
+    """Create a value nested `depth` levels deep, alternating dicts, lists and Fn::If."""
+    value = leaf
+    for level in range(depth):
+        if level % 3 == 0:
+            value = {"Next": value}
+        elif level % 3 == 1:
+            value = [value]
+        else:
+            value = {"Fn::If": ["Condition", value, "x"]}
+    return value
+
+
+class TestWalk:
+    """Test the walk function."""
+
+    def test_tags_and_dict_intrinsics(self):
+        """Test that tag objects and dictionary intrinsics are reported the same way, in template order."""
+        template = load_yaml(
+            """
+            A: !Ref First
+            B:
+              - {"Fn::GetAtt": [Second, Arn]}
+              - !Sub ['${Third}', {Third: !Ref Fourth}]
+            """
+        )
+        recorder = _Recorder()
+        walk(template, recorder)
+
+        assert [name for name, _ in recorder.calls] == ["Ref", "Fn::GetAtt", "Fn::Sub", "Ref"]
+        assert recorder.calls[0] == ("Ref", "First")
+        assert recorder.calls[3] == ("Ref", "Fourth")
+
+    def test_multiple_visitors(self):
+        """Test that several analyses run in one traversal and stop independently."""
+        value = {"A": [{"Ref": "A"}, {"Ref": "B"}, {"Ref": "C"}]}
+        first, everything = _Recorder(stop_after=1), _Recorder()
+
+        walk(value, first, everything)
+
+        assert first.calls == [("Ref", "A")]
+        assert len(everything.calls) == 3
+
+    def test_stops_when_all_visitors_done(self):
+        """Test that the traversal stops as soon as every visitor is done."""
+
+        class Exploding(list):
+            def __reversed__(self):
+                raise AssertionError("Traversal should have stopped")
+
+        recorder = _Recorder(stop_after=1)
+        walk([{"Ref": "Early"}, Exploding([{"Ref": "Late"}])], recorder)
+
+        assert recorder.calls == [("Ref", "Early")]
+
+    def test_deep_nesting(self):
+        """Test that values nested deeper than the recursion limit can be traversed."""
+        depth = sys.getrecursionlimit() * 5
+        recorder = _Recorder()
+
+        walk(_nested(depth, load_yaml("!Ref Leaf")), recorder)
+
+        assert recorder.calls[-1] == ("Ref", "Leaf")
+        assert sum(1 for name, _ in recorder.calls if name == "Fn::If") == depth // 3
+
+
+class TestRebuild:
+    """Test the rebuild function."""
+
+    def test_copies_containers(self):
+        """Test that containers are copied and leaves are shared."""
+        leaf = object()
+        value = {"A": [leaf, {"B": "c"}], "D": load_yaml("!Ref E")}
+
+        copied = rebuild(value)
+
+        assert copied == value
+        assert copied is not value
+        assert copied["A"] is not value["A"]
+        assert copied["A"][0] is leaf
+        assert copied["D"] is not value["D"]
+        assert copied["D"] == value["D"]
+
+    def test_replace_remove_and_keep(self):
+        """Test the replace callback results."""
+        value = {
+            "Removed": {"Ref": "Gone"},
+            "List": [{"Ref": "Gone"}, {"Ref": "Stays"}],
+            "Kept": {"Fn::Join": ["", [{"Ref": "Gone"}]]},
+            "Replaced": load_yaml("!Ref Tag"),
+        }
+
+        def replace(node):
+            assert is_intrinsic(node)
+            if isinstance(node, CloudFormationObject):
+                return {"Replaced": node.data}
+            if node.get("Ref") == "Gone":
+                return REMOVE
+            if "Fn::Join" in node:
+                return Keep(node)
+            return node
+
+        copied = rebuild(value, replace)
+
+        assert copied == {
+            "List": [{"Ref": "Stays"}],
+            "Kept": {"Fn::Join": ["", [{"Ref": "Gone"}]]},
+            "Replaced": {"Replaced": "Tag"},
+        }
+        assert copied["Kept"] is value["Kept"]
+        assert rebuild({"Ref": "Gone"}, replace) is REMOVE
+
+    def test_deep_nesting(self):
+        """Test that values nested deeper than the recursion limit can be copied."""
+        depth = sys.getrecursionlimit() * 5
+        value = _nested(depth, "leaf")
+
+        copied = rebuild(value)
+
+        node = copied
+        while not isinstance(node, str):
+            node = node["Next"] if isinstance(node, dict) and "Next" in node else node[0] if isinstance(node, list) else node["Fn::If"][1]
+        assert node == "leaf"
+
+
+class TestDeepTemplates:
+    """Test processor operations on deeply nested templates."""
+
+    def _template(self, depth):
+        definition = _nested(depth, load_yaml("!Ref Table"))
+        return {
+            "Resources": {
+                "Table": {"Type": "AWS::DynamoDB::Table"},
+                "StateMachine": {
+                    "Type": "AWS::StepFunctions::StateMachine",
+                    "Properties": {"Definition": definition, "Role": load_yaml("!GetAtt Table.Arn")},
+                },
+            }
+        }
+
+    def test_transform_cfn_tags(self):
+        """Test that transform_cfn_tags handles deeply nested definitions."""
+        template = self._template(sys.getrecursionlimit() * 3)
+
+        processed = CloudFormationTemplateProcessor(template).transform_cfn_tags().processed_template
+
+        assert processed["Resources"]["StateMachine"]["Properties"]["Role"] == {"Fn::GetAtt": ["Table", "Arn"]}
+
+    def test_remove_resource(self):
+        """Test that removing a referenced resource handles deeply nested definitions."""
+        template = self._template(sys.getrecursionlimit() * 3)
+
+        processor = CloudFormationTemplateProcessor(template)
+        processor.remove_resource("Table")
+
+        assert "Table" not in processor.processed_template["Resources"]
+        properties = processor.processed_template["Resources"]["StateMachine"]["Properties"]
+        assert "Role" not in properties
+        assert "Definition" in properties
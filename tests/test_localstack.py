@@ -67,8 +67,9 @@ Resources:
                 # Check _process_lambda_layers was called for NORMAL feature set
                 mock_process_layers.assert_called_once()
 
-                # Check dump_yaml was called
-                assert mock_dump_yaml.call_count >= 1
+                # The processed template is passed in memory instead of through a temporary YAML file
+                assert mock_process_layers.call_args.kwargs["template"] == toolkit.template
+                assert mock_dump_yaml.call_count == 0
 
         def test_build_pro_feature_set_custom_build_dir(self, toolkit, tmp_path):
             """Test build with PRO feature set and custom build directory."""
@@ -549,6 +550,33 @@ def lambda_handler(event, context):
             # Check that local layer resource was removed
             assert "MyLocalLayer" not in output_template["Resources"]
 
+        def test_process_layers_with_template_in_memory(self, toolkit, tmp_path, sample_template):
+            """Test that a template passed in memory is used instead of the source template file."""
+            import copy
+
+            import yaml
+
+            source_path = tmp_path / "source" / "template.yaml"
+            source_path.parent.mkdir(parents=True)
+            source_path.write_text("Resources: {}")
+
+            layer_dir = source_path.parent / "MyLocalLayer" / "python"
+            layer_dir.mkdir(parents=True)
+            (layer_dir / "my_package.py").write_text("# Layer code")
+            (source_path.parent / "MyFunction").mkdir()
+            (source_path.parent / "MyFunction" / "index.py").write_text("def handler(event, context): pass")
+
+            original = copy.deepcopy(sample_template)
+            build_dir = tmp_path / "build"
+
+            with patch.object(toolkit, "_download_and_cache_layer", return_value=None):
+                toolkit._process_lambda_layers(source_template_path=source_path, build_dir=build_dir, flatten_layers=True, template=sample_template)
+
+            assert (build_dir / "MyFunction" / "my_package.py").exists()
+            output_template = yaml.safe_load((build_dir / "template.yaml").read_text())
+            assert list(output_template["Resources"]) == ["MyFunction", "FunctionWithoutLayers"]
+            assert sample_template == original
+
         def test_process_layers_with_external_layer_arn(self, toolkit, tmp_path):
             """Test processing functions with external layer ARNs."""
             template = {
@@ -651,6 +679,20 @@ def lambda_handler(event, context):
             result = toolkit._resolve_layer_arn(layer_ref, region="ap-southeast-2")
             assert result == "arn:aws:lambda:ap-southeast-2:123456789012:layer:my-layer:1"
 
+        def test_resolve_layer_arn_with_fn_sub_variable_map(self, toolkit):
+            """Test resolving layer ARN from Fn::Sub with custom variables."""
+            layer_ref = {"Fn::Sub": ["arn:aws:lambda:${AWS::Region}:${Account}:layer:${Name}:1", {"Account": "123456789012", "Name": "my-layer"}]}
+            result = toolkit._resolve_layer_arn(layer_ref, region="eu-west-1")
+            assert result == "arn:aws:lambda:eu-west-1:123456789012:layer:my-layer:1"
+
+        def test_resolve_layer_arn_with_tags(self, toolkit):
+            """Test resolving layer ARN from tag objects."""
+            from aws_sam_testing.cfn import load_yaml
+
+            assert toolkit._resolve_layer_arn(load_yaml("!Ref MyLayer"), region="us-east-1") == "!Ref:MyLayer"
+            result = toolkit._resolve_layer_arn(load_yaml("!Sub 'arn:aws:lambda:${AWS::Region}:123456789012:layer:my-layer:1'"), region="eu-west-1")
+            assert result == "arn:aws:lambda:eu-west-1:123456789012:layer:my-layer:1"
+
         def test_resolve_layer_arn_with_fn_sub_default_region(self, toolkit):
             """Test resolving layer ARN from Fn::Sub with default region when none provided."""
             layer_ref = {"Fn::Sub": "arn:aws:lambda:${AWS::Region}:123456789012:layer:my-layer:1"}
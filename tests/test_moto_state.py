@@ -0,0 +1,100 @@
+"""Tests for the snapshots of the moto backends."""
+
+import boto3
+import pytest
+from moto import mock_aws
+
+from aws_sam_testing.moto_state import MotoSnapshot, UnsupportedMotoVersionError, is_supported, reset_backends
+
+
+class TestMotoSnapshot:
+    """Test the MotoSnapshot class."""
+
+    def test_restore(self):
+        """Test that every restore returns a new copy of the state and of the captured objects."""
+        with mock_aws():
+            s3 = boto3.client("s3", region_name="us-east-1")
+            s3.create_bucket(Bucket="bucket")
+            s3.put_object(Bucket="bucket", Key="key", Body=b"snapshot")
+            captured = {"buckets": ["bucket"]}
+            snapshot = MotoSnapshot.take(captured)
+            assert snapshot.size > 0
+
+            s3.put_object(Bucket="bucket", Key="key", Body=b"modified")
+            s3.create_bucket(Bucket="other-bucket")
+
+            (restored,) = snapshot.restore()
+            assert restored == captured and restored is not captured
+            assert [bucket["Name"] for bucket in s3.list_buckets()["Buckets"]] == ["bucket"]
+            assert s3.get_object(Bucket="bucket", Key="key")["Body"].read() == b"snapshot"
+
+            s3.delete_object(Bucket="bucket", Key="key")
+            snapshot.restore()
+            assert s3.get_object(Bucket="bucket", Key="key")["Body"].read() == b"snapshot"
+
+    def test_restore_resets_other_backends(self):
+        """Test that backends that were not in use when the snapshot was taken are reset."""
+        with mock_aws():
+            snapshot = MotoSnapshot.take()
+
+            sqs = boto3.client("sqs", region_name="us-east-1")
+            sqs.create_queue(QueueName="queue")
+            snapshot.restore()
+
+            assert sqs.list_queues().get("QueueUrls") is None
+
+    def test_restore_after_reset(self):
+        """Test that a snapshot outlives a reset of the backends, e.g. the end of the mock it was taken in."""
+        from moto.core.base_backend import BackendDict
+
+        with mock_aws():
+            sqs = boto3.client("sqs", region_name="us-east-1")
+            queue_url = sqs.create_queue(QueueName="queue")["QueueUrl"]
+            sqs.send_message(QueueUrl=queue_url, MessageBody="message")
+            snapshot = MotoSnapshot.take()
+
+            BackendDict.reset()
+            assert sqs.list_queues().get("QueueUrls") is None
+            snapshot.restore()
+
+            messages = sqs.receive_message(QueueUrl=queue_url, WaitTimeSeconds=0)["Messages"]
+            assert [message["Body"] for message in messages] == ["message"]
+
+
+class TestResetBackends:
+    """Test the reset_backends function."""
+
+    def test_reset_backends(self):
+        """Test that only the given regions of the account are reset."""
+        with mock_aws():
+            boto3.client("sqs", region_name="us-east-1").create_queue(QueueName="queue")
+            boto3.client("sqs", region_name="eu-west-1").create_queue(QueueName="queue")
+            boto3.client("s3", region_name="us-east-1").create_bucket(Bucket="bucket")
+
+            assert reset_backends("123456789012", ["us-east-1"]) > 0
+            assert boto3.client("sqs", region_name="us-east-1").list_queues().get("QueueUrls") is None
+            assert len(boto3.client("sqs", region_name="eu-west-1").list_queues()["QueueUrls"]) == 1
+            assert len(boto3.client("s3", region_name="us-east-1").list_buckets()["Buckets"]) == 1
+
+            reset_backends("123456789012", ["aws"])
+            assert boto3.client("s3", region_name="us-east-1").list_buckets()["Buckets"] == []
+
+
+class TestUnsupportedMotoVersion:
+    """Test the checks of the moto internals."""
+
+    def test_missing_internals(self, monkeypatch):
+        """Test that a clear error is raised if moto does not have the internals the backend state is accessed through."""
+        from moto.core import base_backend
+
+        assert is_supported()
+
+        # The patch is undone before the mock of the test stops, which needs the internals
+        with monkeypatch.context() as patch:
+            patch.delattr(base_backend.BackendDict, "_instances")
+
+            assert not is_supported()
+            with pytest.raises(UnsupportedMotoVersionError, match="BackendDict._instances"):
+                MotoSnapshot.take()
+            with pytest.raises(UnsupportedMotoVersionError):
+                reset_backends("123456789012", ["us-east-1"])